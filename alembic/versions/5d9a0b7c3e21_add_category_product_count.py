@@ -0,0 +1,32 @@
+"""add denormalized product_count to categories
+
+Revision ID: 5d9a0b7c3e21
+Revises: c41e7b93d2a0
+Create Date: 2026-10-18 14:05:12.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d9a0b7c3e21'
+down_revision: Union[str, Sequence[str], None] = 'c41e7b93d2a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('categories', sa.Column('product_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        "UPDATE categories SET product_count = "
+        "(SELECT COUNT(*) FROM menu_items WHERE menu_items.category_id = categories.category_id)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('categories', 'product_count')
@@ -0,0 +1,36 @@
+"""add unique index on reviews.order_id (one review per order)
+
+Revision ID: 6b1d9e4f2a83
+Revises: 9c5e2a7d1b64
+Create Date: 2026-10-18 21:40:12.318907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b1d9e4f2a83'
+down_revision: Union[str, Sequence[str], None] = '9c5e2a7d1b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Bỏ review trùng do submit đồng thời lọt qua kiểm tra cũ, giữ review đầu tiên của mỗi đơn;
+    # rating aggregates được job reconcile_restaurant_ratings tính lại
+    op.execute(
+        "DELETE FROM reviews WHERE order_id IS NOT NULL AND review_id NOT IN ("
+        "SELECT keep_id FROM (SELECT MIN(review_id) AS keep_id FROM reviews "
+        "WHERE order_id IS NOT NULL GROUP BY order_id) AS keep)"
+    )
+    # NULL không tính là trùng: review không gắn đơn vẫn được phép nhiều lần
+    op.create_index('ix_reviews_order_id', 'reviews', ['order_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reviews_order_id', table_name='reviews')
@@ -0,0 +1,54 @@
+"""add indexes for hot query paths
+
+Revision ID: 8f2c4d1e9a7b
+Revises: 3bacb10e883f
+Create Date: 2026-10-18 09:12:40.512304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f2c4d1e9a7b'
+down_revision: Union[str, Sequence[str], None] = '3bacb10e883f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_orders_user_uid_created_at', 'orders', ['user_uid', 'created_at'], unique=False)
+    op.create_index('ix_orders_restaurant_id', 'orders', ['restaurant_id'], unique=False)
+    op.create_index('ix_orders_shipper_uid', 'orders', ['shipper_uid'], unique=False)
+    op.create_index('ix_orders_status', 'orders', ['status'], unique=False)
+    op.create_index('ix_order_items_order_id', 'order_items', ['order_id'], unique=False)
+    op.create_index('ix_cart_items_user_uid_restaurant_id_item_id', 'cart_items', ['user_uid', 'restaurant_id', 'item_id'], unique=False)
+    op.create_index('ix_menu_items_restaurant_id_category_id', 'menu_items', ['restaurant_id', 'category_id'], unique=False)
+    op.create_index('ix_menu_items_category_id', 'menu_items', ['category_id'], unique=False)
+    op.create_index('ix_menu_item_images_item_id', 'menu_item_images', ['item_id'], unique=False)
+    op.create_index('ix_vouchers_seller_uid_code', 'vouchers', ['seller_uid', 'code'], unique=False)
+    op.create_index('ix_addresses_user_uid', 'addresses', ['user_uid'], unique=False)
+    op.create_index('ix_restaurants_owner_uid', 'restaurants', ['owner_uid'], unique=False)
+    op.create_index('ix_banners_status', 'banners', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Lưu ý: MySQL có thể đã tự bỏ index ngầm của FK khi tạo các index trên; nếu drop báo
+    # lỗi 1553 (needed in a foreign key constraint) thì cần tạo lại index cho cột FK trước.
+    op.drop_index('ix_banners_status', table_name='banners')
+    op.drop_index('ix_restaurants_owner_uid', table_name='restaurants')
+    op.drop_index('ix_addresses_user_uid', table_name='addresses')
+    op.drop_index('ix_vouchers_seller_uid_code', table_name='vouchers')
+    op.drop_index('ix_menu_item_images_item_id', table_name='menu_item_images')
+    op.drop_index('ix_menu_items_category_id', table_name='menu_items')
+    op.drop_index('ix_menu_items_restaurant_id_category_id', table_name='menu_items')
+    op.drop_index('ix_cart_items_user_uid_restaurant_id_item_id', table_name='cart_items')
+    op.drop_index('ix_order_items_order_id', table_name='order_items')
+    op.drop_index('ix_orders_status', table_name='orders')
+    op.drop_index('ix_orders_shipper_uid', table_name='orders')
+    op.drop_index('ix_orders_restaurant_id', table_name='orders')
+    op.drop_index('ix_orders_user_uid_created_at', table_name='orders')
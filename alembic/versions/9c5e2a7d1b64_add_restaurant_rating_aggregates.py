@@ -0,0 +1,50 @@
+"""add restaurant rating aggregates and index on reviews (restaurant_id, created_at)
+
+Revision ID: 9c5e2a7d1b64
+Revises: e2b8c6d41f90
+Create Date: 2026-10-18 17:25:41.603182
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c5e2a7d1b64'
+down_revision: Union[str, Sequence[str], None] = 'e2b8c6d41f90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+AGGREGATES = ['rating_sum', 'rating_count', 'rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for column in AGGREGATES:
+        op.add_column('restaurants', sa.Column(column, sa.Integer(), server_default='0', nullable=False))
+    op.create_index('ix_reviews_restaurant_id_created_at', 'reviews', ['restaurant_id', 'created_at'], unique=False)
+    star_counts = ", ".join(
+        f"rating_{star} = (SELECT COUNT(*) FROM reviews WHERE reviews.restaurant_id = restaurants.restaurant_id "
+        f"AND reviews.rating = {star})"
+        for star in range(1, 6)
+    )
+    op.execute(
+        "UPDATE restaurants SET "
+        "rating_sum = (SELECT COALESCE(SUM(rating), 0) FROM reviews "
+        "WHERE reviews.restaurant_id = restaurants.restaurant_id AND reviews.rating BETWEEN 1 AND 5), "
+        "rating_count = (SELECT COUNT(*) FROM reviews "
+        "WHERE reviews.restaurant_id = restaurants.restaurant_id AND reviews.rating BETWEEN 1 AND 5), "
+        f"{star_counts}"
+    )
+    op.execute(
+        "UPDATE restaurants SET rating = CASE WHEN rating_count > 0 THEN rating_sum * 1.0 / rating_count ELSE 0 END"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reviews_restaurant_id_created_at', table_name='reviews')
+    for column in reversed(AGGREGATES):
+        op.drop_column('restaurants', column)
@@ -0,0 +1,30 @@
+"""add latitude/longitude to restaurants
+
+Revision ID: a7e3f1c08b52
+Revises: 5d9a0b7c3e21
+Create Date: 2026-10-18 15:21:47.903115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e3f1c08b52'
+down_revision: Union[str, Sequence[str], None] = '5d9a0b7c3e21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('restaurants', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('restaurants', sa.Column('longitude', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('restaurants', 'longitude')
+    op.drop_column('restaurants', 'latitude')
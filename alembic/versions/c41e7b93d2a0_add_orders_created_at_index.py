@@ -0,0 +1,28 @@
+"""add orders.created_at index for keyset pagination
+
+Revision ID: c41e7b93d2a0
+Revises: 8f2c4d1e9a7b
+Create Date: 2026-10-18 10:03:17.228415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e7b93d2a0'
+down_revision: Union[str, Sequence[str], None] = '8f2c4d1e9a7b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_orders_created_at'), 'orders', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_orders_created_at'), table_name='orders')
@@ -0,0 +1,42 @@
+"""add restaurant_schedules and index on restaurants.status
+
+Revision ID: e2b8c6d41f90
+Revises: a7e3f1c08b52
+Create Date: 2026-10-18 16:40:03.275519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b8c6d41f90'
+down_revision: Union[str, Sequence[str], None] = 'a7e3f1c08b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('restaurant_schedules',
+    sa.Column('schedule_id', sa.Integer(), nullable=False),
+    sa.Column('restaurant_id', sa.Integer(), nullable=False),
+    sa.Column('weekday', sa.Integer(), nullable=False),
+    sa.Column('open_minute', sa.Integer(), nullable=False),
+    sa.Column('close_minute', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.restaurant_id'], ),
+    sa.PrimaryKeyConstraint('schedule_id')
+    )
+    op.create_index(op.f('ix_restaurant_schedules_schedule_id'), 'restaurant_schedules', ['schedule_id'], unique=False)
+    op.create_index(op.f('ix_restaurant_schedules_restaurant_id'), 'restaurant_schedules', ['restaurant_id'], unique=False)
+    op.create_index(op.f('ix_restaurants_status'), 'restaurants', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_restaurants_status'), table_name='restaurants')
+    op.drop_index(op.f('ix_restaurant_schedules_restaurant_id'), table_name='restaurant_schedules')
+    op.drop_index(op.f('ix_restaurant_schedules_schedule_id'), table_name='restaurant_schedules')
+    op.drop_table('restaurant_schedules')
@@ -0,0 +1,283 @@
+"""
+Lunch-rush load simulation.
+
+Replays a weighted mix of browse / cart / order / shipper requests against
+main.app (in-process) or a running server, then reports p50/p95/p99 latency
+and throughput per route and stores the result as a JSON baseline.
+
+    # seed a local database and run in-process
+    DATABASE_URL=sqlite+aiosqlite:///bench.db python -m benchmarks.load_test --seed --duration 30
+
+    # compare with a stored baseline (exit code 1 on regression)
+    python -m benchmarks.load_test --duration 30 --compare benchmarks/baselines/<sha>.json
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from collections import defaultdict
+from typing import Optional
+
+import httpx
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+
+# (tên scenario, trọng số) - tỉ lệ gần với giờ cao điểm buổi trưa: đa số là xem menu
+DEFAULT_MIX = {
+    "browse_restaurants": 35,
+    "browse_menu": 30,
+    "add_to_cart": 15,
+    "create_order": 10,
+    "shipper_update": 10,
+}
+
+ORDER_FLOW = ["accepted", "preparing", "delivering", "delivered"]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, route: str, elapsed: float, ok: bool):
+        self.latencies[route].append(elapsed)
+        if not ok:
+            self.errors[route] += 1
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[k]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    routes = {}
+    all_latencies = []
+    for route, values in sorted(recorder.latencies.items()):
+        values = sorted(values)
+        all_latencies.extend(values)
+        routes[route] = _summary(values, recorder.errors[route], elapsed)
+    total_errors = sum(recorder.errors.values())
+    return {"routes": routes, "total": _summary(sorted(all_latencies), total_errors, elapsed)}
+
+
+def _summary(values: list[float], errors: int, elapsed: float) -> dict:
+    return {
+        "count": len(values),
+        "errors": errors,
+        "rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+    }
+
+
+class Simulation:
+    def __init__(self, client: httpx.AsyncClient, fixtures: dict, mix: dict, rng: random.Random):
+        self.client = client
+        self.fixtures = fixtures
+        self.scenarios = list(mix)
+        self.weights = [mix[name] for name in self.scenarios]
+        self.rng = rng
+        self.recorder = Recorder()
+        # order_id -> chỉ số trạng thái tiếp theo trong ORDER_FLOW
+        self.open_orders: dict[int, int] = {}
+
+    async def _call(self, route: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record(route, time.perf_counter() - start, False)
+            return None
+        self.recorder.record(route, time.perf_counter() - start, response.status_code < 400)
+        return response
+
+    async def browse_restaurants(self):
+        await self._call("GET /restaurant/list", "GET", "/restaurant/list", params={"limit": 20})
+
+    async def browse_menu(self):
+        restaurant_id = self.rng.choice(self.fixtures["restaurant_ids"])
+        await self._call(
+            "GET /menu_item/menu_items_by_resid/{restaurant_id}",
+            "GET", f"/menu_item/menu_items_by_resid/{restaurant_id}",
+        )
+
+    async def add_to_cart(self):
+        restaurant_id, item_id = self.rng.choice(self.fixtures["menu_items"])
+        await self._call("POST /cart/add", "POST", "/cart/add", json={
+            "user_uid": self.rng.choice(self.fixtures["customer_uids"]),
+            "restaurant_id": restaurant_id,
+            "item_id": item_id,
+            "quantity": self.rng.randint(1, 3),
+        })
+
+    async def create_order(self):
+        response = await self._call("POST /order/create", "POST", "/order/create", json={
+            "user_uid": self.rng.choice(self.fixtures["customer_uids"]),
+            "restaurant_id": self.rng.choice(self.fixtures["restaurant_ids"]),
+            "total_price": str(self.rng.randrange(30, 300) * 1000),
+            "payment_method": "cod",
+        })
+        if response is not None and response.status_code == 200:
+            self.open_orders[response.json()["order_id"]] = 0
+
+    async def shipper_update(self):
+        if not self.open_orders:
+            await self.create_order()
+            return
+        order_id = self.rng.choice(list(self.open_orders))
+        step = self.open_orders[order_id]
+        if step + 1 >= len(ORDER_FLOW):
+            del self.open_orders[order_id]
+        else:
+            self.open_orders[order_id] = step + 1
+        await self._call("PUT /order/update", "PUT", "/order/update", json={
+            "order_id": order_id,
+            "status": ORDER_FLOW[step],
+            "shipper_uid": self.rng.choice(self.fixtures["shipper_uids"]),
+        })
+
+    async def worker(self, deadline: float, max_requests: Optional[int], counter: list):
+        while time.perf_counter() < deadline:
+            if max_requests is not None:
+                if counter[0] >= max_requests:
+                    return
+                counter[0] += 1
+            scenario = self.rng.choices(self.scenarios, self.weights)[0]
+            await getattr(self, scenario)()
+
+    async def run(self, concurrency: int, duration: float, max_requests: Optional[int]) -> dict:
+        counter = [0]
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(self.worker(deadline, max_requests, counter) for _ in range(concurrency)))
+        return summarize(self.recorder, time.perf_counter() - start)
+
+
+async def load_fixtures() -> dict:
+    """Đọc id có sẵn trong DB để scenario chỉ dùng dữ liệu tồn tại."""
+    from sqlalchemy import select
+    from db import AsyncSessionLocal
+    from models import User, UserRole, MenuItem
+
+    async with AsyncSessionLocal() as db:
+        customers = (await db.execute(select(User.uid).where(User.role == UserRole.customer).limit(1000))).scalars().all()
+        shippers = (await db.execute(select(User.uid).where(User.role == UserRole.shipper).limit(1000))).scalars().all()
+        items = (await db.execute(select(MenuItem.restaurant_id, MenuItem.item_id).limit(5000))).all()
+    if not customers or not shippers or not items:
+        raise SystemExit("Database has no customers/shippers/menu items - run with --seed first")
+    return {
+        "customer_uids": list(customers),
+        "shipper_uids": list(shippers),
+        "menu_items": [tuple(row) for row in items],
+        "restaurant_ids": sorted({row[0] for row in items}),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(result: dict, baseline: dict, max_regression: float) -> bool:
+    """In bảng so sánh p95 và trả về False nếu có route chậm hơn ngưỡng cho phép."""
+    ok = True
+    print(f"\n{'route':<55}{'base p95':>10}{'p95':>10}{'delta':>9}")
+    for route, stats in result["routes"].items():
+        base = baseline["routes"].get(route)
+        if not base or not base["p95_ms"]:
+            print(f"{route:<55}{'-':>10}{stats['p95_ms']:>10.2f}{'new':>9}")
+            continue
+        delta = (stats["p95_ms"] - base["p95_ms"]) / base["p95_ms"] * 100
+        flag = ""
+        if delta > max_regression:
+            ok = False
+            flag = "  REGRESSION"
+        print(f"{route:<55}{base['p95_ms']:>10.2f}{stats['p95_ms']:>10.2f}{delta:>8.1f}%{flag}")
+    return ok
+
+
+def print_report(result: dict):
+    print(f"{'route':<55}{'count':>8}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for route, s in [*result["routes"].items(), ("TOTAL", result["total"])]:
+        print(f"{route:<55}{s['count']:>8}{s['errors']:>6}{s['rps']:>9.1f}{s['p50_ms']:>9.2f}{s['p95_ms']:>9.2f}{s['p99_ms']:>9.2f}")
+
+
+async def main(args):
+    if args.seed:
+        from benchmarks.dataset import build_dataset
+        from db import engine
+        await build_dataset(engine, args.seed_orders, args.random_seed, drop=True)
+    fixtures = await load_fixtures()
+
+    mix = dict(DEFAULT_MIX)
+    for item in args.mix or []:
+        name, weight = item.split("=")
+        mix[name] = int(weight)
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30) as client:
+            simulation = Simulation(client, fixtures, mix, random.Random(args.random_seed))
+            result = await simulation.run(args.concurrency, args.duration, args.requests)
+    else:
+        from main import app
+        from db import dispose_engines
+        # ASGITransport không chạy lifespan, nên tự chạy để có warm-up giống production
+        await dispose_engines()
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", limits=limits, timeout=30) as client:
+                simulation = Simulation(client, fixtures, mix, random.Random(args.random_seed))
+                result = await simulation.run(args.concurrency, args.duration, args.requests)
+
+    result["meta"] = {
+        "revision": git_revision(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "target": args.url or "in-process",
+        "database": os.getenv("DATABASE_URL", "").split("@")[-1],
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "mix": mix,
+        "python": platform.python_version(),
+    }
+    print_report(result)
+
+    output = args.output or os.path.join(BASELINE_DIR, f"{result['meta']['revision'] or 'local'}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"\nSaved {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if not compare(result, baseline, args.max_regression):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="base URL of a running server (default: in-process main.app)")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--requests", type=int, help="stop after this many requests")
+    parser.add_argument("--mix", nargs="*", metavar="SCENARIO=WEIGHT", help=f"override weights of {list(DEFAULT_MIX)}")
+    parser.add_argument("--random-seed", type=int, default=42)
+    parser.add_argument("--seed", action="store_true", help="recreate tables and load benchmarks.dataset before running")
+    parser.add_argument("--seed-orders", type=int, default=100_000, help="dataset size for --seed")
+    parser.add_argument("--output", help="result JSON path (default: benchmarks/baselines/<git sha>.json)")
+    parser.add_argument("--compare", help="baseline JSON to diff against")
+    parser.add_argument("--max-regression", type=float, default=10.0, help="allowed p95 increase in percent")
+    asyncio.run(main(parser.parse_args()))
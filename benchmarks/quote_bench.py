@@ -0,0 +1,53 @@
+"""
+Microbenchmark: delivery quotes for N restaurants, scalar loop vs numpy.
+
+Compares services.quote.quote_one called once per restaurant with a single
+services.quote.quote_arrays pass, checks both give the same numbers, and
+prints the time per batch and the speed-up. No database needed:
+
+    python -m benchmarks.quote_bench --sizes 10 100 1000 10000
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from services.quote import quote_arrays, quote_one
+
+CENTER_LAT, CENTER_LNG = 10.7769, 106.7009
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    print(f"{'N':>8}{'scalar ms':>12}{'numpy ms':>12}{'speed-up':>10}")
+    for n in args.sizes:
+        points = [(CENTER_LAT + rng.gauss(0, 0.05), CENTER_LNG + rng.gauss(0, 0.05)) for _ in range(n)]
+        lats = np.array([p[0] for p in points], dtype=np.float64)
+        lngs = np.array([p[1] for p in points], dtype=np.float64)
+
+        scalar = [quote_one(CENTER_LAT, CENTER_LNG, lat, lng) for lat, lng in points]
+        distance, fee, eta = quote_arrays(CENTER_LAT, CENTER_LNG, lats, lngs)
+        assert np.allclose(distance, [q[0] for q in scalar])
+        assert np.array_equal(fee, [q[1] for q in scalar]) and np.array_equal(eta, [q[2] for q in scalar])
+
+        scalar_time = best_of(args.repeat, lambda: [quote_one(CENTER_LAT, CENTER_LNG, lat, lng) for lat, lng in points])
+        numpy_time = best_of(args.repeat, lambda: quote_arrays(CENTER_LAT, CENTER_LNG, lats, lngs))
+        print(f"{n:>8}{scalar_time * 1000:>12.3f}{numpy_time * 1000:>12.3f}{scalar_time / numpy_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    main(parser.parse_args())
@@ -0,0 +1,109 @@
+"""
+Microbenchmark: encoding and compressing large list responses.
+
+Builds N in-memory rows for /menu_item/list, /order/by_restaurant and
+/restaurant/list, runs them through the same steps FastAPI does (response
+model validation from attributes + JSON-mode dump), then compares the
+stdlib JSONResponse encoder with core.responses.FastJSONResponse and the
+size/CPU cost of gzip and brotli. No database needed:
+
+    python -m benchmarks.response_bench --rows 1000
+"""
+import argparse
+import datetime
+import json
+import random
+import time
+from decimal import Decimal
+from typing import List
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from core.compression import compress, supported_encodings
+from core.responses import FastJSONResponse
+from models import MenuItem, Order, OrderStatus, PaymentMethod, Restaurant, RestaurantStatus
+from schemas.menu_item import MenuItemResponse
+from schemas.order import OrderResponse
+from schemas.restaurant import RestaurantResponse
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def payloads(n: int, rng: random.Random) -> dict:
+    now = datetime.datetime(2026, 10, 18, 12, 0)
+    menu_items = [
+        MenuItem(
+            item_id=i, restaurant_id=rng.randint(1, 500), category_id=rng.randint(1, 20),
+            name=f"Cơm gà xối mỡ số {i}", description=rng.choice([None, "Đùi gà giòn, cơm chiên, dưa leo"]),
+            price=Decimal(rng.randrange(20, 120) * 1000), available=rng.random() < 0.9,
+        )
+        for i in range(1, n + 1)
+    ]
+    orders = [
+        Order(
+            order_id=i, user_uid=f"customer_{rng.randint(1, 10000)}", restaurant_id=7, shipper_uid=None,
+            total_price=Decimal(rng.randrange(30, 500) * 1000), status=rng.choice(list(OrderStatus)),
+            address_id=rng.randint(1, 10000), admin_voucher_id=None, shop_voucher_id=None,
+            note=rng.choice([None, "Ít cay"]), payment_method=rng.choice(list(PaymentMethod)),
+            created_at=now - datetime.timedelta(minutes=i), updated_at=now,
+        )
+        for i in range(1, n + 1)
+    ]
+    restaurants = [
+        Restaurant(
+            restaurant_id=i, owner_uid=f"seller_{i}", name=f"Quán ngon #{i}", address=f"{i} Nguyễn Huệ, Q.1",
+            latitude=10.77 + rng.random() / 10, longitude=106.70 + rng.random() / 10, phone="0900000000",
+            is_favorite=False, open_time=None, close_time=None, description="Cơm, bún, phở",
+            image_url=f"/static/restaurant_images/{i}.jpg", status=RestaurantStatus.open, request=None,
+            rating=round(rng.uniform(3, 5), 2), rating_count=rng.randint(0, 2000), created_at=now, updated_at=now,
+        )
+        for i in range(1, n + 1)
+    ]
+    return {
+        "/menu_item/list": (TypeAdapter(List[MenuItemResponse]), menu_items),
+        "/order/by_restaurant": (TypeAdapter(List[OrderResponse]), orders),
+        "/restaurant/list": (TypeAdapter(List[RestaurantResponse]), restaurants),
+    }
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    stdlib, fast = JSONResponse(None), FastJSONResponse(None)
+    encodings = supported_encodings()
+    print(f"{args.rows} rows per response, best of {args.repeat}; times in ms")
+    header = f"{'endpoint':<22}{'model':>8}{'json':>8}{'orjson':>8}{'speed-up':>10}{'bytes':>10}"
+    for encoding in encodings:
+        header += f"{encoding + ' bytes':>12}{encoding + ' ms':>9}"
+    print(header)
+    for endpoint, (adapter, rows) in payloads(args.rows, rng).items():
+        content = adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+        body = fast.render(content)
+        assert json.loads(body) == json.loads(stdlib.render(content)), endpoint
+
+        model_time = best_of(args.repeat, lambda: adapter.dump_python(
+            adapter.validate_python(rows, from_attributes=True), mode="json"))
+        json_time = best_of(args.repeat, lambda: stdlib.render(content))
+        orjson_time = best_of(args.repeat, lambda: fast.render(content))
+        line = (f"{endpoint:<22}{model_time * 1000:>8.2f}{json_time * 1000:>8.2f}{orjson_time * 1000:>8.2f}"
+                f"{json_time / orjson_time:>9.1f}x{len(body):>10}")
+        for encoding in encodings:
+            compressed = compress(body, encoding)
+            compress_time = best_of(args.repeat, lambda: compress(body, encoding))
+            line += f"{len(compressed):>12}{compress_time * 1000:>9.2f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    main(parser.parse_args())
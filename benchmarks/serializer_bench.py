@@ -0,0 +1,60 @@
+"""
+Microbenchmark: the response_model path vs core.serializers for list endpoints.
+
+Uses the same in-memory rows as response_bench (menu items get images so the
+nested schema is exercised) and times, per endpoint:
+
+  model      TypeAdapter(List[Schema]) validate_python(from_attributes) + dump_python(json)
+             -- what FastAPI does for response_model=List[Schema]
+  serializer core.serializers.serialize_many (precompiled, no validation)
+  fields     serialize_many with a ?fields= subset (column tuples / Row path)
+
+Both full paths must give byte-identical JSON. No database needed:
+
+    python -m benchmarks.serializer_bench --rows 1000
+"""
+import argparse
+import random
+
+from benchmarks.response_bench import best_of, payloads
+from core.responses import dumps
+from core.serializers import serialize_many
+from models import MenuItemImage
+
+FIELDS = {
+    "/menu_item/list": ("item_id", "name", "price"),
+    "/order/by_restaurant": ("order_id", "status", "total_price", "created_at"),
+    "/restaurant/list": ("restaurant_id", "name", "image_url", "rating"),
+}
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    data = payloads(args.rows, rng)
+    for item in data["/menu_item/list"][1]:
+        item.images = [
+            MenuItemImage(image_id=item.item_id * 3 + k, item_id=item.item_id,
+                          image_url=f"/static/menu_images/{item.item_id}_{k}.jpg", is_primary=k == 0)
+            for k in range(rng.randint(0, 3))
+        ]
+    print(f"{args.rows} rows per response, best of {args.repeat}; times in ms (encode with orjson included)")
+    print(f"{'endpoint':<22}{'model':>9}{'serializer':>12}{'speed-up':>10}{'fields':>9}")
+    for endpoint, (adapter, rows) in data.items():
+        schema = adapter._type.__args__[0]
+        model = lambda: dumps(adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json"))
+        fast = lambda: dumps(serialize_many(schema, rows))
+        assert model() == fast(), endpoint
+        fields = FIELDS[endpoint]
+        model_time = best_of(args.repeat, model)
+        fast_time = best_of(args.repeat, fast)
+        fields_time = best_of(args.repeat, lambda: dumps(serialize_many(schema, rows, fields)))
+        print(f"{endpoint:<22}{model_time * 1000:>9.2f}{fast_time * 1000:>12.2f}"
+              f"{model_time / fast_time:>9.1f}x{fields_time * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    main(parser.parse_args())
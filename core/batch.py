@@ -0,0 +1,34 @@
+from typing import Any, Callable, Iterable, List
+
+from fastapi import HTTPException
+
+from config import BATCH_GET_MAX_IDS
+
+# Mô tả dùng chung cho tham số ?ids= của các endpoint /batch
+IDS_DESCRIPTION = f"Danh sách id phân tách bằng dấu phẩy, tối đa {BATCH_GET_MAX_IDS} id (VD: 3,1,7)."
+
+
+def parse_ids(ids: str, cast: Callable[[str], Any] = int) -> List[Any]:
+    """"3,1,3" -> [3, 1]: bỏ trùng, giữ thứ tự; 400 nếu rỗng, sai kiểu hoặc quá BATCH_GET_MAX_IDS."""
+    parsed = {}
+    for raw in (part.strip() for part in ids.split(",")):
+        if not raw:
+            continue
+        try:
+            parsed[cast(raw)] = None
+        except ValueError:
+            raise HTTPException(400, f"Invalid id: {raw}")
+    if not parsed:
+        raise HTTPException(400, "ids is required")
+    if len(parsed) > BATCH_GET_MAX_IDS:
+        raise HTTPException(400, f"Too many ids: {len(parsed)} > {BATCH_GET_MAX_IDS}")
+    return list(parsed)
+
+
+def keyed(items: Iterable[dict], key: str, ids: List[Any]) -> dict:
+    """Kết quả (đã serialize) của một câu IN -> {"items": {id: item} theo thứ tự ids, "missing": [...]}."""
+    found = {item[key]: item for item in items}
+    return {
+        "items": {i: found[i] for i in ids if i in found},
+        "missing": [i for i in ids if i not in found],
+    }
@@ -0,0 +1,78 @@
+import datetime
+import hashlib
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import inspect
+
+
+def fingerprint(objects: Iterable) -> str:
+    """
+    Weak ETag từ giá trị các cột đã load của các ORM object (không chạm relationship,
+    không serialize response). Dùng giá trị cột thay vì chỉ updated_at vì DATETIME
+    của MySQL chỉ chính xác tới giây.
+    """
+    digest = hashlib.sha1()
+    for obj in objects:
+        mapper = inspect(obj).mapper
+        digest.update(repr([getattr(obj, attr.key) for attr in mapper.column_attrs]).encode())
+    return f'W/"{digest.hexdigest()[:16]}"'
+
+
+def last_modified_of(objects: Iterable) -> Optional[datetime.datetime]:
+    stamps = [obj.updated_at for obj in objects if getattr(obj, "updated_at", None)]
+    return max(stamps) if stamps else None
+
+
+def http_date(moment: datetime.datetime) -> str:
+    # updated_at lưu theo giờ local (datetime.now), header HTTP theo GMT
+    return format_datetime(moment.astimezone(datetime.timezone.utc).replace(microsecond=0), usegmt=True)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match theo so sánh weak (bỏ tiền tố W/), hỗ trợ danh sách và "*"."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == bare for tag in header.split(","))
+
+
+def not_modified_since(request: Request, last_modified: Optional[datetime.datetime]) -> bool:
+    header = request.headers.get("if-modified-since")
+    if not header or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=datetime.timezone.utc)
+    return last_modified.astimezone(datetime.timezone.utc).replace(microsecond=0) <= since
+
+
+def conditional(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime.datetime] = None,
+) -> Optional[Response]:
+    """
+    Gắn ETag/Last-Modified vào response của endpoint. Nếu client đã có bản này thì trả
+    về Response 304 để endpoint return luôn (FastAPI bỏ qua response_model), không thì None.
+    If-None-Match được ưu tiên; If-Modified-Since chỉ xét khi không có If-None-Match.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    if "if-none-match" in request.headers:
+        fresh = etag_matches(request, etag)
+    else:
+        fresh = not_modified_since(request, last_modified)
+    if fresh:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,53 @@
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.engine import Result
+from sqlalchemy.future import select
+
+# Mô tả dùng chung cho tham số ?fields= của các endpoint danh sách
+FIELDS_DESCRIPTION = (
+    "Chỉ lấy các cột này, phân tách bằng dấu phẩy (VD: name,price). "
+    "Response chỉ có các field đã chọn cùng khoá chính."
+)
+
+
+@lru_cache(maxsize=None)
+def selectable_fields(schema: Type[BaseModel], model) -> frozenset:
+    """Field của schema ứng với một cột của model (relationship như images không chọn được)."""
+    columns = {attr.key for attr in inspect(model).column_attrs}
+    return frozenset(name for name in schema.model_fields if name in columns)
+
+
+def parse_fields(
+    fields: Optional[str], schema: Type[BaseModel], model, required: Sequence[str] = ()
+) -> Optional[Tuple[str, ...]]:
+    """
+    "name,price" -> ("item_id", "name", "price") theo thứ tự field của schema, luôn kèm
+    `required` (khoá chính, cột sắp xếp của cursor). None = không truyền fields, lấy đủ entity.
+    """
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    allowed = selectable_fields(schema, model)
+    unknown = requested - allowed
+    if unknown:
+        raise HTTPException(
+            400, f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(sorted(allowed))}"
+        )
+    wanted = requested | set(required)
+    return tuple(name for name in schema.model_fields if name in wanted)
+
+
+def select_fields(model, fields: Optional[Sequence[str]]):
+    """select(Model) hoặc select chỉ các cột (không qua identity map, không load cột Text thừa)."""
+    if fields is None:
+        return select(model)
+    return select(*(getattr(model, name) for name in fields))
+
+
+def fetch_all(result: Result, fields: Optional[Sequence[str]]) -> list:
+    return list(result.scalars().all()) if fields is None else list(result.all())
+
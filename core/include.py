@@ -0,0 +1,90 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel, create_model
+from sqlalchemy.orm import joinedload, selectinload
+
+from core.serializers import serializer
+
+# Mô tả dùng chung cho tham số ?include= (danh sách quan hệ của từng endpoint nối vào sau)
+INCLUDE_DESCRIPTION = "Kèm dữ liệu liên quan, phân tách bằng dấu phẩy; quan hệ lồng nhau dùng dấu chấm."
+
+
+@dataclass(frozen=True)
+class Expansion:
+    """Một quan hệ có thể include: relationship của ORM và schema để serialize đích."""
+    attr: Any
+    schema: Type[BaseModel]
+    # Relationship mà chính `schema` đọc (VD: MenuItemResponse.images), luôn được load kèm
+    requires: Tuple[Any, ...] = ()
+
+    @property
+    def many(self) -> bool:
+        return self.attr.property.uselist
+
+
+class Includes:
+    """
+    ?include=order_items.menu_item,restaurant -> loader options + response lồng nhau.
+
+    Mỗi quan hệ được load theo lô: collection bằng selectinload (1 câu IN cho cả trang),
+    many-to-one bằng joinedload; số câu SQL chỉ phụ thuộc số quan hệ được include,
+    không phụ thuộc số dòng. Quan hệ không include không bị chạm tới khi serialize.
+    """
+
+    def __init__(self, schema: Type[BaseModel], expansions: Dict[str, Expansion]):
+        self.schema = schema
+        self.expansions = expansions
+        self._models: Dict[Tuple[str, ...], Type[BaseModel]] = {}
+
+    @property
+    def description(self) -> str:
+        return f"{INCLUDE_DESCRIPTION} Có: {', '.join(self.expansions)}"
+
+    def parse(self, include: Optional[str]) -> Tuple[str, ...]:
+        """Các path đã kiểm tra (kèm path cha), sắp xếp; () nếu không include gì."""
+        if not include:
+            return ()
+        paths = set()
+        for path in (p.strip() for p in include.split(",")):
+            if not path:
+                continue
+            if path not in self.expansions:
+                raise HTTPException(400, f"Unknown include: {path}. Allowed: {', '.join(self.expansions)}")
+            parts = path.split(".")
+            paths.update(".".join(parts[:i]) for i in range(1, len(parts) + 1))
+        return tuple(sorted(paths))
+
+    def options(self, paths: Sequence[str]) -> list:
+        options = []
+        for path in paths:
+            loader = None
+            parts = path.split(".")
+            for i in range(1, len(parts) + 1):
+                expansion = self.expansions[".".join(parts[:i])]
+                strategy = selectinload if expansion.many else joinedload
+                loader = strategy(expansion.attr) if loader is None else getattr(loader, strategy.__name__)(expansion.attr)
+            for attr in self.expansions[path].requires:
+                options.append(loader.selectinload(attr))
+            options.append(loader)
+        return options
+
+    def _model(self, schema: Type[BaseModel], prefix: str, paths: Sequence[str]) -> Type[BaseModel]:
+        children = {p[len(prefix):].split(".")[0] for p in paths if p.startswith(prefix)}
+        if not children:
+            return schema
+        fields = {}
+        for name in sorted(children):
+            expansion = self.expansions[prefix + name]
+            child = self._model(expansion.schema, f"{prefix}{name}.", paths)
+            fields[name] = (List[child], []) if expansion.many else (Optional[child], None)
+        return create_model(f"{schema.__name__}Expanded", __base__=schema, **fields)
+
+    def dump(self, objs: Any, paths: Tuple[str, ...], many: bool = True) -> Any:
+        """ORM object(s) -> dữ liệu JSON-able theo schema gốc kèm các quan hệ trong paths."""
+        model = self._models.get(paths)
+        if model is None:
+            model = self._models[paths] = self._model(self.schema, "", paths)
+        serialize = serializer(model)
+        return [serialize(obj) for obj in objs] if many else serialize(objs)
@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+from sqlalchemy.orm import configure_mappers
+
+from config import (
+    CATEGORY_COUNT_RECONCILE_INTERVAL, DB_POOL_SIZE, DB_POOL_WARMUP, DB_PRECOMPILE_STATEMENTS,
+    SEARCH_INDEX_REFRESH_INTERVAL, AUTOCOMPLETE_REFRESH_INTERVAL, GEO_INDEX_REFRESH_INTERVAL,
+    SCHEDULE_REFRESH_INTERVAL, RATING_RECONCILE_INTERVAL,
+)
+from db import AsyncSessionLocal, advisory_lock, dispose_engines, engine, read_replicas
+from services.autocomplete import build_suggestions
+from services.banner import list_banners
+from services.cart_item import list_cart_items
+from services.category import get_category, list_categories, reconcile_category_counts
+from services.geo import build_geo_index
+from services.menu_item import get_menu_item, list_menu_items, list_menu_items_by_restaurant_id, list_menu_items_page
+from services.order import get_order, get_orders_by_restaurant, get_orders_by_shipper, get_orders_by_user, get_orders_by_user_page
+from services.restaurant import get_restaurant, list_restaurants, list_restaurants_page
+from services.review import reconcile_restaurant_ratings
+from services.schedule import build_open_intervals, run_status_scheduler, sync_all_statuses
+from services.search import build_search_index
+from services.user import get_user
+from services.voucher import list_vouchers_by_resid
+
+logger = logging.getLogger("shopeefood.startup")
+
+# Các truy vấn đọc nóng nhất, gọi với id không tồn tại để chỉ tốn 1 round trip rỗng.
+# Cache key của SQLAlchemy không phụ thuộc giá trị tham số nên câu SQL đã compile
+# được dùng lại cho request thật.
+HOT_READS = [
+    lambda db: list_restaurants(db, 0, 1),
+    lambda db: list_restaurants_page(db, None, 1),
+    lambda db: get_restaurant(db, 0),
+    lambda db: list_menu_items(db, 0, 1),
+    lambda db: list_menu_items_page(db, None, 1),
+    lambda db: list_menu_items_by_restaurant_id(db, 0),
+    lambda db: get_menu_item(db, 0),
+    lambda db: list_categories(db, 0, 1),
+    lambda db: get_category(db, 0),
+    lambda db: list_banners(db),
+    lambda db: list_banners(db, "active"),
+    lambda db: list_vouchers_by_resid(db, 0, 0, 1),
+    lambda db: get_user(db, ""),
+    lambda db: list_cart_items(db, "", 0),
+    lambda db: get_order(db, 0),
+    lambda db: get_orders_by_user(db, "", 0, 1),
+    lambda db: get_orders_by_user_page(db, "", None, 1),
+    lambda db: get_orders_by_restaurant(db, 0, 0, 1),
+    lambda db: get_orders_by_shipper(db, "", 0, 1),
+]
+
+
+async def warm_up_pool(target: AsyncEngine, connections: int) -> int:
+    """Mở đồng thời `connections` connection rồi trả lại pool."""
+    connections = min(connections, DB_POOL_SIZE)
+    if connections <= 0:
+        return 0
+    barrier = asyncio.Barrier(connections)
+
+    async def hold_one():
+        async with target.connect() as conn:
+            await conn.exec_driver_sql("SELECT 1")
+            # Giữ connection tới khi tất cả cùng mở, để pool phải tạo đủ số lượng
+            await barrier.wait()
+
+    await asyncio.gather(*(hold_one() for _ in range(connections)))
+    return connections
+
+
+async def precompile_hot_statements(session_maker: async_sessionmaker) -> int:
+    async with session_maker() as db:
+        for read in HOT_READS:
+            await read(db)
+        await db.rollback()
+    return len(HOT_READS)
+
+
+async def run_periodically(name: str, interval: float, job) -> None:
+    """Chạy job() mỗi `interval` giây cho tới khi bị cancel; lỗi chỉ ghi log, không dừng vòng lặp."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await job()
+        except Exception:
+            logger.exception("Background job %s failed", name)
+
+
+async def reconcile_categories_job() -> None:
+    # Mọi worker đều lên lịch job này; chỉ worker giữ được khoá mới chạy UPDATE
+    async with advisory_lock(engine, "shopeefood.reconcile_category_counts") as leader:
+        if not leader:
+            return
+        async with AsyncSessionLocal() as db:
+            fixed = await reconcile_category_counts(db)
+    if fixed:
+        logger.warning("Reconciled product_count of %d categories", fixed)
+
+
+async def reconcile_ratings_job() -> None:
+    async with advisory_lock(engine, "shopeefood.reconcile_restaurant_ratings") as leader:
+        if not leader:
+            return
+        async with AsyncSessionLocal() as db:
+            fixed = await reconcile_restaurant_ratings(db)
+    if fixed:
+        logger.warning("Reconciled rating aggregates of %d restaurants", fixed)
+
+
+async def refresh_search_index_job() -> None:
+    async with AsyncSessionLocal() as db:
+        await build_search_index(db)
+
+
+async def refresh_suggestions_job() -> None:
+    async with AsyncSessionLocal() as db:
+        await build_suggestions(db)
+
+
+async def refresh_geo_index_job() -> None:
+    async with AsyncSessionLocal() as db:
+        await build_geo_index(db)
+
+
+async def sync_schedule_statuses() -> int:
+    """
+    Đồng bộ open/closed của mọi quán có lịch: UPDATE theo lô trên toàn bảng, nên chỉ worker
+    giữ được khoá chạy; worker khác vẫn tự build open_intervals của mình.
+    """
+    async with advisory_lock(engine, "shopeefood.sync_schedule_statuses") as leader:
+        if not leader:
+            return 0
+        async with AsyncSessionLocal() as db:
+            return await sync_all_statuses(db)
+
+
+async def refresh_schedules_job() -> None:
+    async with AsyncSessionLocal() as db:
+        await build_open_intervals(db)
+    await sync_schedule_statuses()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started_at = getattr(app.state, "started_at", time.perf_counter())
+    warmup_started = time.perf_counter()
+
+    configure_mappers()
+    engines = [engine, *read_replicas.engines]
+    session_makers = [AsyncSessionLocal, *read_replicas.session_makers]
+    pooled = await asyncio.gather(*(warm_up_pool(e, DB_POOL_WARMUP) for e in engines))
+    statements = 0
+    if DB_PRECOMPILE_STATEMENTS:
+        for session_maker in session_makers:
+            statements += await precompile_hot_statements(session_maker)
+    async with AsyncSessionLocal() as db:
+        search_documents = await build_search_index(db)
+        suggestion_phrases = await build_suggestions(db)
+        located_restaurants = await build_geo_index(db)
+        scheduled_restaurants = await build_open_intervals(db)
+    await sync_schedule_statuses()
+
+    ready_at = time.perf_counter()
+    app.state.startup = {
+        "cold_start_ms": round((ready_at - started_at) * 1000, 1),
+        "warmup_ms": round((ready_at - warmup_started) * 1000, 1),
+        "pooled_connections": list(pooled),
+        "precompiled_statements": statements,
+        "search_documents": search_documents,
+        "suggestion_phrases": suggestion_phrases,
+        "located_restaurants": located_restaurants,
+        "scheduled_restaurants": scheduled_restaurants,
+    }
+    logger.info("Ready in %.1f ms (warm-up %.1f ms)", app.state.startup["cold_start_ms"], app.state.startup["warmup_ms"])
+
+    jobs = [asyncio.create_task(run_status_scheduler(AsyncSessionLocal))]
+    if CATEGORY_COUNT_RECONCILE_INTERVAL > 0:
+        jobs.append(asyncio.create_task(
+            run_periodically("reconcile_category_counts", CATEGORY_COUNT_RECONCILE_INTERVAL, reconcile_categories_job)
+        ))
+    if RATING_RECONCILE_INTERVAL > 0:
+        jobs.append(asyncio.create_task(
+            run_periodically("reconcile_restaurant_ratings", RATING_RECONCILE_INTERVAL, reconcile_ratings_job)
+        ))
+    if SEARCH_INDEX_REFRESH_INTERVAL > 0:
+        jobs.append(asyncio.create_task(
+            run_periodically("refresh_search_index", SEARCH_INDEX_REFRESH_INTERVAL, refresh_search_index_job)
+        ))
+    if AUTOCOMPLETE_REFRESH_INTERVAL > 0:
+        jobs.append(asyncio.create_task(
+            run_periodically("refresh_suggestions", AUTOCOMPLETE_REFRESH_INTERVAL, refresh_suggestions_job)
+        ))
+    if GEO_INDEX_REFRESH_INTERVAL > 0:
+        jobs.append(asyncio.create_task(
+            run_periodically("refresh_geo_index", GEO_INDEX_REFRESH_INTERVAL, refresh_geo_index_job)
+        ))
+    if SCHEDULE_REFRESH_INTERVAL > 0:
+        jobs.append(asyncio.create_task(
+            run_periodically("refresh_schedules", SCHEDULE_REFRESH_INTERVAL, refresh_schedules_job)
+        ))
+    try:
+        yield
+    finally:
+        for job in jobs:
+            job.cancel()
+        await asyncio.gather(*jobs, return_exceptions=True)
+        await dispose_engines()
@@ -0,0 +1,77 @@
+import base64
+import datetime
+import json
+from typing import Any, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import Select, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import MAX_PAGE_SIZE
+
+
+def clamp_limit(limit: int) -> int:
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = [v.isoformat() if isinstance(v, datetime.datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(columns):
+            raise ValueError
+        values = []
+        for value, column in zip(payload, columns):
+            python_type = column.type.python_type
+            if python_type is datetime.datetime:
+                value = datetime.datetime.fromisoformat(value)
+            elif not isinstance(value, python_type):
+                raise ValueError
+            values.append(value)
+        return values
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise HTTPException(400, "Invalid cursor")
+
+
+def _after(columns: Sequence, values: Sequence, descending: bool):
+    """(c1, c2, ...) > (v1, v2, ...) viết dạng OR/AND để MySQL dùng được range trên index."""
+    clauses = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        prefix = [c == v for c, v in zip(columns[:i], values[:i])]
+        clauses.append(and_(*prefix, column < value if descending else column > value))
+    return or_(*clauses)
+
+
+async def paginate(
+    db: AsyncSession,
+    stmt: Select,
+    sort_columns: Sequence,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = False,
+) -> tuple[list, Optional[str]]:
+    """
+    Keyset pagination: sort_columns must end with a unique column (usually the
+    primary key). Returns (rows, next_cursor); next_cursor is None on the last page.
+    A column-only stmt must select the sort columns.
+    """
+    limit = clamp_limit(limit)
+    if cursor:
+        stmt = stmt.where(_after(sort_columns, decode_cursor(cursor, sort_columns), descending))
+    order = [c.desc() for c in sort_columns] if descending else list(sort_columns)
+    result = await db.execute(stmt.order_by(*order).limit(limit + 1))
+    entity = stmt.column_descriptions[0]
+    # select(Model) -> object; select(các cột) -> Row (vẫn đọc được cột bằng getattr)
+    rows = list(result.scalars().all() if entity["type"] is entity["entity"] else result.all())
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in sort_columns])
+    return rows, next_cursor
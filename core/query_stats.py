@@ -0,0 +1,158 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from config import (
+    DB_QUERY_BUDGET,
+    DB_QUERY_BUDGETS,
+    DB_QUERY_BUDGET_STRICT,
+    DB_N_PLUS_ONE_THRESHOLD,
+)
+
+logger = logging.getLogger("shopeefood.db")
+
+# Gộp danh sách placeholder của IN (...) / VALUES (...) để các câu chỉ khác số phần tử có chung shape
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    return _PLACEHOLDER_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    total_time: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+    def repeated(self, threshold: int = DB_N_PLUS_ONE_THRESHOLD) -> dict[str, int]:
+        return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        context._query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    started_at = getattr(context, "_query_started_at", None)
+    if stats is None or started_at is None:
+        return
+    stats.count += 1
+    stats.total_time += time.perf_counter() - started_at
+    stats.shapes[statement_shape(statement)] += 1
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def track_queries(budget: Optional[int] = None):
+    """
+    Count the SQL statements run inside the block:
+
+        with track_queries(budget=3) as stats:
+            await list_restaurants(db)
+
+    Raises QueryBudgetExceeded on exit when more than `budget` statements ran.
+    """
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+    if budget is not None and stats.count > budget:
+        raise QueryBudgetExceeded(
+            f"{stats.count} queries > budget {budget}; repeated: {stats.repeated(2)}"
+        )
+
+
+def route_budget(route: str) -> int:
+    return DB_QUERY_BUDGETS.get(route, DB_QUERY_BUDGET)
+
+
+class QueryStatsMiddleware:
+    """
+    Per-request SQL statistics. Adds X-DB-Query-Count / X-DB-Time-Ms headers,
+    logs N+1 candidates (same statement shape repeated in one request) and
+    enforces the query budgets from config.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        blocked = False
+
+        async def send_wrapper(message):
+            nonlocal blocked
+            if blocked:
+                return
+            if message["type"] == "http.response.start":
+                route = scope.get("route")
+                route_name = f"{scope['method']} {route.path if route else scope['path']}"
+                budget = route_budget(route_name)
+                db_ms = round(stats.total_time * 1000, 3)
+                repeated = stats.repeated()
+                logger.info(
+                    "%s queries=%d db_ms=%.3f",
+                    route_name, stats.count, db_ms,
+                    extra={"route": route_name, "db_queries": stats.count, "db_time_ms": db_ms},
+                )
+                for shape, n in repeated.items():
+                    logger.warning("Possible N+1 on %s: %d x %s", route_name, n, shape)
+                if budget and stats.count > budget:
+                    logger.warning("%s ran %d queries (budget %d)", route_name, stats.count, budget)
+                    if DB_QUERY_BUDGET_STRICT:
+                        blocked = True
+                        body = json.dumps({
+                            "detail": f"Query budget exceeded: {stats.count} > {budget}",
+                            "repeated": repeated,
+                        }).encode()
+                        await send({
+                            "type": "http.response.start",
+                            "status": 500,
+                            "headers": [
+                                (b"content-type", b"application/json"),
+                                (b"content-length", str(len(body)).encode()),
+                            ],
+                        })
+                        await send({"type": "http.response.body", "body": body})
+                        return
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((b"x-db-time-ms", str(db_ms).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
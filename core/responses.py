@@ -0,0 +1,42 @@
+import datetime
+import decimal
+import enum
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# datetime / UUID / dataclass / numpy được orjson encode sẵn
+_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value: Any) -> Any:
+    """Các kiểu orjson không tự encode."""
+    if isinstance(value, decimal.Decimal):
+        # Giá tiền trong schemas là float; giữ cùng kiểu số trong JSON
+        return float(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Response class mặc định của app (main.py): encode bằng orjson thay cho json.dumps.
+    Với endpoint có response_model, FastAPI đã đưa dữ liệu về dạng JSON-able nên chỉ
+    còn bước encode; Decimal / Enum / model trả thẳng qua Response vẫn encode được.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,114 @@
+import collections.abc
+import decimal
+import operator
+import typing
+from functools import lru_cache
+from typing import Any, Callable, Mapping, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel
+
+from core.responses import FastJSONResponse
+
+
+def _unwrap_optional(annotation: Any) -> Any:
+    if typing.get_origin(annotation) is typing.Union:
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _to_float(value: Any) -> Any:
+    return value if value is None or type(value) is float else float(value)
+
+
+def _decimal_str(value: Any) -> Any:
+    # Giống pydantic mode="json": Decimal -> chuỗi ("122000.00")
+    if value is None:
+        return None
+    return str(value if isinstance(value, decimal.Decimal) else decimal.Decimal(str(value)))
+
+
+def _converter(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    """Hàm đưa giá trị cột về đúng dạng JSON của field; None = để nguyên cho dumps encode."""
+    annotation = _unwrap_optional(annotation)
+    origin = typing.get_origin(annotation)
+    if origin in (list, tuple, collections.abc.Sequence):
+        args = typing.get_args(annotation)
+        inner = _converter(args[0]) if args else None
+        if inner is None:
+            return None
+        return lambda values: None if values is None else [inner(v) for v in values]
+    if isinstance(annotation, type):
+        if issubclass(annotation, BaseModel):
+            nested = serializer(annotation)
+            return lambda value: None if value is None else nested(value)
+        if issubclass(annotation, float):
+            return _to_float
+        if issubclass(annotation, decimal.Decimal):
+            return _decimal_str
+    # str / Enum / datetime / dict...: orjson encode thẳng; enum.Enum (cột Enum của SQLAlchemy,
+    # kể cả khi schema khai báo str) do core.responses.dumps đổi thành value
+    return None
+
+
+@lru_cache(maxsize=256)
+def serializer(schema: Type[BaseModel], fields: Optional[Tuple[str, ...]] = None) -> Callable[[Any], dict]:
+    """
+    Serializer "biên dịch" sẵn cho một schema response: ORM object / Row / dict -> dict mà
+    core.responses.dumps encode ra đúng JSON của schema.model_validate(obj).model_dump(mode="json"),
+    nhưng không validate.
+
+    Chỉ dùng cho dữ liệu vừa đọc từ DB của chính mình: kiểu đã do cột quyết định, nên chỉ cần đọc
+    các attribute (một attrgetter cho cả hàng) và chuyển những field cần đổi dạng (Decimal, float,
+    Enum, schema lồng nhau). Field không có trên object lấy giá trị mặc định của schema.
+    """
+    names = tuple(fields) if fields is not None else tuple(schema.model_fields)
+    defaults = {
+        name: info.get_default(call_default_factory=True)
+        for name, info in schema.model_fields.items()
+        if name in names and not info.is_required()
+    }
+    converters = tuple(
+        (name, convert) for name in names
+        if (convert := _converter(schema.model_fields[name].annotation)) is not None
+    )
+    getter = operator.attrgetter(*names)
+    single = len(names) == 1
+
+    def read(obj: Any) -> dict:
+        if isinstance(obj, dict):
+            return {name: obj[name] if name in obj else defaults[name] for name in names}
+        try:
+            values = getter(obj)
+        except AttributeError:
+            return {name: getattr(obj, name, defaults.get(name)) for name in names}
+        return {names[0]: values} if single else dict(zip(names, values))
+
+    def serialize(obj: Any) -> dict:
+        data = read(obj)
+        for name, convert in converters:
+            data[name] = convert(data[name])
+        return data
+
+    return serialize
+
+
+def serialize_many(schema: Type[BaseModel], objs: Sequence, fields: Optional[Tuple[str, ...]] = None) -> list:
+    serialize = serializer(schema, fields)
+    return [serialize(obj) for obj in objs]
+
+
+def fast_list(schema: Type[BaseModel], objs: Sequence, headers: Optional[Mapping[str, str]] = None) -> FastJSONResponse:
+    """
+    Trả list ORM object không qua validate của response_model (OpenAPI vẫn lấy từ response_model).
+    headers: header đã gắn lên Response được inject vào endpoint (VD: ETag của conditional()),
+    vì FastAPI bỏ Response đó khi endpoint tự trả về một Response.
+    """
+    return FastJSONResponse(serialize_many(schema, objs), headers=headers)
+
+
+def fast_page(
+    schema: Type[BaseModel], items: Sequence, next_cursor: Optional[str], headers: Optional[Mapping[str, str]] = None
+) -> FastJSONResponse:
+    return FastJSONResponse({"items": serialize_many(schema, items), "next_cursor": next_cursor}, headers=headers)
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import uuid
+from typing import BinaryIO, Optional
+
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+from config import UPLOAD_CHUNK_SIZE, UPLOAD_MAX_IMAGE_SIZE
+
+# Kiểu ảnh nhận được -> đuôi file lưu trên đĩa
+IMAGE_TYPES = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp"}
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Kiểu thật của ảnh theo magic bytes (không tin Content-Type / đuôi file của client)."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def _too_large(max_size: int) -> HTTPException:
+    limit = f"{max_size // (1024 * 1024)}MB" if max_size >= 1024 * 1024 else f"{max_size // 1024}KB"
+    return HTTPException(400, f"Image is too large! Max {limit}.")
+
+
+def _copy_image(source: BinaryIO, directory: str, prefix: str, max_size: int, chunk_size: int) -> str:
+    """
+    Chép từng chunk từ file tạm của UploadFile sang file tạm cùng thư mục đích, dừng ngay khi
+    vượt max_size, rồi os.replace sang tên cuối (không ai thấy file ghi dở). I/O đồng bộ nên
+    phải gọi qua threadpool; bộ nhớ dùng tối đa một chunk.
+    """
+    source.seek(0)
+    head = source.read(chunk_size)
+    if not head:
+        raise HTTPException(400, "Empty file")
+    content_type = sniff_image_type(head)
+    if content_type not in IMAGE_TYPES:
+        raise HTTPException(400, "File is not an allowed image type!")
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".upload-")
+    try:
+        size = 0
+        with os.fdopen(fd, "wb") as target:
+            chunk = head
+            while chunk:
+                size += len(chunk)
+                if size > max_size:
+                    raise _too_large(max_size)
+                target.write(chunk)
+                chunk = source.read(chunk_size)
+        filename = f"{prefix}{uuid.uuid4().hex}{IMAGE_TYPES[content_type]}"
+        os.replace(tmp_path, os.path.join(directory, filename))
+        return filename
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+async def save_image(
+    file: UploadFile,
+    directory: str,
+    prefix: str = "",
+    max_size: int = UPLOAD_MAX_IMAGE_SIZE,
+) -> str:
+    """
+    Lưu ảnh upload vào `directory`, trả về tên file "<prefix><uuid>.<đuôi theo kiểu thật>".
+    Starlette đã spool body multipart ra SpooledTemporaryFile; ở đây không read() cả file mà
+    chép dần trong threadpool, nên upload song song không chặn event loop.
+    """
+    if file.content_type not in IMAGE_TYPES:
+        raise HTTPException(400, "File is not an allowed image type!")
+    # Biết trước kích thước (Starlette đếm khi parse) thì từ chối luôn, khỏi chép
+    if file.size is not None and file.size > max_size:
+        raise _too_large(max_size)
+    return await run_in_threadpool(_copy_image, file.file, directory, prefix, max_size, UPLOAD_CHUNK_SIZE)
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def remove_file(directory: str, url: Optional[str]) -> None:
+    """Xoá file ứng với URL /static/... đã lưu (bỏ qua nếu không còn trên đĩa)."""
+    if url:
+        await run_in_threadpool(_remove, os.path.join(directory, os.path.basename(url)))
@@ -1,11 +1,320 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+import hashlib
+import hmac
+import itertools
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from http.cookies import SimpleCookie
+from typing import Optional
 
-from config import DATABASE_URL
+from fastapi import Request
+from sqlalchemy import event, exc, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-engine = create_async_engine(DATABASE_URL, echo=True)
-AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+from config import (
+    DATABASE_URL,
+    DB_ECHO,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_CONNECT_TIMEOUT,
+    DB_EXPIRE_ON_COMMIT,
+    DB_AUTOFLUSH,
+    DATABASE_REPLICA_URLS,
+    DB_REPLICA_STRATEGY,
+    DB_REPLICA_MAX_LAG,
+    DB_REPLICA_LAG_CHECK_INTERVAL,
+    DB_READ_YOUR_WRITES_SECONDS,
+    DB_STICKY_COOKIE_SECRET,
+    DB_QUERY_STATS,
+)
+from core.query_stats import instrument_engine
 
 
-async def get_db():
+@dataclass
+class PoolWaitStats:
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    QueuePool that measures how long callers wait to get a connection,
+    so queueing for the pool can be told apart from time spent in MySQL.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.wait_stats.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.wait_stats.checkouts += 1
+            self.wait_stats.wait_total += waited
+            if waited > self.wait_stats.wait_max:
+                self.wait_stats.wait_max = waited
+
+
+def build_engine(url: str) -> AsyncEngine:
+    connect_args = {}
+    if make_url(url).get_backend_name() == "mysql":
+        connect_args["connect_timeout"] = DB_CONNECT_TIMEOUT
+    engine = create_async_engine(
+        url,
+        echo=DB_ECHO,
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+    if DB_QUERY_STATS:
+        instrument_engine(engine)
+    return engine
+
+
+def get_pool_stats(engine: AsyncEngine) -> dict:
+    pool = engine.sync_engine.pool
+    stats = {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "timeout": DB_POOL_TIMEOUT,
+    }
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats:
+        stats.update(
+            checkouts=wait_stats.checkouts,
+            timeouts=wait_stats.timeouts,
+            wait_total_ms=round(wait_stats.wait_total * 1000, 3),
+            wait_avg_ms=round(wait_stats.wait_total * 1000 / wait_stats.checkouts, 3)
+            if wait_stats.checkouts else 0.0,
+            wait_max_ms=round(wait_stats.wait_max * 1000, 3),
+        )
+    return stats
+
+
+def _make_sessionmaker(bind: AsyncEngine, **info) -> async_sessionmaker:
+    return async_sessionmaker(
+        bind, expire_on_commit=DB_EXPIRE_ON_COMMIT, autoflush=DB_AUTOFLUSH, info=info
+    )
+
+
+class ReplicaSet:
+    """
+    Read replicas used by get_read_db. A replica whose replication lag is
+    above DB_REPLICA_MAX_LAG (or cannot be measured) is skipped until the
+    next lag check; when no replica is usable, reads go to the primary.
+    """
+
+    def __init__(self, urls: list[str], strategy: str, max_lag: float, lag_check_interval: float):
+        if strategy not in ("round_robin", "least_busy"):
+            raise ValueError(f"Unknown replica strategy: {strategy}")
+        self.engines = [build_engine(url) for url in urls]
+        self.session_makers = [_make_sessionmaker(e, read_only=True) for e in self.engines]
+        self.strategy = strategy
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self._lag = [0.0] * len(self.engines)
+        self._lag_checked_at = [float("-inf")] * len(self.engines)
+        self._round_robin = itertools.count()
+
+    async def _measure_lag(self, index: int) -> float:
+        engine = self.engines[index]
+        if engine.dialect.name != "mysql":
+            return 0.0
+        try:
+            async with engine.connect() as conn:
+                result = await conn.exec_driver_sql("SHOW REPLICA STATUS")
+                row = result.mappings().first()
+        except exc.DBAPIError:
+            return float("inf")
+        if row is None:
+            # Không phải replica (vd. bản sao tĩnh dùng cho test) -> không có độ trễ
+            return 0.0
+        lag = row.get("Seconds_Behind_Source")
+        return float(lag) if lag is not None else float("inf")
+
+    async def _is_fresh(self, index: int) -> bool:
+        now = time.monotonic()
+        if now - self._lag_checked_at[index] >= self.lag_check_interval:
+            self._lag_checked_at[index] = now
+            self._lag[index] = await self._measure_lag(index)
+        return self._lag[index] <= self.max_lag
+
+    async def choose(self) -> Optional[async_sessionmaker]:
+        candidates = [i for i in range(len(self.engines)) if await self._is_fresh(i)]
+        if not candidates:
+            return None
+        if self.strategy == "least_busy":
+            index = min(candidates, key=lambda i: self.engines[i].sync_engine.pool.checkedout())
+        else:
+            index = candidates[next(self._round_robin) % len(candidates)]
+        return self.session_makers[index]
+
+    def lag(self) -> list[float]:
+        return list(self._lag)
+
+
+engine = build_engine(DATABASE_URL)
+AsyncSessionLocal = _make_sessionmaker(engine)
+read_replicas = ReplicaSet(
+    DATABASE_REPLICA_URLS,
+    DB_REPLICA_STRATEGY,
+    DB_REPLICA_MAX_LAG,
+    DB_REPLICA_LAG_CHECK_INTERVAL,
+)
+
+
+# -------- READ-YOUR-WRITES --------
+# Sau khi một client ghi vào primary, các request đọc của client đó đi thẳng vào
+# primary trong DB_READ_YOUR_WRITES_SECONDS giây để không đọc phải dữ liệu cũ trên replica.
+# App chưa có xác thực nên không tin header do client gửi: mốc "đọc primary tới lúc" nằm
+# trong cookie do server ký HMAC, client không tự tạo hay kéo dài được, mọi worker dùng
+# chung DB_STICKY_COOKIE_SECRET đều kiểm tra được, và server không giữ state theo client.
+STICKY_COOKIE = "sf_primary_until"
+
+
+def _sticky_digest(value: str) -> str:
+    return hmac.new(DB_STICKY_COOKIE_SECRET.encode(), value.encode(), hashlib.sha256).hexdigest()
+
+
+def sign_sticky(until: float) -> str:
+    value = f"{until:.3f}"
+    return f"{value}.{_sticky_digest(value)}"
+
+
+def sticky_until(cookie: Optional[str]) -> float:
+    """Mốc trong cookie nếu chữ ký hợp lệ, ngược lại 0."""
+    value, _, digest = (cookie or "").rpartition(".")
+    if not value or not hmac.compare_digest(_sticky_digest(value), digest):
+        return 0.0
+    try:
+        return float(value)
+    except ValueError:
+        return 0.0
+
+
+def _read_from_primary(request: Request) -> bool:
+    return sticky_until(request.cookies.get(STICKY_COOKIE)) > time.time()
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flush_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_dml_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "before_flush")
+def _forbid_replica_writes(session, flush_context, instances):
+    if session.info.get("read_only") and (session.new or session.dirty or session.deleted):
+        raise exc.InvalidRequestError("Read-only (replica) session cannot write")
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_sticky(session):
+    if not session.info.pop("wrote", False):
+        return
+    # Chỉ ghi mốc lên request.state; ReadYourWritesMiddleware gắn cookie vào response thực
+    # sự được trả về (kể cả Response do endpoint tự tạo, vốn bỏ qua header của sub-response)
+    state = session.info.get("request_state")
+    if state is not None:
+        state.primary_until = time.time() + DB_READ_YOUR_WRITES_SECONDS
+
+
+async def get_db(request: Request):
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        session.info["request_state"] = request.state
+        yield session
+
+
+class ReadYourWritesMiddleware:
+    """Thêm Set-Cookie sf_primary_until (đã ký) vào response của request vừa commit ghi."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                until = scope.get("state", {}).get("primary_until")
+                if until is not None:
+                    cookie = SimpleCookie()
+                    cookie[STICKY_COOKIE] = sign_sticky(until)
+                    cookie[STICKY_COOKIE]["max-age"] = int(DB_READ_YOUR_WRITES_SECONDS) + 1
+                    cookie[STICKY_COOKIE]["path"] = "/"
+                    cookie[STICKY_COOKIE]["httponly"] = True
+                    headers = list(message.get("headers", []))
+                    headers.append((b"set-cookie", cookie.output(header="").strip().encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+async def get_read_db(request: Request):
+    """
+    Session for read-only endpoints: a replica when one is configured and fresh
+    enough, the primary right after this client's own write or as fallback.
+    """
+    session_maker = None
+    if read_replicas.engines and not _read_from_primary(request):
+        session_maker = await read_replicas.choose()
+    async with (session_maker or AsyncSessionLocal)() as session:
+        yield session
+
+
+@asynccontextmanager
+async def advisory_lock(target: AsyncEngine, name: str):
+    """
+    Khoá tên `name` dùng chung giữa các worker/process (MySQL GET_LOCK, không chờ).
+    Yield True nếu giữ được khoá; worker khác đang giữ thì yield False để bỏ qua lượt này.
+    Khoá gắn với connection nên giữ một connection riêng suốt khối with (session commit sẽ
+    trả connection của nó về pool). Dialect khác MySQL (SQLite dev/test) -> luôn True.
+    """
+    if target.dialect.name != "mysql":
+        yield True
+        return
+    async with target.connect() as conn:
+        acquired = (await conn.execute(text("SELECT GET_LOCK(:name, 0)"), {"name": name})).scalar()
+        try:
+            yield acquired == 1
+        finally:
+            if acquired == 1:
+                await conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": name})
+
+
+def all_engines() -> list[AsyncEngine]:
+    return [engine, *read_replicas.engines]
+
+
+async def dispose_engines():
+    for e in all_engines():
+        await e.dispose()
@@ -1,19 +1,49 @@
+import time
+
+# Mốc bắt đầu import app, dùng để đo thời gian cold start -> sẵn sàng nhận request
+STARTED_AT = time.perf_counter()
+
 from fastapi import FastAPI
 
-from routers import order, user, address, restaurant, category, menu_item, voucher, order_item, cart_item, banner
+from routers import order, user, address, restaurant, category, menu_item, voucher, order_item, cart_item, banner, review, search, system
 from fastapi.staticfiles import StaticFiles
 
-app = FastAPI()
+from config import DB_QUERY_STATS, RESPONSE_COMPRESSION
+from core.compression import CompressionMiddleware
+from core.lifespan import lifespan
+from core.query_stats import QueryStatsMiddleware
+from core.responses import FastJSONResponse
+from db import ReadYourWritesMiddleware
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+    app.state.started_at = STARTED_AT
+
+    # Cookie đọc primary sau khi ghi (xem db.py)
+    app.add_middleware(ReadYourWritesMiddleware)
+    if DB_QUERY_STATS:
+        app.add_middleware(QueryStatsMiddleware)
+    if RESPONSE_COMPRESSION:
+        # Thêm sau cùng = ngoài cùng: nén response đã có đủ header
+        app.add_middleware(CompressionMiddleware)
+
+    app.mount("/static", StaticFiles(directory="static"), name="static")
+
+    app.include_router(user.router)
+    app.include_router(address.router)
+    app.include_router(restaurant.router)
+    app.include_router(category.router)
+    app.include_router(menu_item.router)
+    app.include_router(voucher.router)
+    app.include_router(order.router)
+    app.include_router(order_item.router)
+    app.include_router(cart_item.router)
+    app.include_router(banner.router)
+    app.include_router(review.router)
+    app.include_router(search.router)
+    app.include_router(system.router)
+    return app
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
 
-app.include_router(user.router)
-app.include_router(address.router)
-app.include_router(restaurant.router)
-app.include_router(category.router)
-app.include_router(menu_item.router)
-app.include_router(voucher.router)
-app.include_router(order.router)
-app.include_router(order_item.router)
-app.include_router(cart_item.router)
-app.include_router(banner.router)
\ No newline at end of file
+app = create_app()
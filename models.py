@@ -9,6 +9,7 @@ from sqlalchemy import (
     DateTime,
     Boolean,
     ForeignKey,
+    Index,
     DECIMAL,
     Enum,
     Float,
@@ -130,7 +131,7 @@ class User(Base):
 class Address(Base):
     __tablename__ = "addresses"
     address_id = mapped_column(Integer, primary_key=True, index=True)
-    user_uid = mapped_column(String(128), ForeignKey("users.uid"))
+    user_uid = mapped_column(String(128), ForeignKey("users.uid"), index=True)
     label = mapped_column(String(50))
     receiver = mapped_column(String(100))
     phone = mapped_column(String(20))
@@ -150,22 +151,34 @@ class Address(Base):
 class Restaurant(Base):
     __tablename__ = "restaurants"
     restaurant_id = mapped_column(Integer, primary_key=True, index=True)
-    owner_uid = mapped_column(String(128), ForeignKey("users.uid"))
+    owner_uid = mapped_column(String(128), ForeignKey("users.uid"), index=True)
     name = mapped_column(String(255), nullable=False)
     address = mapped_column(Text)
+    latitude = mapped_column(Float, nullable=True)
+    longitude = mapped_column(Float, nullable=True)
     phone = mapped_column(String(20))
     open_time = mapped_column(DateTime)
     close_time = mapped_column(DateTime)
     is_favorite = mapped_column(Boolean, default=False)
     description = mapped_column(Text)
     image_url = mapped_column(String(255))
+    # open/closed được services/schedule.py tự đổi theo lịch mở cửa (nếu quán có lịch)
     status = mapped_column(
-        SqlEnum(RestaurantStatus, native_enum=False), default=RestaurantStatus.open
+        SqlEnum(RestaurantStatus, native_enum=False), default=RestaurantStatus.open, index=True
     )
     request = mapped_column(
         SqlEnum(RestaurantRequest, native_enum=False), default=RestaurantRequest.pending
     )
+    # rating = rating_sum / rating_count, cập nhật cùng transaction với mỗi review (services/review.py)
     rating = mapped_column(Float, default=0.0)
+    rating_sum = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    rating_count = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    # Số review theo từng mức sao
+    rating_1 = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    rating_2 = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    rating_3 = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    rating_4 = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    rating_5 = mapped_column(Integer, default=0, server_default="0", nullable=False)
     created_at = mapped_column(DateTime, default=datetime.datetime.now)
     updated_at = mapped_column(
         DateTime, default=datetime.datetime.now, onupdate=datetime.datetime.now
@@ -184,6 +197,22 @@ class Restaurant(Base):
     vouchers = relationship(
         "Voucher", back_populates="seller", cascade="all, delete-orphan"
     )
+    schedules = relationship(
+        "RestaurantSchedule", back_populates="restaurant", cascade="all, delete-orphan"
+    )
+
+
+# -------- RESTAURANT SCHEDULES --------
+class RestaurantSchedule(Base):
+    """Một khung giờ mở cửa trong tuần; close_minute <= open_minute = mở qua nửa đêm."""
+    __tablename__ = "restaurant_schedules"
+    schedule_id = mapped_column(Integer, primary_key=True, index=True)
+    restaurant_id = mapped_column(Integer, ForeignKey("restaurants.restaurant_id"), index=True, nullable=False)
+    weekday = mapped_column(Integer, nullable=False)  # 0 = thứ Hai ... 6 = Chủ nhật
+    open_minute = mapped_column(Integer, nullable=False)  # phút trong ngày, 0..1439
+    close_minute = mapped_column(Integer, nullable=False)
+    # relationships
+    restaurant = relationship("Restaurant", back_populates="schedules")
 
 
 class Category(Base):
@@ -192,6 +221,9 @@ class Category(Base):
     name = mapped_column(String(255), nullable=False)
     description = mapped_column(Text)
     image_url = mapped_column(String(255))
+    # Số món thuộc category; services/menu_item.py cập nhật khi thêm/xoá/đổi category,
+    # reconcile_category_counts() định kỳ sửa lại nếu bị lệch
+    productcount = mapped_column("product_count", Integer, default=0, server_default="0", nullable=False)
     created_at = mapped_column(DateTime, default=datetime.datetime.now)
     updated_at = mapped_column(
         DateTime, default=datetime.datetime.now, onupdate=datetime.datetime.now
@@ -205,9 +237,12 @@ class Category(Base):
 # -------- MENU ITEMS --------
 class MenuItem(Base):
     __tablename__ = "menu_items"
+    __table_args__ = (
+        Index("ix_menu_items_restaurant_id_category_id", "restaurant_id", "category_id"),
+    )
     item_id = mapped_column(Integer, primary_key=True, index=True)
     restaurant_id = mapped_column(Integer, ForeignKey("restaurants.restaurant_id"))
-    category_id = mapped_column(Integer, ForeignKey("categories.category_id"))
+    category_id = mapped_column(Integer, ForeignKey("categories.category_id"), index=True)
     name = mapped_column(String(255), nullable=False)
     description = mapped_column(Text)
     price = mapped_column(DECIMAL(10, 2), nullable=False)
@@ -234,7 +269,7 @@ class MenuItem(Base):
 class MenuItemImage(Base):
     __tablename__ = "menu_item_images"
     image_id = mapped_column(Integer, primary_key=True, index=True)
-    item_id = mapped_column(Integer, ForeignKey("menu_items.item_id"))
+    item_id = mapped_column(Integer, ForeignKey("menu_items.item_id"), index=True)
     image_url = mapped_column(String(255), nullable=False)
     is_primary = mapped_column(Boolean, default=False)
     created_at = mapped_column(DateTime, default=datetime.datetime.now)
@@ -248,6 +283,14 @@ class MenuItemImage(Base):
 # -------- ORDERS --------
 class Order(Base):
     __tablename__ = "orders"
+    # Lịch sử đơn của user (phân trang cursor theo created_at, mới nhất trước); theo quán /
+    # shipper / trạng thái chỉ lọc rồi sắp theo khoá chính, vốn có sẵn trong index phụ InnoDB
+    __table_args__ = (
+        Index("ix_orders_user_uid_created_at", "user_uid", "created_at"),
+        Index("ix_orders_restaurant_id", "restaurant_id"),
+        Index("ix_orders_shipper_uid", "shipper_uid"),
+        Index("ix_orders_status", "status"),
+    )
     order_id = mapped_column(Integer, primary_key=True, index=True)
     user_uid = mapped_column(String(128), ForeignKey("users.uid"))
     restaurant_id = mapped_column(Integer, ForeignKey("restaurants.restaurant_id"))
@@ -268,7 +311,7 @@ class Order(Base):
     payment_method = mapped_column(
         Enum(PaymentMethod), nullable=False, default=PaymentMethod.cod
     )
-    created_at = mapped_column(DateTime, default=datetime.datetime.now)
+    created_at = mapped_column(DateTime, default=datetime.datetime.now, index=True)
     updated_at = mapped_column(
         DateTime, default=datetime.datetime.now, onupdate=datetime.datetime.now
     )
@@ -303,7 +346,7 @@ class Order(Base):
 class OrderItem(Base):
     __tablename__ = "order_items"
     order_item_id = mapped_column(Integer, primary_key=True, index=True)
-    order_id = mapped_column(Integer, ForeignKey("orders.order_id"))
+    order_id = mapped_column(Integer, ForeignKey("orders.order_id"), index=True)
     item_id = mapped_column(Integer, ForeignKey("menu_items.item_id"))
     # quantity = mapped_column(Integer, default=1)
     # price = mapped_column(DECIMAL(10, 2))
@@ -316,6 +359,12 @@ class OrderItem(Base):
 # -------- REVIEWS --------
 class Review(Base):
     __tablename__ = "reviews"
+    # Review của quán, mới nhất trước (cursor pagination)
+    __table_args__ = (
+        Index("ix_reviews_restaurant_id_created_at", "restaurant_id", "created_at"),
+        # Mỗi đơn chỉ một review (order_id NULL thì không giới hạn)
+        Index("ix_reviews_order_id", "order_id", unique=True),
+    )
     review_id = mapped_column(Integer, primary_key=True, index=True)
     user_uid = mapped_column(String(128), ForeignKey("users.uid"))
     restaurant_id = mapped_column(Integer, ForeignKey("restaurants.restaurant_id"))
@@ -332,6 +381,9 @@ class Review(Base):
 # -------- VOUCHERS --------
 class Voucher(Base):
     __tablename__ = "vouchers"
+    __table_args__ = (
+        Index("ix_vouchers_seller_uid_code", "seller_uid", "code"),
+    )
     voucher_id = mapped_column(Integer, primary_key=True, index=True)
     code = mapped_column(String(20), unique=True)
     title = mapped_column(Text)
@@ -396,6 +448,9 @@ class SearchHistory(Base):
 
 class CartItem(Base):
     __tablename__ = "cart_items"
+    __table_args__ = (
+        Index("ix_cart_items_user_uid_restaurant_id_item_id", "user_uid", "restaurant_id", "item_id"),
+    )
     cart_item_id = mapped_column(Integer, primary_key=True, index=True)
     user_uid = mapped_column(String(128), ForeignKey("users.uid"))
     restaurant_id = mapped_column(Integer, ForeignKey("restaurants.restaurant_id"))
@@ -420,7 +475,7 @@ class Banner(Base):
     banner_id = mapped_column(Integer, primary_key=True, index=True)
     title = mapped_column(String(255), nullable=False)
     description = mapped_column(Text)
-    status = mapped_column(Enum(BannerStatus), default=BannerStatus.active, nullable=False)
+    status = mapped_column(Enum(BannerStatus), default=BannerStatus.active, nullable=False, index=True)
     image_url = mapped_column(String(255), nullable=False)
     created_at = mapped_column(DateTime, default=datetime.datetime.now)
     updated_at = mapped_column(DateTime, default=datetime.datetime.now, onupdate=datetime.datetime.now)
\ No newline at end of file
@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
+from core.pagination import clamp_limit
+from core.serializers import fast_list
 from db import get_db
 from schemas.address import (
     AddressCreate, AddressUpdate, AddressResponse
@@ -41,8 +43,8 @@ async def api_delete_address(address_id: int, db: AsyncSession = Depends(get_db)
 
 @router.get("/list/{uid}", response_model=List[AddressResponse])
 async def api_list_addresses_of_user(uid: str, skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    addresses = await list_addresses_of_user(db, uid, skip=skip, limit=limit)
-    return addresses
+    addresses = await list_addresses_of_user(db, uid, skip=skip, limit=clamp_limit(limit))
+    return fast_list(AddressResponse, addresses)
 
 @router.get("/default/{uid}", response_model=AddressResponse)
 async def api_get_default_address(uid: str, db: AsyncSession = Depends(get_db)):
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from db import get_db
+from core.conditional import conditional, fingerprint, last_modified_of
+from core.serializers import fast_list
+from db import get_db, get_read_db
 from schemas.banner import BannerCreate, BannerUpdate, BannerResponse
 from services.banner import (
     create_banner,
@@ -25,7 +27,7 @@ async def api_create_banner(
 @router.get("/detail/{banner_id}", response_model=BannerResponse)
 async def api_get_banner(
     banner_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     obj = await get_banner(db, banner_id)
     if not obj:
@@ -54,11 +56,14 @@ async def api_delete_banner(
 
 @router.get("/list", response_model=List[BannerResponse])
 async def api_list_banners(
+    request: Request,
+    response: Response,
     status: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     objs = await list_banners(db, status)
-    return objs
+    not_modified = conditional(request, response, fingerprint(objs), last_modified_of(objs))
+    return not_modified or fast_list(BannerResponse, objs, response.headers)
 
 @router.post("/upload_img")
 async def api_upload_banner_img(
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
+from core.serializers import fast_list
 from db import get_db
 from schemas.cart_item import CartItemCreate, CartItemUpdate, CartItemResponse
 from services.cart_item import (
@@ -44,7 +45,7 @@ async def api_list_cart_items(
     db: AsyncSession = Depends(get_db)
 ):
     objs = await list_cart_items(db, user_uid, restaurant_id)
-    return objs
+    return fast_list(CartItemResponse, objs)
 
 @router.delete("/clear", response_model=dict)
 async def api_clear_cart(
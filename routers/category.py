@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
-from db import get_db
+from core.conditional import conditional, fingerprint, last_modified_of
+from core.pagination import clamp_limit
+from core.serializers import fast_list
+from db import get_db, get_read_db
 from schemas.category import (
     CategoryCreate, CategoryUpdate, CategoryResponse
 )
@@ -18,7 +21,7 @@ async def api_create_category(data: CategoryCreate, db: AsyncSession = Depends(g
     return obj
 
 @router.get("/detail/{category_id}", response_model=CategoryResponse)
-async def api_get_category(category_id: int, db: AsyncSession = Depends(get_db)):
+async def api_get_category(category_id: int, db: AsyncSession = Depends(get_read_db)):
     obj = await get_category(db, category_id)
     if not obj:
         raise HTTPException(404, "Category not found")
@@ -40,12 +43,15 @@ async def api_delete_category(category_id: int, db: AsyncSession = Depends(get_d
 
 @router.get("/list", response_model=List[CategoryResponse])
 async def api_list_categories(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, gt=0),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    objs = await list_categories(db, skip, limit)
-    return objs
+    objs = await list_categories(db, skip, clamp_limit(limit))
+    not_modified = conditional(request, response, fingerprint(objs), last_modified_of(objs))
+    return not_modified or fast_list(CategoryResponse, objs, response.headers)
 
 @router.post("/upload_image", response_model=dict)
 async def api_upload_category_image(
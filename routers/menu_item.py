@@ -1,18 +1,28 @@
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, Response, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
-from db import get_db
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from core.batch import IDS_DESCRIPTION, keyed, parse_ids
+from core.conditional import conditional, fingerprint, last_modified_of
+from core.fields import FIELDS_DESCRIPTION, parse_fields
+from core.pagination import clamp_limit
+from core.responses import FastJSONResponse
+from core.serializers import fast_list, serialize_many
+from db import get_db, get_read_db
+from models import MenuItem
+from schemas.common import Batch, Page
 from schemas.menu_item import (
-    MenuItemCreate, MenuItemUpdate, MenuItemResponse,
-    MenuItemImageCreate, MenuItemImageResponse
+    MenuItemCreate, MenuItemUpdate, MenuItemResponse, MenuItemBulkUpdate, MenuItemBulkUpdateResult,
+    MenuItemImageCreate, MenuItemImageResponse, MenuImportResult
 )
 from services.menu_item import (
-    create_menu_item, get_menu_item, update_menu_item, delete_menu_item,
+    create_menu_item, get_menu_item, get_menu_items_by_ids, update_menu_item, delete_menu_item, bulk_update_menu_items,
     list_menu_items,
     add_menu_item_image, delete_menu_item_image, list_menu_item_images,
     upload_menu_image_service, upload_multi_menu_images_service, list_menu_items_by_category, list_menu_items_by_restaurant_id,
-    delete_menu_item_all_image
+    delete_menu_item_all_image, list_menu_items_page
 )
-from typing import List
+from services.menu_import import import_menu
+from typing import List, Optional
 
 router = APIRouter(prefix="/menu_item", tags=["menu_item"])
 
@@ -25,11 +35,26 @@ async def api_create_menu_item(data: MenuItemCreate, db: AsyncSession = Depends(
     return item
 
 @router.get("/detail/{item_id}", response_model=MenuItemResponse)
-async def api_get_menu_item(item_id: int, db: AsyncSession = Depends(get_db)):
+async def api_get_menu_item(
+    item_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_read_db)
+):
     item = await get_menu_item(db, item_id)
     if not item:
         raise HTTPException(404, "Menu item not found")
-    return item
+    # Ảnh nằm trong response nhưng đổi ảnh không đổi updated_at của món
+    parts = [item, *item.images]
+    return conditional(request, response, fingerprint(parts), last_modified_of(parts)) or item
+
+@router.get("/batch", response_model=Batch[int, MenuItemResponse])
+async def api_get_menu_items_batch(
+    ids: str = Query(..., description=IDS_DESCRIPTION), db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Nhiều món (kèm ảnh) trong 2 câu SQL thay cho N lần /detail; key theo item_id.
+    """
+    item_ids = parse_ids(ids)
+    items = await get_menu_items_by_ids(db, item_ids)
+    return FastJSONResponse(keyed(serialize_many(MenuItemResponse, items), "item_id", item_ids))
 
 @router.put("/update", response_model=MenuItemResponse)
 async def api_update_menu_item(data: MenuItemUpdate, db: AsyncSession = Depends(get_db)):
@@ -38,6 +63,11 @@ async def api_update_menu_item(data: MenuItemUpdate, db: AsyncSession = Depends(
         raise HTTPException(404, "Menu item not found")
     return item
 
+@router.put("/bulk_update", response_model=MenuItemBulkUpdateResult)
+async def api_bulk_update_menu_items(data: MenuItemBulkUpdate, db: AsyncSession = Depends(get_db)):
+    updated = await bulk_update_menu_items(db, data)
+    return MenuItemBulkUpdateResult(updated=updated)
+
 @router.delete("/delete/{item_id}", response_model=dict)
 async def api_delete_menu_item(item_id: int, db: AsyncSession = Depends(get_db)):
     ok = await delete_menu_item(db, item_id)
@@ -46,27 +76,59 @@ async def api_delete_menu_item(item_id: int, db: AsyncSession = Depends(get_db))
     return {"detail": "Deleted"}
 
 @router.get("/list", response_model=List[MenuItemResponse])
-async def api_list_menu_items(skip: int = Query(0, ge=0), limit: int = Query(100, gt=0), db: AsyncSession = Depends(get_db)):
-    items = await list_menu_items(db, skip, limit)
-    return items
+async def api_list_menu_items(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, gt=0),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
+    columns = parse_fields(fields, MenuItemResponse, MenuItem, required=("item_id",))
+    items = await list_menu_items(db, skip, clamp_limit(limit), columns)
+    return FastJSONResponse(serialize_many(MenuItemResponse, items, columns))
+
+@router.get("/page", response_model=Page[MenuItemResponse])
+async def api_list_menu_items_page(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, gt=0, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
+    columns = parse_fields(fields, MenuItemResponse, MenuItem, required=("item_id",))
+    items, next_cursor = await list_menu_items_page(db, cursor, limit, columns)
+    return FastJSONResponse({"items": serialize_many(MenuItemResponse, items, columns), "next_cursor": next_cursor})
 
 @router.get("/menu_items/{category_id}", response_model=List[MenuItemResponse])
 async def api_list_menu_items_by_category(
     category_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, gt=0),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    items = await list_menu_items_by_category(db, category_id, skip, limit)
-    return items
+    items = await list_menu_items_by_category(db, category_id, skip, clamp_limit(limit))
+    return fast_list(MenuItemResponse, items)
 
 @router.get("/menu_items_by_resid/{restaurant_id}", response_model=List[MenuItemResponse])
 async def api_list_menu_items_by_restaurant(
     restaurant_id: int,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
+    columns = parse_fields(fields, MenuItemResponse, MenuItem, required=("item_id",))
+    items = await list_menu_items_by_restaurant_id(db, restaurant_id, columns)
+    return FastJSONResponse(serialize_many(MenuItemResponse, items, columns))
+
+@router.post("/import/{restaurant_id}", response_model=MenuImportResult)
+async def api_import_menu(
+    restaurant_id: int,
+    file: UploadFile = File(...),
+    atomic: bool = Query(False, description="Có dòng lỗi thì không ghi dòng nào"),
     db: AsyncSession = Depends(get_db)
 ):
-    items = await list_menu_items_by_restaurant_id(db, restaurant_id)
-    return items
+    """
+    Import cả menu của quán từ CSV (có header) hoặc NDJSON (.ndjson/.jsonl).
+    Cột: item_id (tuỳ chọn), name, description, price, available, category_id hoặc category.
+    """
+    return await import_menu(db, restaurant_id, file, atomic)
 
 # ----- Menu Item Images -----
 @router.post("/image/add", response_model=MenuItemImageResponse)
@@ -75,9 +137,9 @@ async def api_add_menu_item_image(data: MenuItemImageCreate, db: AsyncSession =
     return img
 
 @router.get("/image/list/{item_id}", response_model=List[MenuItemImageResponse])
-async def api_list_menu_item_images(item_id: int, db: AsyncSession = Depends(get_db)):
+async def api_list_menu_item_images(item_id: int, db: AsyncSession = Depends(get_read_db)):
     imgs = await list_menu_item_images(db, item_id)
-    return imgs
+    return fast_list(MenuItemImageResponse, imgs)
 
 @router.delete("/image/delete/{image_id}", response_model=dict)
 async def api_delete_menu_item_image(image_id: int, db: AsyncSession = Depends(get_db)):
@@ -1,26 +1,72 @@
-from http.client import HTTPException
-from typing import List
-from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from core.batch import IDS_DESCRIPTION, keyed, parse_ids
+from core.fields import FIELDS_DESCRIPTION, parse_fields
+from core.include import Expansion, Includes
+from core.pagination import clamp_limit
+from core.responses import FastJSONResponse
+from core.serializers import fast_list, serialize_many
 from db import get_db
+from models import MenuItem, Order, OrderItem
+from schemas.address import AddressResponse
+from schemas.common import Batch, Page
+from schemas.menu_item import MenuItemResponse
 from schemas.order import OrderCreate, OrderResponse, OrderUpdate
-from services.order import create_order, delete_order, get_order, get_orders_by_restaurant, get_orders_by_shipper, get_orders_by_status, get_orders_by_user, list_orders, update_order
+from schemas.order_item import OrderItemResponse
+from schemas.restaurant import RestaurantResponse
+from schemas.review import ReviewResponse
+from services.order import create_order, delete_order, get_order, get_orders_by_ids, get_orders_by_restaurant, get_orders_by_shipper, get_orders_by_status, get_orders_by_user, list_orders, update_order, list_orders_page, get_orders_by_user_page
 
 
 router = APIRouter(prefix="/order", tags=["Order"])
 
+# ?include= của các endpoint trả về đơn hàng
+ORDER_INCLUDES = Includes(OrderResponse, {
+    "restaurant": Expansion(Order.restaurant, RestaurantResponse),
+    "address": Expansion(Order.address, AddressResponse),
+    "order_items": Expansion(Order.order_items, OrderItemResponse),
+    "order_items.menu_item": Expansion(OrderItem.menu_item, MenuItemResponse, requires=(MenuItem.images,)),
+    "reviews": Expansion(Order.reviews, ReviewResponse),
+})
+
+
+def check_fields_or_include(columns, paths) -> None:
+    if columns and paths:
+        raise HTTPException(400, "fields and include cannot be combined")
+
 @router.post("/create", response_model=OrderResponse)
 async def api_create_order(data: OrderCreate, db: AsyncSession = Depends(get_db)):  
     obj = await create_order(db, data)
     return obj
 
 @router.get("/detail/{order_id}", response_model=OrderResponse)
-async def api_get_order(order_id: int, db: AsyncSession = Depends(get_db)):
-    obj = await get_order(db, order_id)
+async def api_get_order(
+    order_id: int,
+    include: Optional[str] = Query(None, description=ORDER_INCLUDES.description),
+    db: AsyncSession = Depends(get_db)
+):
+    paths = ORDER_INCLUDES.parse(include)
+    obj = await get_order(db, order_id, ORDER_INCLUDES.options(paths))
     if not obj:
         raise HTTPException(404, "Order not found")
-    return obj
+    return FastJSONResponse(ORDER_INCLUDES.dump(obj, paths, many=False)) if paths else obj
+
+@router.get("/batch", response_model=Batch[int, OrderResponse])
+async def api_get_orders_batch(
+    ids: str = Query(..., description=IDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description=ORDER_INCLUDES.description),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Nhiều đơn theo id trong 1 câu IN (cộng 1 câu cho mỗi quan hệ include), key theo order_id.
+    """
+    order_ids = parse_ids(ids)
+    paths = ORDER_INCLUDES.parse(include)
+    objs = await get_orders_by_ids(db, order_ids, ORDER_INCLUDES.options(paths))
+    return FastJSONResponse(keyed(ORDER_INCLUDES.dump(objs, paths), "order_id", order_ids))
 
 @router.put("/update", response_model=OrderResponse)
 async def api_update_order(data: OrderUpdate, db: AsyncSession = Depends(get_db)):
@@ -40,36 +86,89 @@ async def api_delete_order(order_id: int, db: AsyncSession = Depends(get_db)):
 async def api_list_orders(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, gt=0),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description=ORDER_INCLUDES.description),
     db: AsyncSession = Depends(get_db)
 ):
-    objs = await list_orders(db, skip, limit)
-    return objs
+    columns = parse_fields(fields, OrderResponse, Order, required=("order_id",))
+    paths = ORDER_INCLUDES.parse(include)
+    check_fields_or_include(columns, paths)
+    objs = await list_orders(db, skip, clamp_limit(limit), columns, ORDER_INCLUDES.options(paths))
+    if columns:
+        return FastJSONResponse(serialize_many(OrderResponse, objs, columns))
+    return FastJSONResponse(ORDER_INCLUDES.dump(objs, paths))
+
+@router.get("/page", response_model=Page[OrderResponse])
+async def api_list_orders_page(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, gt=0, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description=ORDER_INCLUDES.description),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Newest orders first. Pass next_cursor back as ?cursor= for the next page.
+    """
+    columns = parse_fields(fields, OrderResponse, Order, required=("order_id", "created_at"))
+    paths = ORDER_INCLUDES.parse(include)
+    check_fields_or_include(columns, paths)
+    items, next_cursor = await list_orders_page(db, cursor, limit, columns, ORDER_INCLUDES.options(paths))
+    if columns:
+        return FastJSONResponse({"items": serialize_many(OrderResponse, items, columns), "next_cursor": next_cursor})
+    return FastJSONResponse({"items": ORDER_INCLUDES.dump(items, paths), "next_cursor": next_cursor})
 
 @router.get("/by_user/{user_uid}", response_model=List[OrderResponse])
 async def api_get_orders_by_user(
     user_uid: str,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, gt=0),
+    include: Optional[str] = Query(None, description=ORDER_INCLUDES.description),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get all orders made by a specific user.
     """
-    objs = await get_orders_by_user(db, user_uid, skip, limit)
-    return objs
+    paths = ORDER_INCLUDES.parse(include)
+    objs = await get_orders_by_user(db, user_uid, skip, clamp_limit(limit), ORDER_INCLUDES.options(paths))
+    return FastJSONResponse(ORDER_INCLUDES.dump(objs, paths))
+
+@router.get("/by_user/{user_uid}/page", response_model=Page[OrderResponse])
+async def api_get_orders_by_user_page(
+    user_uid: str,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, gt=0, le=MAX_PAGE_SIZE),
+    include: Optional[str] = Query(None, description=ORDER_INCLUDES.description),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Order history of a user, newest first, with cursor pagination.
+    Use include=order_items.menu_item,restaurant to render the page in a fixed number of queries.
+    """
+    paths = ORDER_INCLUDES.parse(include)
+    items, next_cursor = await get_orders_by_user_page(db, user_uid, cursor, limit, ORDER_INCLUDES.options(paths))
+    return FastJSONResponse({"items": ORDER_INCLUDES.dump(items, paths), "next_cursor": next_cursor})
 
 @router.get("/by_restaurant/{restaurant_id}", response_model=List[OrderResponse])
 async def api_get_orders_by_restaurant(
     restaurant_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, gt=0),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    include: Optional[str] = Query(None, description=ORDER_INCLUDES.description),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get all orders made for a specific restaurant.
     """
-    objs = await get_orders_by_restaurant(db, restaurant_id, skip, limit)
-    return objs
+    columns = parse_fields(fields, OrderResponse, Order, required=("order_id",))
+    paths = ORDER_INCLUDES.parse(include)
+    check_fields_or_include(columns, paths)
+    objs = await get_orders_by_restaurant(
+        db, restaurant_id, skip, clamp_limit(limit), columns, ORDER_INCLUDES.options(paths)
+    )
+    if columns:
+        return FastJSONResponse(serialize_many(OrderResponse, objs, columns))
+    return FastJSONResponse(ORDER_INCLUDES.dump(objs, paths))
 
 @router.get("/by_status/{status}", response_model=List[OrderResponse])
 async def api_get_orders_by_status(
@@ -81,8 +180,8 @@ async def api_get_orders_by_status(
     """
     Get all orders with a specific status.
     """
-    objs = await get_orders_by_status(db, status, skip, limit)
-    return objs
+    objs = await get_orders_by_status(db, status, skip, clamp_limit(limit))
+    return fast_list(OrderResponse, objs)
 
 @router.get("/by_shipper/{shipper_uid}", response_model=List[OrderResponse])
 async def api_get_orders_by_shipper(
@@ -94,6 +193,6 @@ async def api_get_orders_by_shipper(
     """
     Get all orders assigned to a specific shipper.
     """
-    objs = await get_orders_by_shipper(db, shipper_uid, skip, limit)
-    return objs
+    objs = await get_orders_by_shipper(db, shipper_uid, skip, clamp_limit(limit))
+    return fast_list(OrderResponse, objs)
 
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
+from core.serializers import fast_list
 from db import get_db
 from schemas.order_item import (
     OrderItemCreate, OrderItemUpdate, OrderItemResponse
@@ -43,11 +44,11 @@ async def api_list_order_items(
     db: AsyncSession = Depends(get_db)
 ):
     objs = await list_order_items(db, order_id)
-    return objs
+    return fast_list(OrderItemResponse, objs)
 
 @router.get("/list_by_order_id/{order_id}", response_model=List[OrderItemResponse])
 async def api_get_order_items_by_order_id(order_id: int, db: AsyncSession = Depends(get_db)):
     objs = await list_order_items(db, order_id)
     if not objs:
         raise HTTPException(404, "No order items found for this order")
-    return objs
\ No newline at end of file
+    return fast_list(OrderItemResponse, objs)
\ No newline at end of file
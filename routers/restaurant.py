@@ -1,13 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
-from db import get_db
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEARBY_DEFAULT_RADIUS_KM, NEARBY_MAX_RADIUS_KM
+from core.batch import IDS_DESCRIPTION, keyed, parse_ids
+from core.conditional import conditional, etag_matches, fingerprint
+from core.fields import FIELDS_DESCRIPTION, parse_fields
+from core.pagination import clamp_limit
+from core.responses import FastJSONResponse
+from core.serializers import fast_list, serialize_many, serializer
+from db import get_db, get_read_db
+from models import Restaurant
+from schemas.common import Batch, Page
 from schemas.restaurant import (
-    RestaurantCreate, RestaurantUpdate, RestaurantResponse
+    DeliveryQuote, RestaurantCreate, RestaurantUpdate, RestaurantResponse, RestaurantMenuResponse, NearbyRestaurantResponse,
+    RestaurantListItem, RestaurantQuote, QuoteRequest, ScheduleSlot, RestaurantScheduleUpdate
 )
 from services.restaurant import (
-    create_restaurant, delete_restaurant_image, get_restaurant, get_restaurant_by_user_id, update_restaurant, delete_restaurant, list_restaurants, upload_restaurant_image
+    create_restaurant, delete_restaurant_image, get_restaurant, get_restaurants_by_ids, get_restaurant_by_user_id, update_restaurant, delete_restaurant, list_restaurants, upload_restaurant_image,
+    list_restaurants_page, list_nearby_restaurants
 )
-from typing import List
+from services.quote import quote_restaurants, resolve_optional_point, resolve_point
+from services.menu_snapshot import menu_snapshots
+from services.schedule import list_schedule, minutes_to_time, replace_schedule, time_to_minutes
+from typing import List, Optional
 
 router = APIRouter(prefix="/restaurant", tags=["restaurant"])
 
@@ -17,11 +31,65 @@ async def api_create_restaurant(data: RestaurantCreate, db: AsyncSession = Depen
     return obj
 
 @router.get("/detail/{restaurant_id}", response_model=RestaurantResponse)
-async def api_get_restaurant(restaurant_id: int, db: AsyncSession = Depends(get_db)):
+async def api_get_restaurant(
+    restaurant_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_read_db)
+):
     obj = await get_restaurant(db, restaurant_id)
     if not obj:
         raise HTTPException(404, "Restaurant not found")
-    return obj
+    return conditional(request, response, fingerprint([obj]), obj.updated_at) or obj
+
+@router.get("/batch", response_model=Batch[int, RestaurantResponse])
+async def api_get_restaurants_batch(
+    ids: str = Query(..., description=IDS_DESCRIPTION), db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Nhiều nhà hàng trong 1 câu IN thay cho N lần /detail; key theo restaurant_id.
+    """
+    restaurant_ids = parse_ids(ids)
+    objs = await get_restaurants_by_ids(db, restaurant_ids)
+    return FastJSONResponse(keyed(serialize_many(RestaurantResponse, objs), "restaurant_id", restaurant_ids))
+
+@router.get("/menu/{restaurant_id}", response_model=RestaurantMenuResponse)
+async def api_get_restaurant_menu(restaurant_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Whole menu of a restaurant grouped by category, with images and availability.
+    Served from a cached snapshot; send If-None-Match to get 304 when unchanged.
+    """
+    # Build snapshot từ primary (get_db): bản build từ replica đang trễ sẽ bị cache tới lần ghi sau
+    snapshot = await menu_snapshots.get(db, restaurant_id)
+    if not snapshot:
+        raise HTTPException(404, "Restaurant not found")
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(snapshot.body, media_type="application/json", headers=headers)
+
+@router.get("/schedule/{restaurant_id}", response_model=List[ScheduleSlot])
+async def api_get_restaurant_schedule(restaurant_id: int, db: AsyncSession = Depends(get_read_db)):
+    rows = await list_schedule(db, restaurant_id)
+    return [
+        ScheduleSlot(weekday=r.weekday, open_time=minutes_to_time(r.open_minute), close_time=minutes_to_time(r.close_minute))
+        for r in rows
+    ]
+
+@router.put("/schedule/{restaurant_id}", response_model=List[ScheduleSlot])
+async def api_replace_restaurant_schedule(
+    restaurant_id: int, data: RestaurantScheduleUpdate, db: AsyncSession = Depends(get_db)
+):
+    """
+    Replace the weekly opening schedule. From then on status flips between open
+    and closed automatically at the slot boundaries (suspended is left alone).
+    An empty list removes the schedule and hands status back to the owner.
+    """
+    if not await get_restaurant(db, restaurant_id):
+        raise HTTPException(404, "Restaurant not found")
+    slots = [(s.weekday, time_to_minutes(s.open_time), time_to_minutes(s.close_time)) for s in data.slots]
+    rows = await replace_schedule(db, restaurant_id, slots)
+    return [
+        ScheduleSlot(weekday=r.weekday, open_time=minutes_to_time(r.open_minute), close_time=minutes_to_time(r.close_minute))
+        for r in rows
+    ]
 
 @router.put("/update", response_model=RestaurantResponse)
 async def api_update_restaurant(data: RestaurantUpdate, db: AsyncSession = Depends(get_db)):
@@ -37,25 +105,95 @@ async def api_delete_restaurant(restaurant_id: int, db: AsyncSession = Depends(g
         raise HTTPException(404, "Restaurant not found")
     return {"detail": "Deleted"}
 
-@router.get("/list", response_model=List[RestaurantResponse])
+def with_quotes(restaurants, point, fields: Optional[tuple] = None) -> list:
+    """
+    Gắn phí giao/ETA cho cả danh sách trong một lượt tính (không có point thì quote = None).
+    Trả về list dict JSON-able; với fields (restaurants là Row) chỉ gồm các field đó, kèm quote nếu có point.
+    """
+    items = serialize_many(RestaurantResponse, restaurants, fields)
+    if point:
+        quotes = quote_restaurants(*point, [item["restaurant_id"] for item in items])
+        serialize_quote = serializer(DeliveryQuote)
+        for item in items:
+            quote = quotes.get(item["restaurant_id"])
+            item["quote"] = None if quote is None else serialize_quote(quote)
+    elif fields is None:
+        for item in items:
+            item["quote"] = None
+    return items
+
+@router.get("/list", response_model=List[RestaurantListItem])
 async def api_list_restaurants(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, gt=0),
-    db: AsyncSession = Depends(get_db)
+    address_id: Optional[int] = Query(None, description="Kèm phí giao/ETA tới địa chỉ này"),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    open_now: bool = Query(False),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
+):
+    columns = parse_fields(fields, RestaurantListItem, Restaurant, required=("restaurant_id",))
+    point = await resolve_optional_point(db, address_id, lat, lng)
+    objs = await list_restaurants(db, skip, clamp_limit(limit), open_now, columns)
+    return FastJSONResponse(with_quotes(objs, point, columns))
+
+@router.get("/page", response_model=Page[RestaurantListItem])
+async def api_list_restaurants_page(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, gt=0, le=MAX_PAGE_SIZE),
+    address_id: Optional[int] = Query(None, description="Kèm phí giao/ETA tới địa chỉ này"),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    open_now: bool = Query(False),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    objs = await list_restaurants(db, skip, limit)
-    return objs
+    columns = parse_fields(fields, RestaurantListItem, Restaurant, required=("restaurant_id",))
+    point = await resolve_optional_point(db, address_id, lat, lng)
+    items, next_cursor = await list_restaurants_page(db, cursor, limit, open_now, columns)
+    return FastJSONResponse({"items": with_quotes(items, point, columns), "next_cursor": next_cursor})
+
+@router.post("/quotes", response_model=List[RestaurantQuote])
+async def api_quote_restaurants(data: QuoteRequest, db: AsyncSession = Depends(get_read_db)):
+    """
+    Distance, delivery fee and ETA from one address (or point) to many restaurants.
+    Restaurants without coordinates are left out.
+    """
+    lat, lng = await resolve_point(db, data.address_id, data.latitude, data.longitude)
+    quotes = quote_restaurants(lat, lng, data.restaurant_ids)
+    return [RestaurantQuote(restaurant_id=rid, **quote) for rid, quote in quotes.items()]
+
+@router.get("/nearby", response_model=List[NearbyRestaurantResponse])
+async def api_list_nearby_restaurants(
+    address_id: Optional[int] = Query(None, description="Dùng toạ độ của địa chỉ giao hàng"),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: float = Query(NEARBY_DEFAULT_RADIUS_KM, gt=0, le=NEARBY_MAX_RADIUS_KM),
+    limit: int = Query(DEFAULT_PAGE_SIZE, gt=0, le=MAX_PAGE_SIZE),
+    open_now: bool = Query(False),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Restaurants within radius_km of an address (address_id) or a point (lat & lng), nearest first.
+    """
+    lat, lng = await resolve_point(db, address_id, lat, lng)
+    hits = await list_nearby_restaurants(db, lat, lng, radius_km, limit, open_now)
+    items = with_quotes([r for r, _ in hits], (lat, lng))
+    for item, (_, d) in zip(items, hits):
+        item["distance_km"] = round(d, 3)
+    return FastJSONResponse(items)
 
 @router.get("/by_user/{user_id}", response_model=List[RestaurantResponse])
 async def api_get_restaurants_by_user(
     user_id: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get all restaurants owned by a specific user.
     """
     objs = await get_restaurant_by_user_id(db, user_id)
-    return objs
+    return fast_list(RestaurantResponse, objs)
 
 @router.post("/upload_image", response_model=dict)
 async def api_upload_restaurant_image(
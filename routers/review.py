@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from core.serializers import fast_page
+from db import get_db, get_read_db
+from schemas.common import Page
+from schemas.review import ReviewCreate, ReviewResponse, RatingSummary
+from services.review import create_review, get_rating_summary, list_reviews_page
+from typing import Optional
+
+router = APIRouter(prefix="/review", tags=["review"])
+
+@router.post("/create", response_model=ReviewResponse)
+async def api_create_review(data: ReviewCreate, db: AsyncSession = Depends(get_db)):
+    return await create_review(db, data)
+
+@router.get("/restaurant/{restaurant_id}", response_model=Page[ReviewResponse])
+async def api_list_reviews(
+    restaurant_id: int,
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, gt=0, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db)
+):
+    items, next_cursor = await list_reviews_page(db, restaurant_id, cursor, limit)
+    return fast_page(ReviewResponse, items, next_cursor)
+
+@router.get("/summary/{restaurant_id}", response_model=RatingSummary)
+async def api_rating_summary(restaurant_id: int, db: AsyncSession = Depends(get_read_db)):
+    summary = await get_rating_summary(db, restaurant_id)
+    if not summary:
+        raise HTTPException(404, "Restaurant not found")
+    return summary
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, BackgroundTasks, Query
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from schemas.search import SearchResponse, Suggestion
+from services.autocomplete import suggestions
+from services.search import record_search, search
+from typing import List, Literal, Optional
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+@router.get("", response_model=SearchResponse)
+async def api_search(
+    background_tasks: BackgroundTasks,
+    q: str = Query(..., min_length=1, max_length=255),
+    type: Optional[Literal["menu_item", "restaurant"]] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, gt=0, le=MAX_PAGE_SIZE),
+    include_unavailable: bool = Query(False),
+    user_uid: Optional[str] = Query(None, description="Lưu vào lịch sử tìm kiếm của user"),
+):
+    """
+    Full-text search over menu items and restaurants (name and description),
+    accent-insensitive ("pho" matches "phở"), ranked by BM25.
+    Served from the in-memory index; does not query the database.
+    """
+    hits = search(q, type, limit, available_only=not include_unavailable)
+    if user_uid:
+        background_tasks.add_task(record_search, user_uid, q)
+        suggestions.bump(q)
+    return SearchResponse(query=q, hits=hits)
+
+@router.get("/autocomplete", response_model=List[Suggestion])
+async def api_autocomplete(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, gt=0, le=20),
+):
+    """
+    Top completions for what the user has typed so far, ranked by how often
+    they are searched and ordered. Matches the start of any word, accent-insensitive.
+    """
+    return [Suggestion(text=text, weight=weight) for text, weight in suggestions.complete(q, limit)]
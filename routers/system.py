@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Request
+
+from db import engine, get_pool_stats, read_replicas
+
+router = APIRouter(prefix="/system", tags=["system"])
+
+@router.get("/pool_stats", response_model=dict)
+async def api_pool_stats():
+    """
+    Connection pool usage: checked-out/overflow connections, checkout wait time and timeouts.
+    """
+    replicas = []
+    for replica, lag in zip(read_replicas.engines, read_replicas.lag()):
+        # lag = inf khi replica lỗi hoặc dừng replication
+        lag_seconds = lag if lag != float("inf") else None
+        replicas.append({"lag_seconds": lag_seconds, **get_pool_stats(replica)})
+    return {"primary": get_pool_stats(engine), "replicas": replicas}
+
+@router.get("/startup", response_model=dict)
+async def api_startup_stats(request: Request):
+    """
+    Cold-start-to-ready time and what the startup warm-up did.
+    """
+    return getattr(request.app.state, "startup", {})
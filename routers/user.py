@@ -1,13 +1,21 @@
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, Response, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
-from db import get_db
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from core.batch import IDS_DESCRIPTION, keyed, parse_ids
+from core.conditional import conditional, fingerprint
+from core.pagination import clamp_limit
+from core.responses import FastJSONResponse
+from core.serializers import fast_list, fast_page, serialize_many
+from db import get_db, get_read_db
+from schemas.common import Batch, Page
 from schemas.user import (
     UserProfileRequest, UserCreate, UserUpdate, UserResponse
 )
 from services.user import (
-    create_user, get_user, update_user, delete_user, list_users, upload_user_avatar, delete_user_avatar
+    create_user, get_user, get_users_by_ids, update_user, delete_user, list_users, upload_user_avatar, delete_user_avatar,
+    list_users_page
 )
-from typing import List
+from typing import List, Optional
 
 router = APIRouter(prefix="/user", tags=["user"])
 
@@ -21,12 +29,31 @@ async def api_create_user(user_create: UserCreate, db: AsyncSession = Depends(ge
     return user
 
 @router.post("/profile", response_model=UserResponse)
-async def api_get_profile(req: UserProfileRequest, db: AsyncSession = Depends(get_db)):
+async def api_get_profile(req: UserProfileRequest, db: AsyncSession = Depends(get_read_db)):
     user = await get_user(db, req.uid)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
+@router.get("/profile/{uid}", response_model=UserResponse)
+async def api_get_profile_by_uid(uid: str, request: Request, response: Response, db: AsyncSession = Depends(get_read_db)):
+    """Như POST /profile nhưng là GET nên hỗ trợ If-None-Match / If-Modified-Since (304)."""
+    user = await get_user(db, uid)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return conditional(request, response, fingerprint([user]), user.updated_at) or user
+
+@router.get("/batch", response_model=Batch[str, UserResponse])
+async def api_get_users_batch(
+    ids: str = Query(..., description=IDS_DESCRIPTION), db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Nhiều user theo uid trong 1 câu IN; key theo uid.
+    """
+    uids = parse_ids(ids, str)
+    users = await get_users_by_ids(db, uids)
+    return FastJSONResponse(keyed(serialize_many(UserResponse, users), "uid", uids))
+
 @router.post("/update", response_model=UserResponse)
 async def api_update_user(user_update: UserUpdate, db: AsyncSession = Depends(get_db)):
     user = await update_user(db, user_update)
@@ -45,10 +72,19 @@ async def api_delete_user(uid: str, db: AsyncSession = Depends(get_db)):
 async def api_list_users(
     skip: int = Query(0, ge=0), 
     limit: int = Query(100, gt=0), 
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
+):
+    users = await list_users(db, skip=skip, limit=clamp_limit(limit))
+    return fast_list(UserResponse, users)
+
+@router.get("/page", response_model=Page[UserResponse])
+async def api_list_users_page(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, gt=0, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    users = await list_users(db, skip=skip, limit=limit)
-    return users
+    users, next_cursor = await list_users_page(db, cursor, limit)
+    return fast_page(UserResponse, users, next_cursor)
 
 @router.post("/upload_avatar", response_model=dict)
 async def upload_avatar(
@@ -1,13 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from db import get_db
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from core.pagination import clamp_limit
+from core.serializers import fast_list, fast_page
+from db import get_db, get_read_db
+from schemas.common import Page
 from schemas.voucher import (
     VoucherCreate, VoucherUpdate, VoucherResponse
 )
 from services.voucher import (
-    create_voucher, get_voucher, list_vouchers_by_resid, update_voucher, delete_voucher, list_vouchers, is_voucher_code_unique
+    create_voucher, get_voucher, list_vouchers_by_resid, update_voucher, delete_voucher, list_vouchers, is_voucher_code_unique,
+    list_vouchers_page
 )
-from typing import List
+from typing import List, Optional
 
 router = APIRouter(prefix="/voucher", tags=["voucher"])
 
@@ -27,7 +32,7 @@ async def api_create_voucher(data: VoucherCreate, db: AsyncSession = Depends(get
     return obj
 
 @router.get("/detail/{voucher_id}", response_model=VoucherResponse)
-async def api_get_voucher(voucher_id: int, db: AsyncSession = Depends(get_db)):
+async def api_get_voucher(voucher_id: int, db: AsyncSession = Depends(get_read_db)):
     obj = await get_voucher(db, voucher_id)
     if not obj:
         raise HTTPException(404, "Voucher not found")
@@ -51,26 +56,35 @@ async def api_delete_voucher(voucher_id: int, db: AsyncSession = Depends(get_db)
 async def api_list_vouchers(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, gt=0),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    objs = await list_vouchers(db, skip, limit)
-    return objs
+    objs = await list_vouchers(db, skip, clamp_limit(limit))
+    return fast_list(VoucherResponse, objs)
+
+@router.get("/page", response_model=Page[VoucherResponse])
+async def api_list_vouchers_page(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, gt=0, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db)
+):
+    items, next_cursor = await list_vouchers_page(db, cursor, limit)
+    return fast_page(VoucherResponse, items, next_cursor)
 
 @router.get("/list_by_resid", response_model=List[VoucherResponse])
 async def api_list_vouchers_by_res(
     res_uid: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, gt=0),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    objs = await list_vouchers_by_resid(db, res_uid, skip, limit)
-    return objs
+    objs = await list_vouchers_by_resid(db, res_uid, skip, clamp_limit(limit))
+    return fast_list(VoucherResponse, objs)
 
 @router.get("/check-code")
 async def check_voucher_code_unique(
     res_uid: int = Query(..., alias="res_uid"),
     code: str = Query(...),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     is_unique = await is_voucher_code_unique(db, res_uid, code)
     return {"is_unique": is_unique}
\ No newline at end of file
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Dict, Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+K = TypeVar("K")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    # Truyền lại vào ?cursor= để lấy trang tiếp theo; None = đã hết dữ liệu
+    next_cursor: Optional[str] = None
+
+
+class Batch(BaseModel, Generic[K, T]):
+    # Theo thứ tự id được yêu cầu; key là id (JSON object nên id số thành chuỗi)
+    items: Dict[K, T]
+    # Id không tồn tại
+    missing: List[K] = []
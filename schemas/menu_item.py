@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from decimal import Decimal
+from pydantic import BaseModel, Field, field_validator, model_validator
 from typing import List, Optional
 
 # ----- Menu Item Image -----
@@ -27,11 +28,33 @@ class MenuItemCreate(BaseModel):
 
 class MenuItemUpdate(BaseModel):
     item_id: int
+    category_id: Optional[int] = None
     name: Optional[str]
     description: Optional[str]
     price: Optional[float]
     available: Optional[bool]
 
+class MenuItemBulkUpdate(BaseModel):
+    """Áp cho mọi món của quán, thu hẹp theo category_id và/hoặc item_ids nếu có."""
+    restaurant_id: int
+    category_id: Optional[int] = None
+    item_ids: Optional[List[int]] = Field(None, min_length=1, max_length=1000)
+    # +10 = tăng 10%; chỉ dùng một trong price_percent / price_delta
+    price_percent: Optional[float] = Field(None, gt=-100, le=1000)
+    price_delta: Optional[float] = None
+    available: Optional[bool] = None
+
+    @model_validator(mode="after")
+    def check_changes(self):
+        if self.price_percent is not None and self.price_delta is not None:
+            raise ValueError("Use either price_percent or price_delta, not both")
+        if self.price_percent is None and self.price_delta is None and self.available is None:
+            raise ValueError("Nothing to update")
+        return self
+
+class MenuItemBulkUpdateResult(BaseModel):
+    updated: int
+
 class MenuItemResponse(BaseModel):
     item_id: int
     restaurant_id: int
@@ -44,3 +67,36 @@ class MenuItemResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+# ----- Menu Import -----
+class MenuImportRow(BaseModel):
+    """Một dòng của file import; category_id hoặc category (tên) là bắt buộc."""
+    item_id: Optional[int] = None
+    name: str = Field(..., min_length=1, max_length=255)
+    description: Optional[str] = None
+    price: Decimal = Field(..., ge=0, max_digits=10, decimal_places=2)
+    available: bool = True
+    category_id: Optional[int] = None
+    category: Optional[str] = None
+
+    @field_validator("item_id", "category_id", "description", "category", mode="before")
+    @classmethod
+    def empty_is_none(cls, value):
+        # Ô trống trong CSV
+        return None if value == "" else value
+
+    @field_validator("name", mode="before")
+    @classmethod
+    def strip_name(cls, value):
+        return value.strip() if isinstance(value, str) else value
+
+class MenuImportError(BaseModel):
+    row: int
+    message: str
+
+class MenuImportResult(BaseModel):
+    inserted: int
+    updated: int
+    failed: int
+    # Chỉ giữ MENU_IMPORT_MAX_ERRORS lỗi đầu tiên; `failed` là tổng số dòng lỗi
+    errors: List[MenuImportError] = []
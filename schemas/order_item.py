@@ -19,7 +19,8 @@ class OrderItemResponse(BaseModel):
     order_item_id: int
     order_id: int
     item_id: int
-    quantity: int
+    # Chưa có cột quantity trong order_items; mỗi dòng là một phần
+    quantity: int = 1
     # price: Decimal
     # note: Optional[str]
 
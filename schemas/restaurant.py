@@ -1,8 +1,10 @@
-from datetime import datetime
-from pydantic import BaseModel
-from typing import Optional
+from datetime import datetime, time
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from models import RestaurantStatus
 from models import RestaurantRequest
+from config import QUOTE_MAX_RESTAURANTS
+from schemas.menu_item import MenuItemResponse
 
 
 # RestaurantCreate: for creating a new restaurant
@@ -10,6 +12,8 @@ class RestaurantCreate(BaseModel):
     owner_uid: str
     name: str
     address: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     phone: Optional[str] = None
     open_time: Optional[datetime] = None
     close_time: Optional[datetime] = None
@@ -23,6 +27,8 @@ class RestaurantUpdate(BaseModel):
     restaurant_id: int
     name: Optional[str] = None
     address: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     phone: Optional[str] = None
     is_favorite: Optional[bool] = None  # Optional field for favorite status
     open_time: Optional[datetime] = None
@@ -39,6 +45,8 @@ class RestaurantResponse(BaseModel):
     owner_uid: str
     name: str
     address: Optional[str]
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     phone: Optional[str]
     is_favorite: Optional[bool] = None
     open_time: Optional[datetime]
@@ -48,8 +56,62 @@ class RestaurantResponse(BaseModel):
     status: Optional[RestaurantStatus]
     request: Optional[RestaurantRequest]
     rating: Optional[float]
+    rating_count: int = 0
     created_at: Optional[datetime]
     updated_at: Optional[datetime]
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Lịch mở cửa theo tuần; close_time <= open_time = mở qua nửa đêm
+class ScheduleSlot(BaseModel):
+    weekday: int = Field(..., ge=0, le=6)  # 0 = thứ Hai ... 6 = Chủ nhật
+    open_time: time
+    close_time: time
+
+
+class RestaurantScheduleUpdate(BaseModel):
+    slots: List[ScheduleSlot] = Field(..., max_length=7 * 4)
+
+
+# Phí giao / ETA từ địa chỉ của user tới quán (services/quote.py)
+class DeliveryQuote(BaseModel):
+    distance_km: float
+    delivery_fee: float
+    eta_minutes: int
+
+
+class RestaurantQuote(DeliveryQuote):
+    restaurant_id: int
+
+
+class QuoteRequest(BaseModel):
+    # Dùng address_id, hoặc cả latitude và longitude
+    address_id: Optional[int] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    restaurant_ids: List[int] = Field(..., min_length=1, max_length=QUOTE_MAX_RESTAURANTS)
+
+
+# Dùng cho các API danh sách quán; quote chỉ có khi request truyền địa chỉ/toạ độ
+class RestaurantListItem(RestaurantResponse):
+    quote: Optional[DeliveryQuote] = None
+
+
+class NearbyRestaurantResponse(RestaurantListItem):
+    distance_km: float
+
+
+# Toàn bộ menu của quán, nhóm theo category (GET /restaurant/menu/{id})
+class MenuCategoryGroup(BaseModel):
+    category_id: int
+    name: str
+    image_url: Optional[str]
+    items: List[MenuItemResponse]
+
+
+class RestaurantMenuResponse(BaseModel):
+    restaurant: RestaurantResponse
+    categories: List[MenuCategoryGroup]
+    # Đổi mỗi khi menu đổi; trùng với ETag của response
+    version: str
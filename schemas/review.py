@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field
+from typing import Dict, Optional
+from datetime import datetime
+
+
+class ReviewCreate(BaseModel):
+    user_uid: str
+    restaurant_id: int
+    order_id: Optional[int] = None
+    rating: int = Field(..., ge=1, le=5)
+    comment: Optional[str] = None
+
+class ReviewResponse(BaseModel):
+    review_id: int
+    user_uid: str
+    restaurant_id: int
+    order_id: Optional[int]
+    rating: int
+    comment: Optional[str]
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+class RatingSummary(BaseModel):
+    restaurant_id: int
+    rating: float
+    rating_count: int
+    # số sao (1..5) -> số review
+    histogram: Dict[int, int]
@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+
+
+class SearchHit(BaseModel):
+    kind: Literal["menu_item", "restaurant"]
+    id: int
+    name: str
+    restaurant_id: Optional[int] = None
+    restaurant_name: Optional[str] = None
+    price: Optional[float] = None
+    available: bool = True
+    score: float
+
+
+class Suggestion(BaseModel):
+    text: str
+    weight: float
+
+
+class SearchResponse(BaseModel):
+    query: str
+    hits: List[SearchHit]
@@ -0,0 +1,138 @@
+import datetime
+import heapq
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from config import AUTOCOMPLETE_HISTORY_DAYS
+from models import MenuItem, Order, OrderItem, Restaurant, SearchHistory
+from services.search import MENU_ITEM, fold, search_index, tokenize
+
+# Prefix ngắn hơn hoặc bằng ngần này ký tự khớp rất nhiều entry -> cache kết quả top-k
+SHORT_PREFIX = 2
+MAX_SUGGESTIONS = 20
+
+
+class PrefixIndex:
+    """
+    Gợi ý theo tiền tố, xếp theo độ phổ biến.
+
+    `entries` là mảng (key, phrase) đã sắp xếp, trong đó key là phrase đã bỏ dấu,
+    cắt từ đầu mỗi từ ("pho bo tai", "bo tai", "tai") để gõ "bo" vẫn ra "Phở bò tái".
+    Tra cứu = bisect tìm đoạn có cùng tiền tố rồi lấy top-k theo weight. Với prefix
+    ngắn (đoạn rất dài) kết quả được cache, và bị xoá khi weight trong đoạn đổi.
+    """
+
+    def __init__(self):
+        self.load({})
+
+    def load(self, weights: Dict[str, Tuple[float, str]]) -> None:
+        """weights: phrase đã bỏ dấu -> (weight, cách viết để hiển thị)."""
+        entries = sorted((key, phrase) for phrase in weights for key in self._keys(phrase))
+        self.weights, self.entries, self._short = dict(weights), entries, {}
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    @staticmethod
+    def _keys(phrase: str) -> List[str]:
+        words = phrase.split()
+        return [" ".join(words[i:]) for i in range(len(words))]
+
+    def bump(self, text: Optional[str], weight: float = 1.0) -> None:
+        phrase = " ".join(tokenize(text))
+        if not phrase:
+            return
+        current = self.weights.get(phrase)
+        if current:
+            self.weights[phrase] = (current[0] + weight, current[1])
+        else:
+            self.weights[phrase] = (weight, text.strip())
+            for key in self._keys(phrase):
+                insort(self.entries, (key, phrase))
+        for key in self._keys(phrase):
+            for n in range(1, SHORT_PREFIX + 1):
+                self._short.pop(key[:n], None)
+
+    def ensure(self, text: Optional[str]) -> None:
+        """Thêm tên món/quán mới với weight 1, không đổi weight nếu đã có."""
+        if " ".join(tokenize(text)) not in self.weights:
+            self.bump(text)
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Tuple[str, float]]:
+        prefix = " ".join(tokenize(prefix)) + (" " if prefix[-1:].isspace() else "")
+        if not prefix.strip():
+            return []
+        if len(prefix) <= SHORT_PREFIX and limit <= MAX_SUGGESTIONS:
+            cached = self._short.get(prefix)
+            if cached is None:
+                cached = self._short[prefix] = self._top(prefix, MAX_SUGGESTIONS)
+            return cached[:limit]
+        return self._top(prefix, limit)
+
+    def _top(self, prefix: str, limit: int) -> List[Tuple[str, float]]:
+        start = bisect_left(self.entries, (prefix,))
+        end = bisect_left(self.entries, (prefix + "\uffff",), start)
+        phrases = {phrase for _, phrase in self.entries[start:end]}
+        best = heapq.nlargest(limit, phrases, key=lambda p: self.weights[p][0])
+        return [(self.weights[p][1], self.weights[p][0]) for p in best]
+
+
+suggestions = PrefixIndex()
+
+
+async def build_suggestions(db: AsyncSession) -> int:
+    """
+    Weight của một cụm từ = số lần được tìm (search_history trong
+    AUTOCOMPLETE_HISTORY_DAYS ngày gần nhất) + số lần món/quán có tên đó được đặt.
+    Tên món và tên quán luôn có mặt với weight tối thiểu 1.
+    """
+    weights: Dict[str, list] = defaultdict(lambda: [0.0, None])
+
+    def add(text: Optional[str], weight: float) -> None:
+        phrase = " ".join(tokenize(text))
+        if phrase:
+            entry = weights[phrase]
+            entry[0] += weight
+            # Giữ cách viết có dấu (tên món/quán) thay vì chữ user gõ nếu có
+            if entry[1] is None or fold(entry[1]) == entry[1]:
+                entry[1] = text.strip()
+
+    since = datetime.datetime.now() - datetime.timedelta(days=AUTOCOMPLETE_HISTORY_DAYS)
+    history = await db.execute(
+        select(SearchHistory.keyword, func.count())
+        .where(SearchHistory.created_at >= since)
+        .group_by(SearchHistory.keyword)
+    )
+    for keyword, count in history.all():
+        add(keyword, count)
+
+    items = await db.execute(
+        select(MenuItem.name, func.count(OrderItem.order_item_id) + 1)
+        .outerjoin(OrderItem, OrderItem.item_id == MenuItem.item_id)
+        .group_by(MenuItem.name)
+    )
+    for name, count in items.all():
+        add(name, count)
+
+    restaurants = await db.execute(
+        select(Restaurant.name, func.count(Order.order_id) + 1)
+        .outerjoin(Order, Order.restaurant_id == Restaurant.restaurant_id)
+        .group_by(Restaurant.name)
+    )
+    for name, count in restaurants.all():
+        add(name, count)
+
+    suggestions.load({phrase: (weight, text) for phrase, (weight, text) in weights.items()})
+    return len(suggestions)
+
+
+def bump_ordered_item(item_id: int) -> None:
+    # Tên món lấy từ search index để không phải query thêm
+    doc = search_index.docs.get((MENU_ITEM, item_id))
+    if doc:
+        suggestions.bump(doc.name)
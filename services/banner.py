@@ -1,34 +1,16 @@
-import os
-import uuid
-from fastapi import UploadFile, HTTPException
+from fastapi import UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from typing import List, Optional
+from core.uploads import save_image
 from models import Banner
 from schemas.banner import BannerCreate, BannerUpdate
 
-ALLOWED_TYPES = {"image/jpeg", "image/png", "image/webp"}
-MAX_SIZE = 3 * 1024 * 1024  # 3MB
 UPLOAD_DIR = "static/banners"
 
 
-def generate_banner_filename(original_filename: str) -> str:
-    ext = os.path.splitext(original_filename)[1]
-    unique = uuid.uuid4().hex
-    return f"banner_{unique}{ext}"
-
-
 async def upload_banner_image(file: UploadFile) -> str:
-    if file.content_type not in ALLOWED_TYPES:
-        raise HTTPException(400, "File is not an allowed image type!")
-    content = await file.read()
-    if len(content) > MAX_SIZE:
-        raise HTTPException(400, "Image is too large! Max 3MB.")
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
-    filename = generate_banner_filename(file.filename)
-    file_path = os.path.join(UPLOAD_DIR, filename)
-    with open(file_path, "wb") as f:
-        f.write(content)
+    filename = await save_image(file, UPLOAD_DIR, "banner_")
     return f"/static/banners/{filename}"
 
 
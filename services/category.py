@@ -1,14 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import aliased
-from sqlalchemy import func
-from typing import List, Optional
+from sqlalchemy import case, func, update
+from typing import Dict, List, Optional
+from core.uploads import remove_file, save_image
 from models import Category, MenuItem
 from schemas.category import CategoryCreate, CategoryUpdate
+from services.menu_snapshot import menu_snapshots
 
-import os
 from fastapi import HTTPException, UploadFile
-import uuid
 
 async def create_category(db: AsyncSession, data: CategoryCreate) -> Category:
     obj = Category(**data.model_dump(exclude_unset=True))
@@ -18,15 +17,7 @@ async def create_category(db: AsyncSession, data: CategoryCreate) -> Category:
     return obj
 
 async def get_category(db: AsyncSession, category_id: int) -> Optional[Category]:
-    category = await db.get(Category, category_id)
-    if not category:
-        return None
-    result = await db.execute(
-        select(func.count()).select_from(MenuItem).where(MenuItem.category_id == category.category_id)
-    )
-    product_count = result.scalar() or 0
-    category.productcount = product_count
-    return category
+    return await db.get(Category, category_id)
 
 
 async def update_category(db: AsyncSession, data: CategoryUpdate) -> Optional[Category]:
@@ -39,6 +30,8 @@ async def update_category(db: AsyncSession, data: CategoryUpdate) -> Optional[Ca
     db.add(obj)
     await db.commit()
     await db.refresh(obj)
+    # Tên/ảnh category nằm trong snapshot menu của mọi quán
+    menu_snapshots.clear()
     return obj
 
 async def delete_category(db: AsyncSession, category_id: int) -> bool:
@@ -47,76 +40,94 @@ async def delete_category(db: AsyncSession, category_id: int) -> bool:
         return False
     await db.delete(obj)
     await db.commit()
+    menu_snapshots.clear()
     return True
 
 async def list_categories(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Category]:
-    cat_alias = aliased(Category)
-    menu_item_alias = aliased(MenuItem)
-
-    stmt = (
-        select(
-            cat_alias,
-            func.count(menu_item_alias.category_id).label("productcount")
-        )
-        .outerjoin(menu_item_alias, menu_item_alias.category_id == cat_alias.category_id)
-        .group_by(cat_alias.category_id)
-        .offset(skip)
-        .limit(limit)
-    )
+    result = await db.execute(select(Category).order_by(Category.category_id).offset(skip).limit(limit))
+    return list(result.scalars().all())
 
-    result = await db.execute(stmt)
+# -------- Product count --------
 
-    categories = []
-    for row in result:
-        category: Category = row[0]
-        category.productcount = row[1]  # Gán động productcount
-        categories.append(category)
+async def adjust_product_count(db: AsyncSession, category_id: int, delta: int) -> None:
+    """Cộng/trừ product_count trong transaction hiện tại; caller tự commit cùng thay đổi menu item."""
+    await db.execute(
+        update(Category)
+        .where(Category.category_id == category_id)
+        .values(productcount=Category.productcount + delta)
+    )
 
-    return categories
+async def adjust_product_counts(db: AsyncSession, deltas: Dict[int, int]) -> None:
+    """Như adjust_product_count cho nhiều category, gộp thành một UPDATE ... CASE."""
+    deltas = {category_id: delta for category_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    await db.execute(
+        update(Category)
+        .where(Category.category_id.in_(deltas))
+        .values(productcount=Category.productcount + case(deltas, value=Category.category_id, else_=0))
+        .execution_options(synchronize_session=False)
+    )
 
+async def discount_restaurant_items(db: AsyncSession, restaurant_id: int) -> None:
+    """Trừ các món của quán khỏi product_count, gọi trước khi xoá quán (menu item bị xoá theo cascade)."""
+    result = await db.execute(
+        select(MenuItem.category_id, func.count())
+        .where(MenuItem.restaurant_id == restaurant_id)
+        .group_by(MenuItem.category_id)
+    )
+    await adjust_product_counts(db, {category_id: -count for category_id, count in result.all()})
+
+async def reconcile_category_counts(db: AsyncSession) -> int:
+    """
+    Recompute product_count from menu_items for categories whose stored count
+    drifted. Returns the number of categories fixed.
+    """
+    actual = (
+        select(func.count())
+        .select_from(MenuItem)
+        .where(MenuItem.category_id == Category.category_id)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        update(Category)
+        .where(Category.productcount != actual)
+        .values(productcount=actual)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
 
-CATEGORY_IMAGE_DIR = "static/category_images"
-ALLOWED_CATEGORY_IMG_TYPES = {"image/jpeg", "image/png", "image/webp"}
-MAX_CATEGORY_IMG_SIZE = 3 * 1024 * 1024  # 3MB
 
-def generate_category_image_filename(original_filename: str) -> str:
-    ext = os.path.splitext(original_filename)[1]
-    unique = uuid.uuid4().hex
-    return f"category_{unique}{ext}"
+CATEGORY_IMAGE_DIR = "static/category_images"
 
 async def upload_category_image(
         db: AsyncSession,
         category_id: int,
         file: UploadFile) -> str:
-    # Validate type
-    if file.content_type not in ALLOWED_CATEGORY_IMG_TYPES:
-        raise HTTPException(400, "File không đúng định dạng ảnh!")
-    # Read content
-    content = await file.read()
-    if len(content) > MAX_CATEGORY_IMG_SIZE:
-        raise HTTPException(400, "Ảnh quá lớn! Tối đa 3MB.")
-    os.makedirs(CATEGORY_IMAGE_DIR, exist_ok=True)
-    filename = generate_category_image_filename(file.filename)
-    file_path = os.path.join(CATEGORY_IMAGE_DIR, filename)
-    with open(file_path, "wb") as f:
-        f.write(content)
-    image_url = f"/static/category_images/{filename}"
     category = await db.get(Category, category_id)
     if not category:
         raise HTTPException(404, "Category not found")
-    category.image_url = image_url  # Update the image URL in the database
-    await db.commit()
+    filename = await save_image(file, CATEGORY_IMAGE_DIR, "category_")
+    image_url = f"/static/category_images/{filename}"
+    try:
+        category.image_url = image_url  # Update the image URL in the database
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        await remove_file(CATEGORY_IMAGE_DIR, filename)
+        raise
     await db.refresh(category)
+    menu_snapshots.clear()
     return image_url
 
 async def delete_category_image(category_id: int, db: AsyncSession) -> bool:
     category = await db.get(Category, category_id)
     if not category or not category.image_url:
         return False
-    image_path = os.path.join(CATEGORY_IMAGE_DIR, os.path.basename(category.image_url))
-    if os.path.exists(image_path):
-        os.remove(image_path)
+    await remove_file(CATEGORY_IMAGE_DIR, category.image_url)
     category.image_url = None  # Clear the image URL in the database
     await db.commit()
     await db.refresh(category)
+    menu_snapshots.clear()
     return True
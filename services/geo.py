@@ -0,0 +1,119 @@
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from models import Restaurant
+
+EARTH_RADIUS_KM = 6371.0088
+# Kích thước ô lưới theo độ (~1.1 km theo vĩ độ); bán kính tìm kiếm vài km chỉ quét vài chục ô
+CELL_DEG = 0.01
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def haversine_km_array(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Khoảng cách từ một điểm tới N điểm, vector hoá bằng numpy."""
+    lat1, lng1 = math.radians(lat), math.radians(lng)
+    lat2, lng2 = np.radians(lats), np.radians(lngs)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def _cell(lat: float, lng: float) -> Tuple[int, int]:
+    return math.floor(lat / CELL_DEG), math.floor(lng / CELL_DEG)
+
+
+class GridIndex:
+    """
+    Lưới đều theo lat/lng trong bộ nhớ: ô (i, j) -> {restaurant_id: (lat, lng)}.
+
+    Truy vấn theo bán kính chỉ xét các ô nằm trong bounding box của vòng tròn,
+    rồi lọc chính xác bằng haversine và sắp theo khoảng cách.
+    """
+
+    def __init__(self):
+        self.load([])
+
+    def load(self, points: Iterable[Tuple[int, float, float]]) -> None:
+        cells: Dict[Tuple[int, int], Dict[int, Tuple[float, float]]] = defaultdict(dict)
+        located: Dict[int, Tuple[int, int]] = {}
+        for restaurant_id, lat, lng in points:
+            cell = _cell(lat, lng)
+            cells[cell][restaurant_id] = (lat, lng)
+            located[restaurant_id] = cell
+        self.cells, self.located = cells, located
+
+    def __len__(self) -> int:
+        return len(self.located)
+
+    def put(self, restaurant_id: int, lat: Optional[float], lng: Optional[float]) -> None:
+        self.remove(restaurant_id)
+        if lat is None or lng is None:
+            return
+        cell = _cell(lat, lng)
+        self.cells[cell][restaurant_id] = (lat, lng)
+        self.located[restaurant_id] = cell
+
+    def remove(self, restaurant_id: int) -> None:
+        cell = self.located.pop(restaurant_id, None)
+        if cell is not None:
+            points = self.cells[cell]
+            points.pop(restaurant_id, None)
+            if not points:
+                del self.cells[cell]
+
+    def point(self, restaurant_id: int) -> Optional[Tuple[float, float]]:
+        cell = self.located.get(restaurant_id)
+        return self.cells[cell][restaurant_id] if cell is not None else None
+
+    def candidates(self, lat: float, lng: float, radius_km: float) -> List[Tuple[int, float, float]]:
+        """Các điểm trong bounding box của vòng tròn (chưa lọc theo khoảng cách)."""
+        dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+        # Gần cực cos -> 0, giới hạn để bounding box không vô hạn
+        dlng = dlat / max(math.cos(math.radians(lat)), 0.01)
+        i0, j0 = _cell(lat - dlat, lng - dlng)
+        i1, j1 = _cell(lat + dlat, lng + dlng)
+        found = []
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > len(self.cells):
+            # Bán kính lớn hơn cả vùng có dữ liệu: duyệt các ô có điểm thay vì từng ô trong box
+            cells = (points for (i, j), points in self.cells.items() if i0 <= i <= i1 and j0 <= j <= j1)
+        else:
+            cells = (self.cells.get((i, j)) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1))
+        for points in cells:
+            if points:
+                found.extend((rid, plat, plng) for rid, (plat, plng) in points.items())
+        return found
+
+    def nearby(self, lat: float, lng: float, radius_km: float, limit: int) -> List[Tuple[int, float]]:
+        """[(restaurant_id, distance_km)] trong bán kính, gần nhất trước."""
+        candidates = self.candidates(lat, lng, radius_km)
+        if not candidates:
+            return []
+        ids, lats, lngs = (np.array(column) for column in zip(*candidates))
+        distance = haversine_km_array(lat, lng, lats.astype(np.float64), lngs.astype(np.float64))
+        inside = np.flatnonzero(distance <= radius_km)
+        # Chỉ sắp xếp phần cần trả về
+        if len(inside) > limit:
+            inside = inside[np.argpartition(distance[inside], limit)[:limit]]
+        inside = inside[np.argsort(distance[inside], kind="stable")]
+        return list(zip(ids[inside].tolist(), distance[inside].tolist()))
+
+
+geo_index = GridIndex()
+
+
+async def build_geo_index(db: AsyncSession) -> int:
+    result = await db.execute(
+        select(Restaurant.restaurant_id, Restaurant.latitude, Restaurant.longitude)
+        .where(Restaurant.latitude.is_not(None), Restaurant.longitude.is_not(None))
+    )
+    geo_index.load(result.all())
+    return len(geo_index)
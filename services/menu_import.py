@@ -0,0 +1,159 @@
+import csv
+import io
+import json
+from collections import Counter
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from config import MENU_IMPORT_BATCH_SIZE, MENU_IMPORT_MAX_ERRORS, MENU_IMPORT_MAX_ROWS
+from models import Category, MenuItem, Restaurant
+from schemas.menu_item import MenuImportRow
+from services.autocomplete import suggestions
+from services.category import adjust_product_counts
+from services.menu_item import reindex_menu_items
+from services.menu_snapshot import menu_snapshots
+from services.search import fold
+
+
+def iter_rows(upload: UploadFile) -> Iterator[Tuple[int, object]]:
+    """
+    (số dòng, dict hoặc chuỗi lỗi) cho từng dòng dữ liệu. Đọc dần từ file tạm của
+    UploadFile (không nạp cả file vào bộ nhớ); là I/O đồng bộ nên phải gọi qua threadpool.
+    """
+    filename = (upload.filename or "").lower()
+    is_ndjson = filename.endswith((".ndjson", ".jsonl")) or (upload.content_type or "").endswith(("ndjson", "jsonl"))
+    upload.file.seek(0)
+    text = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+    try:
+        if is_ndjson:
+            for line_no, line in enumerate(text, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as exc:
+                    yield line_no, f"Invalid JSON: {exc}"
+                    continue
+                yield line_no, row if isinstance(row, dict) else "Each line must be a JSON object"
+        else:
+            reader = csv.DictReader(text)
+            for row in reader:
+                # Số dòng trong file (dòng 1 là header)
+                yield reader.line_num, {k.strip(): v for k, v in row.items() if k}
+    except UnicodeDecodeError:
+        yield 0, "File must be UTF-8 encoded"
+    finally:
+        text.detach()
+
+
+async def import_menu(
+    db: AsyncSession, restaurant_id: int, upload: UploadFile, atomic: bool = False
+) -> dict:
+    """
+    Import/cập nhật menu của một quán từ CSV hoặc NDJSON.
+
+    Dòng có item_id (hoặc trùng tên với món đã có của quán) được cập nhật, còn lại
+    được thêm mới. File được đọc và validate theo từng đợt MENU_IMPORT_BATCH_SIZE dòng;
+    mỗi đợt là một INSERT nhiều dòng + một UPDATE executemany, tất cả trong một transaction.
+    atomic=True: có dòng lỗi thì không ghi gì cả.
+    """
+    if not await db.get(Restaurant, restaurant_id):
+        raise HTTPException(404, "Restaurant not found")
+
+    categories = (await db.execute(select(Category.category_id, Category.name))).all()
+    category_ids = {category_id for category_id, _ in categories}
+    category_by_name = {fold(name).strip(): category_id for category_id, name in categories}
+    existing = (await db.execute(
+        select(MenuItem.item_id, MenuItem.name, MenuItem.category_id).where(MenuItem.restaurant_id == restaurant_id)
+    )).all()
+    item_by_id = {item_id: category_id for item_id, _, category_id in existing}
+    item_by_name = {name: item_id for item_id, name, _ in existing}
+
+    errors: List[dict] = []
+    failed = inserted = updated = 0
+    seen_names = set()
+    count_delta: Counter = Counter()
+
+    def error(line_no: int, message: str) -> None:
+        nonlocal failed
+        failed += 1
+        if len(errors) < MENU_IMPORT_MAX_ERRORS:
+            errors.append({"row": line_no, "message": message})
+
+    rows = iter_rows(upload)
+    total = 0
+    while True:
+        batch = await run_in_threadpool(lambda: list(islice(rows, MENU_IMPORT_BATCH_SIZE)))
+        if not batch:
+            break
+        total += len(batch)
+        if total > MENU_IMPORT_MAX_ROWS:
+            raise HTTPException(400, f"Too many rows (max {MENU_IMPORT_MAX_ROWS})")
+
+        inserts, updates = [], []
+        for line_no, raw in batch:
+            if isinstance(raw, str):
+                error(line_no, raw)
+                continue
+            try:
+                row = MenuImportRow.model_validate(raw)
+            except ValidationError as exc:
+                error(line_no, "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors()))
+                continue
+
+            category_id = row.category_id
+            if category_id is None and row.category:
+                category_id = category_by_name.get(fold(row.category).strip())
+            if category_id is None or category_id not in category_ids:
+                error(line_no, "Unknown category")
+                continue
+            if row.name in seen_names:
+                error(line_no, f"Duplicate name in file: {row.name}")
+                continue
+            seen_names.add(row.name)
+
+            item_id = row.item_id if row.item_id is not None else item_by_name.get(row.name)
+            values = {
+                "restaurant_id": restaurant_id, "category_id": category_id, "name": row.name,
+                "description": row.description, "price": row.price, "available": row.available,
+            }
+            if item_id is None:
+                inserts.append(values)
+                count_delta[category_id] += 1
+            elif item_id in item_by_id:
+                updates.append({"item_id": item_id, **values})
+                if item_by_id[item_id] != category_id:
+                    count_delta[item_by_id[item_id]] -= 1
+                    count_delta[category_id] += 1
+                    item_by_id[item_id] = category_id
+            else:
+                error(line_no, f"Menu item {item_id} does not belong to this restaurant")
+
+        if atomic and failed:
+            continue
+        if inserts:
+            await db.execute(insert(MenuItem), inserts)
+            inserted += len(inserts)
+        if updates:
+            await db.execute(update(MenuItem), updates)
+            updated += len(updates)
+
+    if atomic and failed:
+        await db.rollback()
+        return {"inserted": 0, "updated": 0, "failed": failed, "errors": errors}
+
+    await adjust_product_counts(db, count_delta)
+    await db.commit()
+
+    menu_snapshots.invalidate(restaurant_id)
+    for item in await reindex_menu_items(db, MenuItem.restaurant_id == restaurant_id):
+        suggestions.ensure(item.name)
+    return {"inserted": inserted, "updated": updated, "failed": failed, "errors": errors}
+
@@ -1,15 +1,20 @@
-import os
-import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
-from sqlalchemy import update
-from typing import List, Optional
-from models import MenuItem, MenuItemImage, Restaurant  
-from sqlalchemy.orm import joinedload
+from sqlalchemy import case, func, update
+from decimal import Decimal
+from typing import List, Optional, Sequence
+from models import MenuItem, MenuItemImage
+from core.fields import fetch_all, select_fields
+from core.pagination import paginate
+from core.uploads import remove_file, save_image
+from services.autocomplete import suggestions
+from services.category import adjust_product_count
+from services.menu_snapshot import invalidate_menu_of_item, menu_snapshots, restaurant_id_of_image
+from services.search import MENU_ITEM, index_menu_item, search_index
 
 from schemas.menu_item import (
-    MenuItemCreate, MenuItemUpdate,
+    MenuItemCreate, MenuItemUpdate, MenuItemBulkUpdate,
     MenuItemImageCreate
 )
 from fastapi import HTTPException, UploadFile
@@ -19,8 +24,12 @@ from fastapi import HTTPException, UploadFile
 async def create_menu_item(db: AsyncSession, data: MenuItemCreate) -> MenuItem:
     item = MenuItem(**data.model_dump(exclude_unset=True))
     db.add(item)
+    await adjust_product_count(db, data.category_id, 1)
     await db.commit()
     await db.refresh(item)
+    menu_snapshots.invalidate(item.restaurant_id)
+    index_menu_item(item)
+    suggestions.ensure(item.name)
 
     result = await db.execute(
         select(MenuItem).options(selectinload(MenuItem.images)).where(MenuItem.item_id == item.item_id)
@@ -30,16 +39,30 @@ async def create_menu_item(db: AsyncSession, data: MenuItemCreate) -> MenuItem:
 async def get_menu_item(db: AsyncSession, item_id: int) -> Optional[MenuItem]:
     return await db.get(MenuItem, item_id, options=[selectinload(MenuItem.images)])
 
+async def get_menu_items_by_ids(db: AsyncSession, item_ids: Sequence[int]) -> List[MenuItem]:
+    # 1 câu IN cho món + 1 câu IN cho ảnh của tất cả các món
+    result = await db.execute(
+        select(MenuItem).options(selectinload(MenuItem.images)).where(MenuItem.item_id.in_(item_ids))
+    )
+    return list(result.scalars().all())
+
 async def update_menu_item(db: AsyncSession, data: MenuItemUpdate) -> Optional[MenuItem]:
     item = await db.get(MenuItem, data.item_id)
     if not item:
         return None
+    old_category_id = item.category_id
     for field, value in data.model_dump(exclude_unset=True).items():
         if field != "item_id" and value is not None:
             setattr(item, field, value)
+    if item.category_id != old_category_id:
+        await adjust_product_count(db, old_category_id, -1)
+        await adjust_product_count(db, item.category_id, 1)
     db.add(item)
     await db.commit()
     await db.refresh(item)
+    menu_snapshots.invalidate(item.restaurant_id)
+    index_menu_item(item)
+    suggestions.ensure(item.name)
     result = await db.execute(
         select(MenuItem).options(selectinload(MenuItem.images)).where(MenuItem.item_id == item.item_id)
     )
@@ -52,27 +75,83 @@ async def delete_menu_item(db: AsyncSession, item_id: int) -> bool:
     item = await db.get(MenuItem, item_id)
     if not item:
         return False
+    restaurant_id = item.restaurant_id
     await db.delete(item)
+    await adjust_product_count(db, item.category_id, -1)
     await db.commit()
+    menu_snapshots.invalidate(restaurant_id)
+    search_index.remove(MENU_ITEM, item_id)
     return True
 
-async def list_menu_items(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[MenuItem]:
-    result = await db.execute(select(MenuItem).options(selectinload(MenuItem.images)).offset(skip).limit(limit))
-    return list(result.scalars().all())
+async def bulk_update_menu_items(db: AsyncSession, data: MenuItemBulkUpdate) -> int:
+    """
+    Đổi giá (theo % hoặc cộng/trừ một khoản) và/hoặc trạng thái còn món cho nhiều món
+    của một quán bằng một câu UPDATE ... WHERE. Trả về số món khớp điều kiện.
+    """
+    conditions = [MenuItem.restaurant_id == data.restaurant_id]
+    if data.category_id is not None:
+        conditions.append(MenuItem.category_id == data.category_id)
+    if data.item_ids:
+        conditions.append(MenuItem.item_id.in_(data.item_ids))
+
+    values = {}
+    if data.price_percent is not None:
+        values["price"] = func.round(MenuItem.price * Decimal(str(100 + data.price_percent)) / 100, 2)
+    elif data.price_delta is not None:
+        price = MenuItem.price + Decimal(str(data.price_delta))
+        values["price"] = case((price < 0, 0), else_=price)
+    if data.available is not None:
+        values["available"] = data.available
 
-async def list_menu_items_by_category(db, category_id: int, skip: int = 0, limit: int = 100):
     result = await db.execute(
-        select(MenuItem).options(selectinload(MenuItem.images)).where(MenuItem.category_id == category_id).offset(skip).limit(limit)
+        update(MenuItem).where(*conditions).values(**values).execution_options(synchronize_session=False)
     )
-    return list(result.scalars().all())
+    await db.commit()
+    if result.rowcount:
+        menu_snapshots.invalidate(data.restaurant_id)
+        await reindex_menu_items(db, *conditions)
+    return result.rowcount
+
+async def reindex_menu_items(db: AsyncSession, *conditions) -> list:
+    """Sau khi ghi hàng loạt: load lại (chỉ các cột cần) các món khớp điều kiện vào search index."""
+    result = await db.execute(
+        select(MenuItem.item_id, MenuItem.restaurant_id, MenuItem.name, MenuItem.description,
+               MenuItem.price, MenuItem.available)
+        .where(*conditions)
+    )
+    items = result.all()
+    for item in items:
+        index_menu_item(item)
+    return items
+
+def _menu_items_query(fields: Optional[Sequence[str]] = None):
+    """Đủ entity kèm images, hoặc chỉ các cột trong fields (không có images)."""
+    stmt = select_fields(MenuItem, fields)
+    return stmt.options(selectinload(MenuItem.images)) if fields is None else stmt
+
+async def list_menu_items(
+    db: AsyncSession, skip: int = 0, limit: int = 100, fields: Optional[Sequence[str]] = None
+) -> List[MenuItem]:
+    result = await db.execute(_menu_items_query(fields).order_by(MenuItem.item_id).offset(skip).limit(limit))
+    return fetch_all(result, fields)
+
+async def list_menu_items_page(
+    db: AsyncSession, cursor: Optional[str], limit: int, fields: Optional[Sequence[str]] = None
+) -> tuple[List[MenuItem], Optional[str]]:
+    return await paginate(db, _menu_items_query(fields), [MenuItem.item_id], cursor, limit)
 
-async def list_menu_items_by_restaurant_id(db: AsyncSession, restaurant_id: int) -> List[MenuItem]:
+async def list_menu_items_by_category(db, category_id: int, skip: int = 0, limit: int = 100):
     result = await db.execute(
-        select(MenuItem)
-        .options(selectinload(MenuItem.images))
-        .where(MenuItem.restaurant_id == restaurant_id)
+        select(MenuItem).options(selectinload(MenuItem.images)).where(MenuItem.category_id == category_id)
+        .order_by(MenuItem.item_id).offset(skip).limit(limit)
     )
-    return result.scalars().all()
+    return list(result.scalars().all())
+
+async def list_menu_items_by_restaurant_id(
+    db: AsyncSession, restaurant_id: int, fields: Optional[Sequence[str]] = None
+) -> List[MenuItem]:
+    result = await db.execute(_menu_items_query(fields).where(MenuItem.restaurant_id == restaurant_id))
+    return fetch_all(result, fields)
 
 # CRUD MenuItemImage
 
@@ -89,14 +168,18 @@ async def add_menu_item_image(db: AsyncSession, data: MenuItemImageCreate) -> Me
     db.add(img)
     await db.commit()
     await db.refresh(img)
+    await invalidate_menu_of_item(db, data.item_id)
     return img
 
 async def delete_menu_item_image(db: AsyncSession, image_id: int) -> bool:
     img = await db.get(MenuItemImage, image_id)
     if not img:
         return False
+    restaurant_id = await restaurant_id_of_image(db, image_id)
     await db.delete(img)
     await db.commit()
+    if restaurant_id is not None:
+        menu_snapshots.invalidate(restaurant_id)
     return True
 
 async def delete_menu_item_all_image(db: AsyncSession, item_id: int) -> bool:
@@ -107,13 +190,12 @@ async def delete_menu_item_all_image(db: AsyncSession, item_id: int) -> bool:
     if not images:
         return False
     for img in images:
-        file_path = os.path.join("static", "menu_images", os.path.basename(img.image_url))
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        await remove_file(UPLOAD_DIR, img.image_url)
 
         await db.delete(img)
 
     await db.commit()
+    await invalidate_menu_of_item(db, item_id)
     return True
 
 async def list_menu_item_images(db: AsyncSession, item_id: int) -> List[MenuItemImage]:
@@ -121,13 +203,6 @@ async def list_menu_item_images(db: AsyncSession, item_id: int) -> List[MenuItem
     return list(result.scalars().all())
 
 UPLOAD_DIR = "static/menu_images"
-MAX_SIZE = 3 * 1024 * 1024     # 3MB
-ALLOWED_TYPES = {"image/jpeg", "image/png", "image/webp"}
-
-def generate_image_filename(item_id: int, original_filename: str) -> str:
-    ext = os.path.splitext(original_filename)[1]
-    unique = uuid.uuid4().hex
-    return f"{item_id}_{unique}{ext}"
 
 
 async def upload_menu_image_service(
@@ -136,38 +211,32 @@ async def upload_menu_image_service(
     file: UploadFile,
     is_primary: bool = False
 ) -> MenuItemImage:
-    # Validate type
-    if file.content_type not in ALLOWED_TYPES:
-        raise HTTPException(400, f"File {file.filename} is not an allowed image type!")
-    # Read content
-    content = await file.read()
-    if len(content) > MAX_SIZE:
-        raise HTTPException(400, f"File {file.filename} is too large! Max 3MB.")
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
-    if not file.filename:
-        raise HTTPException(400, "Uploaded file must have a filename.")    
-    filename = generate_image_filename(item_id, file.filename)
-    file_path = os.path.join(UPLOAD_DIR, filename)
-    with open(file_path, "wb") as f:
-        f.write(content)
+    # Kiểm tra món trước khi ghi file để không để lại ảnh mồ côi
+    if not await db.get(MenuItem, item_id):
+        raise HTTPException(404, "Menu item not found")
+    filename = await save_image(file, UPLOAD_DIR, f"{item_id}_")
     image_url = f"/static/menu_images/{filename}"
-
-    # Nếu là primary, unset các ảnh primary cũ của item này
-    if is_primary:
-        await db.execute(
-            update(MenuItemImage)
-            .where(MenuItemImage.item_id == item_id)
-            .values(is_primary=False)
+    try:
+        # Nếu là primary, unset các ảnh primary cũ của item này
+        if is_primary:
+            await db.execute(
+                update(MenuItemImage)
+                .where(MenuItemImage.item_id == item_id)
+                .values(is_primary=False)
+            )
+        img = MenuItemImage(
+            item_id=item_id,
+            image_url=image_url,
+            is_primary=is_primary
         )
+        db.add(img)
         await db.commit()
-    img = MenuItemImage(
-        item_id=item_id,
-        image_url=image_url,
-        is_primary=is_primary
-    )
-    db.add(img)
-    await db.commit()
+    except Exception:
+        await db.rollback()
+        await remove_file(UPLOAD_DIR, filename)
+        raise
     await db.refresh(img)
+    await invalidate_menu_of_item(db, item_id)
     return img
 
 async def upload_multi_menu_images_service(
@@ -176,38 +245,45 @@ async def upload_multi_menu_images_service(
     files: List[UploadFile],
     is_primary: bool = False
 ) -> List[MenuItemImage]:
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    if not await db.get(MenuItem, item_id):
+        raise HTTPException(404, "Menu item not found")
+    # Lưu hết file trước khi đụng tới DB; một file hỏng thì xoá các file đã lưu
+    filenames = []
+    try:
+        for file in files:
+            filenames.append(await save_image(file, UPLOAD_DIR, f"{item_id}_"))
+    except HTTPException:
+        for filename in filenames:
+            await remove_file(UPLOAD_DIR, filename)
+        raise
     results = []
-    # Nếu có ít nhất 1 ảnh is_primary, unset tất cả primary cũ (chỉ 1 lần)
-    set_primary = is_primary or any(is_primary for _ in files)
-    if set_primary:
-        await db.execute(
-            update(MenuItemImage)
-            .where(MenuItemImage.item_id == item_id)
-            .values(is_primary=False)
-        )
+    # Lỗi ở phần DB (commit hỏng, mất kết nối...) thì rollback và xoá các file vừa lưu,
+    # không để lại ảnh mồ côi trên đĩa
+    try:
+        # Nếu có ít nhất 1 ảnh is_primary, unset tất cả primary cũ (chỉ 1 lần)
+        set_primary = is_primary or any(is_primary for _ in files)
+        if set_primary:
+            await db.execute(
+                update(MenuItemImage)
+                .where(MenuItemImage.item_id == item_id)
+                .values(is_primary=False)
+            )
+        for i, filename in enumerate(filenames):
+            image_url = f"/static/menu_images/{filename}"
+            img = MenuItemImage(
+                item_id=item_id,
+                image_url=image_url,
+                is_primary=is_primary if i == 0 else False  # Có thể chỉnh lại logic nếu muốn cho FE tự chọn primary
+            )
+            db.add(img)
+            results.append(img)
         await db.commit()
-    for i, file in enumerate(files):
-        if file.content_type not in ALLOWED_TYPES:
-            raise HTTPException(400, f"File {file.filename} is not an allowed image type!")
-        content = await file.read()
-        if len(content) > MAX_SIZE:
-            raise HTTPException(400, f"File {file.filename} is too large! Max 3MB.")
-        if not file.filename:
-            raise HTTPException(400, "Uploaded file must have a filename.")
-        filename = generate_image_filename(item_id, file.filename)
-        file_path = os.path.join(UPLOAD_DIR, filename)
-        with open(file_path, "wb") as f:
-            f.write(content)
-        image_url = f"/static/menu_images/{filename}"
-        img = MenuItemImage(
-            item_id=item_id,
-            image_url=image_url,
-            is_primary=is_primary if i == 0 else False  # Có thể chỉnh lại logic nếu muốn cho FE tự chọn primary
-        )
-        db.add(img)
-        results.append(img)
-    await db.commit()
+    except Exception:
+        await db.rollback()
+        for filename in filenames:
+            await remove_file(UPLOAD_DIR, filename)
+        raise
     for img in results:
         await db.refresh(img)
+    await invalidate_menu_of_item(db, item_id)
     return results
\ No newline at end of file
@@ -0,0 +1,138 @@
+import asyncio
+import hashlib
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
+
+from config import MENU_SNAPSHOT_TTL
+from models import MenuItem, MenuItemImage, Restaurant
+from schemas.menu_item import MenuItemResponse
+from schemas.restaurant import MenuCategoryGroup, RestaurantMenuResponse, RestaurantResponse
+
+
+@dataclass(frozen=True)
+class MenuSnapshot:
+    restaurant_id: int
+    version: str
+    body: bytes  # JSON đã encode sẵn, trả thẳng cho client
+    built_at: float = 0.0  # time.monotonic() lúc build
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.version}"'
+
+
+class MenuSnapshotCache:
+    """
+    Snapshot menu theo từng quán, giữ trong bộ nhớ của process.
+
+    Snapshot được build lại khi các service ghi vào menu của quán gọi
+    invalidate(), hoặc khi đã cũ hơn `ttl` giây. invalidate() chỉ chạy ở
+    worker xử lý request ghi; các worker khác nhận thay đổi nhờ TTL, nên
+    menu (và ETag) một worker trả về trễ so với DB tối đa MENU_SNAPSHOT_TTL
+    giây. Build lại khi dữ liệu không đổi cho cùng version nên ETag của
+    client vẫn khớp.
+
+    Mỗi lần invalidate tăng generation của quán; snapshot build xong mà
+    generation đã đổi thì không được lưu (tránh lưu bản cũ khi có ghi chen
+    vào giữa lúc build).
+    """
+
+    def __init__(self, ttl: float = MENU_SNAPSHOT_TTL):
+        self.ttl = ttl
+        self._snapshots: Dict[int, MenuSnapshot] = {}
+        self._generations: Dict[int, int] = defaultdict(int)
+        self._locks: Dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    def peek(self, restaurant_id: int) -> Optional[MenuSnapshot]:
+        """Snapshot còn hạn trong cache, không build."""
+        snapshot = self._snapshots.get(restaurant_id)
+        if snapshot and time.monotonic() - snapshot.built_at < self.ttl:
+            return snapshot
+        return None
+
+    async def get(self, db: AsyncSession, restaurant_id: int) -> Optional[MenuSnapshot]:
+        snapshot = self.peek(restaurant_id)
+        if snapshot:
+            return snapshot
+        # Nhiều request cùng miss chỉ build một lần
+        async with self._locks[restaurant_id]:
+            snapshot = self.peek(restaurant_id)
+            if snapshot:
+                return snapshot
+            generation = self._generations[restaurant_id]
+            snapshot = await build_menu_snapshot(db, restaurant_id)
+            if snapshot and self._generations[restaurant_id] == generation:
+                self._snapshots[restaurant_id] = snapshot
+            return snapshot
+
+    def invalidate(self, restaurant_id: int) -> None:
+        self._generations[restaurant_id] += 1
+        self._snapshots.pop(restaurant_id, None)
+
+    def clear(self) -> None:
+        for restaurant_id in list(self._generations):
+            self._generations[restaurant_id] += 1
+        self._snapshots.clear()
+
+
+menu_snapshots = MenuSnapshotCache()
+
+
+async def build_menu_snapshot(db: AsyncSession, restaurant_id: int) -> Optional[MenuSnapshot]:
+    restaurant = await db.get(Restaurant, restaurant_id)
+    if not restaurant:
+        return None
+    result = await db.execute(
+        select(MenuItem)
+        .options(selectinload(MenuItem.images), selectinload(MenuItem.category))
+        .where(MenuItem.restaurant_id == restaurant_id)
+        .order_by(MenuItem.category_id, MenuItem.item_id)
+    )
+    groups: Dict[int, MenuCategoryGroup] = {}
+    for item in result.scalars().all():
+        group = groups.get(item.category_id)
+        if group is None:
+            category = item.category
+            group = groups[item.category_id] = MenuCategoryGroup(
+                category_id=item.category_id,
+                name=category.name if category else "",
+                image_url=category.image_url if category else None,
+                items=[],
+            )
+        group.items.append(MenuItemResponse.model_validate(item))
+
+    menu = RestaurantMenuResponse(
+        restaurant=RestaurantResponse.model_validate(restaurant),
+        categories=list(groups.values()),
+        version="",
+    )
+    # version = hash nội dung, nên các worker khác nhau build cùng dữ liệu sẽ ra cùng ETag
+    version = hashlib.sha1(menu.model_dump_json(exclude={"version"}).encode()).hexdigest()[:16]
+    menu.version = version
+    return MenuSnapshot(restaurant_id, version, menu.model_dump_json().encode(), time.monotonic())
+
+
+async def restaurant_id_of_item(db: AsyncSession, item_id: int) -> Optional[int]:
+    result = await db.execute(select(MenuItem.restaurant_id).where(MenuItem.item_id == item_id))
+    return result.scalar()
+
+
+async def restaurant_id_of_image(db: AsyncSession, image_id: int) -> Optional[int]:
+    result = await db.execute(
+        select(MenuItem.restaurant_id)
+        .join(MenuItemImage, MenuItemImage.item_id == MenuItem.item_id)
+        .where(MenuItemImage.image_id == image_id)
+    )
+    return result.scalar()
+
+
+async def invalidate_menu_of_item(db: AsyncSession, item_id: int) -> None:
+    restaurant_id = await restaurant_id_of_item(db, item_id)
+    if restaurant_id is not None:
+        menu_snapshots.invalidate(restaurant_id)
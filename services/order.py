@@ -1,8 +1,11 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List, Optional
-from models import Order, OrderStatus, PaymentMethod, Voucher
+from typing import List, Optional, Sequence
+from models import Order, OrderStatus, PaymentMethod, Review, Voucher
+from core.fields import fetch_all, select_fields
+from core.pagination import paginate
 from schemas.order import OrderCreate, OrderUpdate
+from services.review import discount_reviews
 
 
 async def create_order(db: AsyncSession, data: OrderCreate) -> Order:
@@ -28,8 +31,12 @@ async def create_order(db: AsyncSession, data: OrderCreate) -> Order:
     await db.commit()
     return obj
 
-async def get_order(db: AsyncSession, order_id: int) -> Optional[Order]:
-    return await db.get(Order, order_id)
+async def get_order(db: AsyncSession, order_id: int, options: Sequence = ()) -> Optional[Order]:
+    return await db.get(Order, order_id, options=options)
+
+async def get_orders_by_ids(db: AsyncSession, order_ids: Sequence[int], options: Sequence = ()) -> List[Order]:
+    result = await db.execute(select(Order).options(*options).where(Order.order_id.in_(order_ids)))
+    return list(result.scalars().all())
 
 async def update_order(db: AsyncSession, data: OrderUpdate) -> Optional[Order]:
     obj = await db.get(Order, data.order_id)
@@ -47,35 +54,60 @@ async def delete_order(db: AsyncSession, order_id: int) -> bool:
     obj = await db.get(Order, order_id)
     if not obj:
         return False
+    await discount_reviews(db, Review.order_id == order_id)
     await db.delete(obj)
     await db.commit()
     return True
 
-async def list_orders(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Order]:
-    result = await db.execute(select(Order).offset(skip).limit(limit))
-    return list(result.scalars().all())
+async def list_orders(
+    db: AsyncSession, skip: int = 0, limit: int = 100, fields: Optional[Sequence[str]] = None, options: Sequence = ()
+) -> List[Order]:
+    """options: loader options từ ?include= (chỉ dùng khi không có fields)."""
+    # ORDER BY khoá chính: với fields MySQL có thể đọc theo covering index, thứ tự tự nhiên khác đi
+    result = await db.execute(
+        select_fields(Order, fields).options(*options).order_by(Order.order_id).offset(skip).limit(limit)
+    )
+    return fetch_all(result, fields)
 
-async def get_orders_by_user(db: AsyncSession, user_uid: str, skip: int = 0, limit: int = 100) -> List[Order]:
+async def get_orders_by_user(
+    db: AsyncSession, user_uid: str, skip: int = 0, limit: int = 100, options: Sequence = ()
+) -> List[Order]:
     result = await db.execute(
-        select(Order).where(Order.user_uid == user_uid).offset(skip).limit(limit)
+        select(Order).options(*options).where(Order.user_uid == user_uid)
+        .order_by(Order.order_id).offset(skip).limit(limit)
     )
     return list(result.scalars().all())
 
-async def get_orders_by_restaurant(db: AsyncSession, restaurant_id: int, skip: int = 0, limit: int = 100) -> List[Order]:
+async def get_orders_by_restaurant(
+    db: AsyncSession, restaurant_id: int, skip: int = 0, limit: int = 100,
+    fields: Optional[Sequence[str]] = None, options: Sequence = ()
+) -> List[Order]:
     result = await db.execute(
-        select(Order).where(Order.restaurant_id == restaurant_id).offset(skip).limit(limit)
+        select_fields(Order, fields).options(*options).where(Order.restaurant_id == restaurant_id)
+        .order_by(Order.order_id).offset(skip).limit(limit)
     )
-    return list(result.scalars().all())
+    return fetch_all(result, fields)
 
 async def get_orders_by_status(db: AsyncSession, status: OrderStatus, skip: int = 0, limit: int = 100) -> List[Order]:
     result = await db.execute(
-        select(Order).where(Order.status == status).offset(skip).limit(limit)
+        select(Order).where(Order.status == status).order_by(Order.order_id).offset(skip).limit(limit)
     )
     return list(result.scalars().all())
 
 async def get_orders_by_shipper(db: AsyncSession, shipper_uid: str, skip: int = 0, limit: int = 100) -> List[Order]:
     result = await db.execute(
-        select(Order).where(Order.shipper_uid == shipper_uid).offset(skip).limit(limit)
+        select(Order).where(Order.shipper_uid == shipper_uid).order_by(Order.order_id).offset(skip).limit(limit)
     )
     return list(result.scalars().all())
 
+async def list_orders_page(
+    db: AsyncSession, cursor: Optional[str], limit: int, fields: Optional[Sequence[str]] = None, options: Sequence = ()
+) -> tuple[List[Order], Optional[str]]:
+    stmt = select_fields(Order, fields).options(*options)
+    return await paginate(db, stmt, [Order.created_at, Order.order_id], cursor, limit, descending=True)
+
+async def get_orders_by_user_page(
+    db: AsyncSession, user_uid: str, cursor: Optional[str], limit: int, options: Sequence = ()
+) -> tuple[List[Order], Optional[str]]:
+    stmt = select(Order).options(*options).where(Order.user_uid == user_uid)
+    return await paginate(db, stmt, [Order.created_at, Order.order_id], cursor, limit, descending=True)
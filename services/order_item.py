@@ -3,12 +3,14 @@ from sqlalchemy.future import select
 from typing import List, Optional
 from models import OrderItem
 from schemas.order_item import OrderItemCreate, OrderItemUpdate
+from services.autocomplete import bump_ordered_item
 
 async def create_order_item(db: AsyncSession, data: OrderItemCreate) -> OrderItem:
     obj = OrderItem(**data.model_dump(exclude_unset=True))
     db.add(obj)
     await db.commit()
     await db.refresh(obj)
+    bump_ordered_item(obj.item_id)
     return obj
 
 async def get_order_item(db: AsyncSession, order_item_id: int) -> Optional[OrderItem]:
@@ -0,0 +1,91 @@
+import math
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import (
+    DELIVERY_BASE_FEE, DELIVERY_FEE_TIERS, DELIVERY_PREP_MINUTES, DELIVERY_ROAD_FACTOR, DELIVERY_SPEED_KMH,
+)
+from models import Address
+from services.geo import geo_index, haversine_km, haversine_km_array
+
+# Bậc phí: (từ km, tới km, phí mỗi km) — km đầu tiên tính theo DELIVERY_BASE_FEE
+_TIER_START = np.array([start for start, _, _ in DELIVERY_FEE_TIERS], dtype=np.float64)
+_TIER_END = np.array([end for _, end, _ in DELIVERY_FEE_TIERS], dtype=np.float64)
+_TIER_RATE = np.array([rate for _, _, rate in DELIVERY_FEE_TIERS], dtype=np.float64)
+
+
+def quote_arrays(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Khoảng cách (km), phí giao (VND) và ETA (phút) từ một điểm tới N quán, tính
+    trong một lượt vector hoá. lats/lngs là mảng float64 cùng độ dài N.
+    """
+    distance = haversine_km_array(lat, lng, lats, lngs)
+    # Quãng đường thực tế dài hơn đường chim bay
+    road = distance * DELIVERY_ROAD_FACTOR
+    # (N, T): số km rơi vào từng bậc phí
+    km_in_tier = np.clip(road[:, None] - _TIER_START, 0, _TIER_END - _TIER_START)
+    fee = DELIVERY_BASE_FEE + np.ceil(km_in_tier).dot(_TIER_RATE)
+    # Làm tròn lên 1.000đ
+    fee = np.ceil(fee / 1000) * 1000
+
+    eta = np.ceil(DELIVERY_PREP_MINUTES + road / DELIVERY_SPEED_KMH * 60)
+    return distance, fee, eta
+
+
+def quote_one(lat: float, lng: float, restaurant_lat: float, restaurant_lng: float) -> Tuple[float, float, float]:
+    """Bản tính từng quán một (dùng khi chỉ có 1 quán và để so sánh trong benchmarks/quote_bench.py)."""
+    distance = haversine_km(lat, lng, restaurant_lat, restaurant_lng)
+    road = distance * DELIVERY_ROAD_FACTOR
+    fee = DELIVERY_BASE_FEE
+    for start, end, rate in DELIVERY_FEE_TIERS:
+        fee += math.ceil(min(max(road - start, 0), end - start)) * rate
+    fee = math.ceil(fee / 1000) * 1000
+    eta = math.ceil(DELIVERY_PREP_MINUTES + road / DELIVERY_SPEED_KMH * 60)
+    return distance, fee, eta
+
+
+def quote_restaurants(lat: float, lng: float, restaurant_ids: Iterable[int]) -> dict:
+    """
+    restaurant_id -> {distance_km, delivery_fee, eta_minutes}. Toạ độ quán lấy từ
+    geo_index nên không cần query DB; quán chưa có toạ độ không có trong kết quả.
+    """
+    located = []
+    for restaurant_id in restaurant_ids:
+        point = geo_index.point(restaurant_id)
+        if point:
+            located.append((restaurant_id, *point))
+    if not located:
+        return {}
+    ids, lats, lngs = zip(*located)
+    distance, fee, eta = quote_arrays(lat, lng, np.array(lats, dtype=np.float64), np.array(lngs, dtype=np.float64))
+    return {
+        restaurant_id: {"distance_km": round(d, 3), "delivery_fee": f, "eta_minutes": int(e)}
+        for restaurant_id, d, f, e in zip(ids, distance.tolist(), fee.tolist(), eta.tolist())
+    }
+
+
+async def resolve_point(
+    db: AsyncSession, address_id: Optional[int], lat: Optional[float], lng: Optional[float]
+) -> Tuple[float, float]:
+    """Toạ độ giao hàng: lấy từ address_id nếu có, không thì dùng lat/lng truyền vào."""
+    if address_id is not None:
+        address = await db.get(Address, address_id)
+        if not address:
+            raise HTTPException(404, "Address not found")
+        if address.latitude is None or address.longitude is None:
+            raise HTTPException(400, "Address has no coordinates")
+        return address.latitude, address.longitude
+    if lat is None or lng is None:
+        raise HTTPException(400, "Provide address_id or both lat and lng")
+    return lat, lng
+
+
+async def resolve_optional_point(
+    db: AsyncSession, address_id: Optional[int], lat: Optional[float], lng: Optional[float]
+) -> Optional[Tuple[float, float]]:
+    if address_id is None and (lat is None or lng is None):
+        return None
+    return await resolve_point(db, address_id, lat, lng)
@@ -1,11 +1,17 @@
-from http.client import HTTPException
-import os
-import uuid
-from fastapi import UploadFile
+from fastapi import HTTPException, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List, Optional
-from models import Restaurant
+from typing import List, Optional, Sequence, Tuple
+from models import Restaurant, RestaurantStatus
+from core.fields import fetch_all, select_fields
+from core.pagination import paginate
+from core.uploads import remove_file, save_image
+from services.autocomplete import suggestions
+from services.category import discount_restaurant_items
+from services.geo import geo_index
+from services.menu_snapshot import menu_snapshots
+from services.schedule import open_intervals
+from services.search import index_restaurant, search_index
 from schemas.restaurant import RestaurantCreate, RestaurantUpdate
 
 async def create_restaurant(db: AsyncSession, data: RestaurantCreate) -> Restaurant:
@@ -13,11 +19,18 @@ async def create_restaurant(db: AsyncSession, data: RestaurantCreate) -> Restaur
     db.add(obj)
     await db.commit()
     await db.refresh(obj)
+    index_restaurant(obj)
+    suggestions.ensure(obj.name)
+    geo_index.put(obj.restaurant_id, obj.latitude, obj.longitude)
     return obj
 
 async def get_restaurant(db: AsyncSession, restaurant_id: int) -> Optional[Restaurant]:
     return await db.get(Restaurant, restaurant_id)
 
+async def get_restaurants_by_ids(db: AsyncSession, restaurant_ids: Sequence[int]) -> List[Restaurant]:
+    result = await db.execute(select(Restaurant).where(Restaurant.restaurant_id.in_(restaurant_ids)))
+    return list(result.scalars().all())
+
 async def update_restaurant(db: AsyncSession, data: RestaurantUpdate) -> Optional[Restaurant]:
     print("Incoming data:", data.model_dump(exclude_unset=True))
     obj = await db.get(Restaurant, data.restaurant_id)
@@ -29,19 +42,63 @@ async def update_restaurant(db: AsyncSession, data: RestaurantUpdate) -> Optiona
     db.add(obj)
     await db.commit()
     await db.refresh(obj)
+    menu_snapshots.invalidate(obj.restaurant_id)
+    index_restaurant(obj)
+    suggestions.ensure(obj.name)
+    geo_index.put(obj.restaurant_id, obj.latitude, obj.longitude)
     return obj
 
 async def delete_restaurant(db: AsyncSession, restaurant_id: int) -> bool:
     obj = await db.get(Restaurant, restaurant_id)
     if not obj:
         return False
+    await discount_restaurant_items(db, restaurant_id)
     await db.delete(obj)
     await db.commit()
+    menu_snapshots.invalidate(restaurant_id)
+    search_index.remove_restaurant(restaurant_id)
+    geo_index.remove(restaurant_id)
+    open_intervals.remove(restaurant_id)
     return True
 
-async def list_restaurants(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Restaurant]:
-    result = await db.execute(select(Restaurant).offset(skip).limit(limit))
-    return list(result.scalars().all())
+def _restaurants_query(open_now: bool = False, fields: Optional[Sequence[str]] = None):
+    stmt = select_fields(Restaurant, fields)
+    if open_now:
+        # status được services/schedule.py giữ đúng theo lịch nên chỉ cần lọc theo cột (có index)
+        stmt = stmt.where(Restaurant.status == RestaurantStatus.open)
+    return stmt
+
+async def list_restaurants(
+    db: AsyncSession, skip: int = 0, limit: int = 100, open_now: bool = False, fields: Optional[Sequence[str]] = None
+) -> List[Restaurant]:
+    """fields: chỉ SELECT các cột này và trả về Row thay cho Restaurant."""
+    result = await db.execute(
+        _restaurants_query(open_now, fields).order_by(Restaurant.restaurant_id).offset(skip).limit(limit)
+    )
+    return fetch_all(result, fields)
+
+async def list_nearby_restaurants(
+    db: AsyncSession, lat: float, lng: float, radius_km: float, limit: int = 20, open_now: bool = False
+) -> List[Tuple[Restaurant, float]]:
+    """Quán trong bán kính radius_km quanh (lat, lng), gần nhất trước, kèm khoảng cách (km)."""
+    # Khi lọc open_now, lấy hết quán trong bán kính rồi nạp từng đợt cho tới khi đủ limit
+    hits = geo_index.nearby(lat, lng, radius_km, len(geo_index) if open_now else limit)
+    found = []
+    for i in range(0, len(hits), limit * 2):
+        chunk = hits[i:i + limit * 2]
+        result = await db.execute(
+            _restaurants_query(open_now).where(Restaurant.restaurant_id.in_([rid for rid, _ in chunk]))
+        )
+        restaurants = {r.restaurant_id: r for r in result.scalars().all()}
+        found += [(restaurants[rid], distance) for rid, distance in chunk if rid in restaurants]
+        if len(found) >= limit:
+            break
+    return found[:limit]
+
+async def list_restaurants_page(
+    db: AsyncSession, cursor: Optional[str], limit: int, open_now: bool = False, fields: Optional[Sequence[str]] = None
+) -> tuple[List[Restaurant], Optional[str]]:
+    return await paginate(db, _restaurants_query(open_now, fields), [Restaurant.restaurant_id], cursor, limit)
 
 async def get_restaurant_by_user_id(db: AsyncSession, user_uid: str) -> List[Restaurant]:
     """
@@ -53,46 +110,27 @@ async def get_restaurant_by_user_id(db: AsyncSession, user_uid: str) -> List[Res
     return list(result.scalars().all())
 
 RESTAURANT_IMAGE_DIR = "static/restaurant_images"
-ALLOWED_RESTAURANT_IMG_TYPES = {"image/jpeg", "image/png", "image/webp"}
-MAX_RESTAURANT_IMG_SIZE = 3 * 1024 * 1024  # 3MB    
-
-def generate_restaurant_image_filename(original_filename: str) -> str:
-    ext = os.path.splitext(original_filename)[1]
-    unique = uuid.uuid4().hex
-    return f"restaurant_{unique}{ext}"
 
 async def upload_restaurant_image(
         db: AsyncSession,
         restaurant_id: int,
         file: UploadFile) -> str:
-    # Validate type
-    if file.content_type not in ALLOWED_RESTAURANT_IMG_TYPES:
-        raise HTTPException(400, "Invalid image type")
-    # Validate sizecontent = await file.read()
-    content = await file.read()
-    if not content:
-        raise HTTPException(400, "Empty file")
-    # Check size
-    if len(content) > MAX_RESTAURANT_IMG_SIZE:
-        raise HTTPException(400, "Image size exceeds limit")
-    # Generate filename
-    os.makedirs(RESTAURANT_IMAGE_DIR, exist_ok=True)
-    if not file.filename:
-        raise HTTPException(400, "Uploaded file must have a filename.")
-    filename = generate_restaurant_image_filename(file.filename)
-    
-    file_path = os.path.join(RESTAURANT_IMAGE_DIR, filename)
-    # Save file
-    with open(file_path, "wb") as f:
-        f.write(await file.read())
-    # Update restaurant image URL
     restaurant = await get_restaurant(db, restaurant_id)
     if not restaurant:
         raise HTTPException(404, "Restaurant not found")
-    restaurant.image_url = f"/static/restaurant_images/{filename}"
-    db.add(restaurant)
-    await db.commit()
+    # Save file
+    filename = await save_image(file, RESTAURANT_IMAGE_DIR, "restaurant_")
+    # Update restaurant image URL
+    try:
+        restaurant.image_url = f"/static/restaurant_images/{filename}"
+        db.add(restaurant)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        await remove_file(RESTAURANT_IMAGE_DIR, filename)
+        raise
     await db.refresh(restaurant)
+    menu_snapshots.invalidate(restaurant_id)
 
     return restaurant.image_url
 
@@ -101,11 +139,10 @@ async def delete_restaurant_image(restaurant_id: int, db: AsyncSession) -> bool:
     if not restaurant or not restaurant.image_url:
         return False
     # Delete image file from disk
-    image_path = os.path.join(RESTAURANT_IMAGE_DIR, os.path.basename(restaurant.image_url))
-    if os.path.exists(image_path):
-        os.remove(image_path)
+    await remove_file(RESTAURANT_IMAGE_DIR, restaurant.image_url)
     # Clear image URL in database
     restaurant.image_url = None
     await db.commit()
     await db.refresh(restaurant)
+    menu_snapshots.invalidate(restaurant_id)
     return True
\ No newline at end of file
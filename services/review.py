@@ -0,0 +1,156 @@
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import Float, case, cast, func, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from core.pagination import paginate
+from models import Order, OrderStatus, Restaurant, Review
+from schemas.review import ReviewCreate
+from services.menu_snapshot import menu_snapshots
+
+STARS = range(1, 6)
+STAR_COLUMNS = {star: getattr(Restaurant, f"rating_{star}") for star in STARS}
+
+
+async def adjust_rating(db: AsyncSession, restaurant_id: int, stars: Dict[int, int]) -> None:
+    """
+    Cộng (số dương) / trừ (số âm) review theo số sao vào rating_sum, rating_count,
+    histogram và rating của quán bằng một câu UPDATE; caller tự commit.
+    """
+    sum_delta = sum(star * n for star, n in stars.items())
+    count_delta = sum(stars.values())
+    new_count = Restaurant.rating_count + count_delta
+    # rating đặt đầu tiên: MySQL tính SET từ trái sang phải, nên rating phải dùng giá trị cũ như các DB khác
+    values = [
+        (Restaurant.rating, case(
+            (new_count > 0, (Restaurant.rating_sum + sum_delta) / cast(new_count, Float)), else_=0.0
+        )),
+        (Restaurant.rating_sum, Restaurant.rating_sum + sum_delta),
+        (Restaurant.rating_count, new_count),
+    ]
+    values += [(STAR_COLUMNS[star], STAR_COLUMNS[star] + n) for star, n in stars.items() if n]
+    await db.execute(
+        update(Restaurant)
+        .where(Restaurant.restaurant_id == restaurant_id)
+        .ordered_values(*values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def discount_reviews(db: AsyncSession, *conditions) -> None:
+    """Trừ các review khớp điều kiện khỏi rating của quán, gọi trước khi xoá đơn/user (review bị xoá theo cascade)."""
+    result = await db.execute(
+        select(Review.restaurant_id, Review.rating, func.count())
+        .where(*conditions, Review.rating.between(1, 5))
+        .group_by(Review.restaurant_id, Review.rating)
+    )
+    by_restaurant: Dict[int, Counter] = defaultdict(Counter)
+    for restaurant_id, rating, count in result.all():
+        by_restaurant[restaurant_id][rating] -= count
+    for restaurant_id, stars in by_restaurant.items():
+        await adjust_rating(db, restaurant_id, stars)
+    for restaurant_id in by_restaurant:
+        menu_snapshots.invalidate(restaurant_id)
+
+
+async def create_review(db: AsyncSession, data: ReviewCreate) -> Review:
+    if not await db.get(Restaurant, data.restaurant_id):
+        raise HTTPException(404, "Restaurant not found")
+    if data.order_id is not None:
+        order = await db.get(Order, data.order_id)
+        if not order or order.user_uid != data.user_uid or order.restaurant_id != data.restaurant_id:
+            raise HTTPException(400, "Order does not belong to this user and restaurant")
+        if order.status != OrderStatus.delivered:
+            raise HTTPException(400, "Only delivered orders can be reviewed")
+        reviewed = await db.execute(
+            select(Review.review_id)
+            .where(Review.restaurant_id == data.restaurant_id, Review.order_id == data.order_id)
+            .limit(1)
+        )
+        if reviewed.first():
+            raise HTTPException(400, "Order already reviewed")
+
+    review = Review(**data.model_dump())
+    # Hai submit đồng thời cùng đơn đều lọt qua kiểm tra trên; unique index ix_reviews_order_id
+    # chặn INSERT thứ hai (lúc autoflush hoặc commit) nên rating không bị cộng hai lần
+    try:
+        db.add(review)
+        await adjust_rating(db, data.restaurant_id, {data.rating: 1})
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(400, "Order already reviewed")
+    await db.refresh(review)
+    # rating nằm trong snapshot menu của quán
+    menu_snapshots.invalidate(data.restaurant_id)
+    return review
+
+
+async def list_reviews_page(
+    db: AsyncSession, restaurant_id: int, cursor: Optional[str], limit: int
+) -> tuple[List[Review], Optional[str]]:
+    """Mới nhất trước, dùng index (restaurant_id, created_at)."""
+    stmt = select(Review).where(Review.restaurant_id == restaurant_id)
+    return await paginate(db, stmt, [Review.created_at, Review.review_id], cursor, limit, descending=True)
+
+
+async def get_rating_summary(db: AsyncSession, restaurant_id: int) -> Optional[dict]:
+    result = await db.execute(
+        select(Restaurant.rating, Restaurant.rating_count, *STAR_COLUMNS.values())
+        .where(Restaurant.restaurant_id == restaurant_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    rating, rating_count, *histogram = row
+    return {
+        "restaurant_id": restaurant_id,
+        "rating": rating or 0.0,
+        "rating_count": rating_count,
+        "histogram": dict(zip(STARS, histogram)),
+    }
+
+
+async def reconcile_restaurant_ratings(db: AsyncSession) -> int:
+    """
+    Tính lại rating aggregates từ bảng reviews cho các quán bị lệch (nạp dữ liệu hàng loạt
+    không qua create_review, ghi dở...). Trả về số quán được sửa.
+    """
+    def reviews_of(*conditions):
+        return (
+            select(func.count())
+            .select_from(Review)
+            .where(Review.restaurant_id == Restaurant.restaurant_id, Review.rating.between(1, 5), *conditions)
+            .scalar_subquery()
+        )
+
+    total = (
+        select(func.coalesce(func.sum(Review.rating), 0))
+        .where(Review.restaurant_id == Restaurant.restaurant_id, Review.rating.between(1, 5))
+        .scalar_subquery()
+    )
+    count = reviews_of()
+    stars = {star: reviews_of(Review.rating == star) for star in STARS}
+    drifted = or_(
+        Restaurant.rating_sum != total,
+        Restaurant.rating_count != count,
+        *(STAR_COLUMNS[star] != stars[star] for star in STARS),
+    )
+    # Mọi giá trị SET chỉ đọc bảng reviews nên thứ tự SET của MySQL không ảnh hưởng
+    values = {
+        "rating": case((count > 0, total / cast(count, Float)), else_=0.0),
+        "rating_sum": total,
+        "rating_count": count,
+    }
+    values.update({f"rating_{star}": stars[star] for star in STARS})
+    result = await db.execute(
+        update(Restaurant).where(drifted).values(**values).execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    if result.rowcount:
+        menu_snapshots.clear()
+    return result.rowcount
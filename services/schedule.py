@@ -0,0 +1,257 @@
+import asyncio
+import datetime
+import logging
+from bisect import bisect_right, insort
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.future import select
+
+from config import SCHEDULE_UPDATE_BATCH_SIZE
+from models import Restaurant, RestaurantSchedule, RestaurantStatus
+from services.menu_snapshot import menu_snapshots
+
+logger = logging.getLogger("shopeefood.schedule")
+
+DAY = 24 * 60
+WEEK = 7 * DAY
+
+
+def week_minute(moment: datetime.datetime) -> int:
+    """Số phút tính từ 00:00 thứ Hai của tuần chứa `moment`."""
+    return moment.weekday() * DAY + moment.hour * 60 + moment.minute
+
+
+def slot_intervals(weekday: int, open_minute: int, close_minute: int) -> List[Tuple[int, int]]:
+    """Một khung giờ -> các khoảng [start, end) theo phút trong tuần (tách đôi nếu vắt qua cuối tuần)."""
+    start = weekday * DAY + open_minute
+    length = (close_minute - open_minute) % DAY or DAY  # close <= open: mở qua nửa đêm; bằng nhau: cả ngày
+    end = start + length
+    if end <= WEEK:
+        return [(start, end)]
+    return [(start, WEEK), (0, end - WEEK)]
+
+
+def merge_intervals(intervals: Iterable[Tuple[int, int]]) -> Tuple[List[int], List[int]]:
+    starts, ends = [], []
+    for start, end in sorted(intervals):
+        if ends and start <= ends[-1]:
+            ends[-1] = max(ends[-1], end)
+        else:
+            starts.append(start)
+            ends.append(end)
+    return starts, ends
+
+
+class OpenIntervals:
+    """
+    Lịch mở cửa đã tính sẵn thành các khoảng [start, end) theo phút trong tuần.
+
+    is_open() là một lần bisect trên khoảng của quán (O(log k)). `boundaries`
+    là danh sách mọi mốc mở/đóng (đã sắp xếp) cùng các quán có mốc đó, để
+    scheduler biết lần đổi trạng thái tiếp theo và chỉ cập nhật đúng các quán đó.
+    """
+
+    def __init__(self):
+        self.load([])
+
+    def load(self, slots: Iterable[Tuple[int, int, int, int]]) -> None:
+        """slots: (restaurant_id, weekday, open_minute, close_minute)."""
+        grouped: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+        for restaurant_id, weekday, open_minute, close_minute in slots:
+            grouped[restaurant_id].extend(slot_intervals(weekday, open_minute, close_minute))
+        self.intervals: Dict[int, Tuple[List[int], List[int]]] = {}
+        self.by_boundary: Dict[int, Set[int]] = defaultdict(set)
+        self.boundaries: List[int] = []
+        for restaurant_id, intervals in grouped.items():
+            self._set(restaurant_id, intervals)
+
+    def __len__(self) -> int:
+        return len(self.intervals)
+
+    def __contains__(self, restaurant_id: int) -> bool:
+        return restaurant_id in self.intervals
+
+    def _boundaries_of(self, restaurant_id: int) -> Set[int]:
+        starts, ends = self.intervals.get(restaurant_id, ([], []))
+        # Khoảng phủ kín cả tuần (mở 24/7) không có mốc đổi trạng thái
+        return {m % WEEK for m in starts + ends} if starts != [0] or ends != [WEEK] else set()
+
+    def _set(self, restaurant_id: int, intervals: List[Tuple[int, int]]) -> None:
+        self.remove(restaurant_id)
+        if not intervals:
+            return
+        self.intervals[restaurant_id] = merge_intervals(intervals)
+        for boundary in self._boundaries_of(restaurant_id):
+            if not self.by_boundary[boundary]:
+                insort(self.boundaries, boundary)
+            self.by_boundary[boundary].add(restaurant_id)
+
+    def set_slots(self, restaurant_id: int, slots: Iterable[Tuple[int, int, int]]) -> None:
+        """Thay lịch của một quán; slots: (weekday, open_minute, close_minute)."""
+        self._set(restaurant_id, [i for slot in slots for i in slot_intervals(*slot)])
+
+    def remove(self, restaurant_id: int) -> None:
+        for boundary in self._boundaries_of(restaurant_id):
+            restaurants = self.by_boundary[boundary]
+            restaurants.discard(restaurant_id)
+            if not restaurants:
+                del self.by_boundary[boundary]
+                self.boundaries.remove(boundary)
+        self.intervals.pop(restaurant_id, None)
+
+    def is_open(self, restaurant_id: int, minute: int) -> Optional[bool]:
+        """None nếu quán không có lịch (trạng thái do chủ quán tự đặt)."""
+        intervals = self.intervals.get(restaurant_id)
+        if intervals is None:
+            return None
+        starts, ends = intervals
+        i = bisect_right(starts, minute) - 1
+        return i >= 0 and minute < ends[i]
+
+    def restaurants_between(self, after: int, until: int) -> Set[int]:
+        """Các quán có mốc trong (after, until], tính cả trường hợp vắt qua cuối tuần."""
+        if after == until:
+            return set()
+        if after > until:
+            return self.restaurants_between(after, WEEK - 1) | self.restaurants_between(-1, until)
+        found = set()
+        i = bisect_right(self.boundaries, after)
+        while i < len(self.boundaries) and self.boundaries[i] <= until:
+            found |= self.by_boundary[self.boundaries[i]]
+            i += 1
+        return found
+
+    def next_boundary(self, minute: int) -> Optional[int]:
+        """Mốc đổi trạng thái gần nhất sau `minute` (có thể sang tuần sau, khi đó > WEEK)."""
+        if not self.boundaries:
+            return None
+        i = bisect_right(self.boundaries, minute)
+        return self.boundaries[i] if i < len(self.boundaries) else self.boundaries[0] + WEEK
+
+
+open_intervals = OpenIntervals()
+# Đánh thức scheduler khi lịch thay đổi (mốc tiếp theo có thể sớm hơn mốc đang chờ)
+schedule_changed = asyncio.Event()
+
+
+async def build_open_intervals(db: AsyncSession) -> int:
+    result = await db.execute(
+        select(RestaurantSchedule.restaurant_id, RestaurantSchedule.weekday,
+               RestaurantSchedule.open_minute, RestaurantSchedule.close_minute)
+    )
+    open_intervals.load(result.all())
+    schedule_changed.set()
+    return len(open_intervals)
+
+
+async def sync_all_statuses(db: AsyncSession) -> int:
+    """Đồng bộ trạng thái của mọi quán có lịch (lúc khởi động và sau mỗi lần load lại lịch)."""
+    return await apply_statuses(db, list(open_intervals.intervals), week_minute(datetime.datetime.now()))
+
+
+def minutes_to_time(minute: int) -> datetime.time:
+    return datetime.time(minute // 60 % 24, minute % 60)
+
+
+def time_to_minutes(value: datetime.time) -> int:
+    return value.hour * 60 + value.minute
+
+
+async def list_schedule(db: AsyncSession, restaurant_id: int) -> List[RestaurantSchedule]:
+    result = await db.execute(
+        select(RestaurantSchedule)
+        .where(RestaurantSchedule.restaurant_id == restaurant_id)
+        .order_by(RestaurantSchedule.weekday, RestaurantSchedule.open_minute)
+    )
+    return list(result.scalars().all())
+
+
+async def replace_schedule(
+    db: AsyncSession, restaurant_id: int, slots: List[Tuple[int, int, int]]
+) -> List[RestaurantSchedule]:
+    """Thay toàn bộ lịch tuần của quán rồi cập nhật ngay trạng thái open/closed."""
+    await db.execute(delete(RestaurantSchedule).where(RestaurantSchedule.restaurant_id == restaurant_id))
+    rows = [
+        RestaurantSchedule(restaurant_id=restaurant_id, weekday=w, open_minute=o, close_minute=c)
+        for w, o, c in slots
+    ]
+    db.add_all(rows)
+    await db.commit()
+    open_intervals.set_slots(restaurant_id, slots)
+    schedule_changed.set()
+    await apply_statuses(db, [restaurant_id], week_minute(datetime.datetime.now()))
+    return await list_schedule(db, restaurant_id)
+
+
+async def apply_statuses(db: AsyncSession, restaurant_ids: Iterable[int], minute: int) -> int:
+    """
+    Đặt status open/closed theo lịch cho các quán, gom thành UPDATE ... WHERE id IN (...)
+    mỗi SCHEDULE_UPDATE_BATCH_SIZE quán. Quán bị suspended hoặc không có lịch giữ nguyên.
+    """
+    target = {RestaurantStatus.open: [], RestaurantStatus.closed: []}
+    for restaurant_id in restaurant_ids:
+        is_open = open_intervals.is_open(restaurant_id, minute)
+        if is_open is not None:
+            target[RestaurantStatus.open if is_open else RestaurantStatus.closed].append(restaurant_id)
+    changed = []
+    for status, ids in target.items():
+        other = RestaurantStatus.closed if status == RestaurantStatus.open else RestaurantStatus.open
+        for i in range(0, len(ids), SCHEDULE_UPDATE_BATCH_SIZE):
+            batch = ids[i:i + SCHEDULE_UPDATE_BATCH_SIZE]
+            # Lấy trước các quán thật sự cần đổi để UPDATE theo khoá chính và chỉ xoá snapshot của chúng
+            result = await db.execute(
+                select(Restaurant.restaurant_id).where(Restaurant.restaurant_id.in_(batch), Restaurant.status == other)
+            )
+            stale = list(result.scalars().all())
+            if not stale:
+                continue
+            await db.execute(
+                update(Restaurant)
+                .where(Restaurant.restaurant_id.in_(stale), Restaurant.status == other)
+                .values(status=status)
+                .execution_options(synchronize_session=False)
+            )
+            changed += stale
+    await db.commit()
+    # Status nằm trong snapshot menu của quán
+    for restaurant_id in changed:
+        menu_snapshots.invalidate(restaurant_id)
+    return len(changed)
+
+
+async def run_status_scheduler(session_maker: async_sessionmaker) -> None:
+    """
+    Vòng lặp nền: ngủ tới mốc mở/đóng kế tiếp rồi chỉ cập nhật các quán có mốc đó
+    (đồng bộ toàn bộ do sync_all_statuses() làm lúc khởi động / load lại lịch).
+    Chạy ở nhiều worker cũng không sao: UPDATE chỉ đổi những dòng đang sai trạng thái.
+    """
+    last_minute = week_minute(datetime.datetime.now())
+    while True:
+        now = datetime.datetime.now()
+        minute = week_minute(now)
+        # Mọi mốc từ lần chạy trước tới giờ, phòng khi event loop bị trễ qua một mốc
+        restaurant_ids = list(open_intervals.restaurants_between(last_minute, minute))
+        if restaurant_ids:
+            try:
+                async with session_maker() as db:
+                    changed = await apply_statuses(db, restaurant_ids, minute)
+                if changed:
+                    logger.info("Schedule: %d restaurants changed status at %s", changed, now.strftime("%a %H:%M"))
+            except Exception:
+                logger.exception("Schedule status update failed")
+        last_minute = minute
+
+        schedule_changed.clear()
+        boundary = open_intervals.next_boundary(minute)
+        if boundary is None:
+            timeout = None
+        else:
+            start_of_minute = now.replace(second=0, microsecond=0)
+            timeout = ((boundary - minute) * 60 - (now - start_of_minute).total_seconds())
+        try:
+            await asyncio.wait_for(schedule_changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,196 @@
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from db import AsyncSessionLocal
+from models import MenuItem, Restaurant, SearchHistory
+
+MENU_ITEM = "menu_item"
+RESTAURANT = "restaurant"
+
+# Tham số BM25
+K1 = 1.2
+B = 0.75
+# Từ khoá trong tên quan trọng hơn trong mô tả
+NAME_WEIGHT = 3
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def fold(text: str) -> str:
+    """Bỏ dấu tiếng Việt và viết thường: "Phở Bò Đặc Biệt" -> "pho bo dac biet"."""
+    text = text.lower().replace("đ", "d")
+    return "".join(c for c in unicodedata.normalize("NFD", text) if not unicodedata.combining(c))
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN_RE.findall(fold(text)) if text else []
+
+
+@dataclass
+class Document:
+    kind: str
+    id: int
+    name: str
+    restaurant_id: Optional[int] = None
+    price: Optional[float] = None
+    available: bool = True
+    length: int = 0
+    terms: Tuple[str, ...] = ()
+
+
+DocKey = Tuple[str, int]
+
+
+class SearchIndex:
+    """
+    Inverted index trong bộ nhớ cho tên/mô tả món và quán, xếp hạng bằng BM25.
+
+    Mỗi process có một index riêng: các service gọi add()/remove() sau khi
+    commit, và lifespan định kỳ load() lại từ DB để các worker khác hội tụ.
+    """
+
+    def __init__(self):
+        self.load([])
+
+    def load(self, documents: Iterable[Tuple[Document, str, Optional[str]]]) -> None:
+        """Build lại toàn bộ index từ (document, name, description) rồi thay thế index cũ."""
+        other = SearchIndex.__new__(SearchIndex)
+        other.docs = {}
+        other.postings = defaultdict(dict)
+        other.total_length = 0
+        for doc, name, description in documents:
+            other._add(doc, name, description)
+        self.docs, self.postings, self.total_length = other.docs, other.postings, other.total_length
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def add(self, doc: Document, name: str, description: Optional[str]) -> None:
+        self.remove(doc.kind, doc.id)
+        self._add(doc, name, description)
+
+    def _add(self, doc: Document, name: str, description: Optional[str]) -> None:
+        frequencies = Counter(tokenize(description))
+        for term in tokenize(name):
+            frequencies[term] += NAME_WEIGHT
+        key = (doc.kind, doc.id)
+        for term, tf in frequencies.items():
+            self.postings[term][key] = tf
+        doc.length = sum(frequencies.values())
+        doc.terms = tuple(frequencies)
+        self.docs[key] = doc
+        self.total_length += doc.length
+
+    def remove(self, kind: str, doc_id: int) -> None:
+        key = (kind, doc_id)
+        doc = self.docs.pop(key, None)
+        if not doc:
+            return
+        self.total_length -= doc.length
+        for term in doc.terms:
+            docs = self.postings[term]
+            del docs[key]
+            if not docs:
+                del self.postings[term]
+
+    def remove_restaurant(self, restaurant_id: int) -> None:
+        """Xoá quán và toàn bộ món của quán (menu item bị xoá theo cascade)."""
+        for kind, doc_id in [k for k, d in self.docs.items() if d.restaurant_id == restaurant_id and d.kind == MENU_ITEM]:
+            self.remove(kind, doc_id)
+        self.remove(RESTAURANT, restaurant_id)
+
+    def search(
+        self, query: str, kind: Optional[str] = None, limit: int = 20, available_only: bool = True
+    ) -> List[Tuple[float, Document]]:
+        terms = set(tokenize(query))
+        if not terms or not self.docs:
+            return []
+        n_docs = len(self.docs)
+        avg_length = self.total_length / n_docs
+        scores: Dict[DocKey, float] = defaultdict(float)
+        for term in terms:
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for key, tf in docs.items():
+                if kind and key[0] != kind:
+                    continue
+                length = self.docs[key].length
+                scores[key] += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / avg_length))
+        if available_only:
+            candidates = ((s, k) for k, s in scores.items() if self.docs[k].available)
+        else:
+            candidates = ((s, k) for k, s in scores.items())
+        return [(score, self.docs[key]) for score, key in heapq.nlargest(limit, candidates)]
+
+    def restaurant_name(self, restaurant_id: Optional[int]) -> Optional[str]:
+        doc = self.docs.get((RESTAURANT, restaurant_id))
+        return doc.name if doc else None
+
+
+search_index = SearchIndex()
+
+
+def menu_item_document(item) -> Tuple[Document, str, Optional[str]]:
+    doc = Document(MENU_ITEM, item.item_id, item.name, item.restaurant_id, float(item.price), bool(item.available))
+    return doc, item.name, item.description
+
+
+def restaurant_document(restaurant) -> Tuple[Document, str, Optional[str]]:
+    doc = Document(RESTAURANT, restaurant.restaurant_id, restaurant.name, restaurant.restaurant_id)
+    return doc, restaurant.name, restaurant.description
+
+
+def index_menu_item(item) -> None:
+    search_index.add(*menu_item_document(item))
+
+
+def index_restaurant(restaurant) -> None:
+    search_index.add(*restaurant_document(restaurant))
+
+
+async def build_search_index(db: AsyncSession) -> int:
+    """Load lại index từ DB (chỉ select các cột cần thiết)."""
+    items = await db.execute(
+        select(MenuItem.item_id, MenuItem.restaurant_id, MenuItem.name, MenuItem.description,
+               MenuItem.price, MenuItem.available)
+    )
+    restaurants = await db.execute(
+        select(Restaurant.restaurant_id, Restaurant.name, Restaurant.description)
+    )
+    documents = [restaurant_document(r) for r in restaurants.all()]
+    documents += [menu_item_document(i) for i in items.all()]
+    search_index.load(documents)
+    return len(search_index)
+
+
+def search(query: str, kind: Optional[str] = None, limit: int = 20, available_only: bool = True) -> List[dict]:
+    return [
+        {
+            "kind": doc.kind,
+            "id": doc.id,
+            "name": doc.name,
+            "restaurant_id": doc.restaurant_id,
+            "restaurant_name": search_index.restaurant_name(doc.restaurant_id),
+            "price": doc.price,
+            "available": doc.available,
+            "score": round(score, 4),
+        }
+        for score, doc in search_index.search(query, kind, limit, available_only)
+    ]
+
+
+async def record_search(user_uid: str, keyword: str) -> None:
+    # Chạy sau khi đã trả response (BackgroundTasks) nên tự mở session riêng
+    async with AsyncSessionLocal() as db:
+        db.add(SearchHistory(user_uid=user_uid, keyword=keyword[:255]))
+        await db.commit()
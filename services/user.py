@@ -1,11 +1,12 @@
-import os
-import uuid
 from fastapi import HTTPException, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from models import User
+from models import Review, User
 from schemas.user import UserCreate, UserUpdate
-from typing import List, Optional
+from typing import List, Optional, Sequence
+from core.pagination import paginate
+from core.uploads import remove_file, save_image
+from services.review import discount_reviews
 
 async def create_user(db: AsyncSession, user_create: UserCreate) -> User:
     user = User(**user_create.model_dump(exclude_unset=True))
@@ -17,6 +18,10 @@ async def create_user(db: AsyncSession, user_create: UserCreate) -> User:
 async def get_user(db: AsyncSession, uid: str) -> Optional[User]:
     return await db.get(User, uid)
 
+async def get_users_by_ids(db: AsyncSession, uids: Sequence[str]) -> List[User]:
+    result = await db.execute(select(User).where(User.uid.in_(uids)))
+    return list(result.scalars().all())
+
 async def update_user(db: AsyncSession, user_update: UserUpdate) -> Optional[User]:
     user = await db.get(User, user_update.uid)
     if not user:
@@ -44,6 +49,7 @@ async def delete_user(db: AsyncSession, uid: str) -> bool:
     user = await db.get(User, uid)
     if not user:
         return False
+    await discount_reviews(db, Review.user_uid == uid)
     await db.delete(user)
     await db.commit()
     return True
@@ -52,15 +58,11 @@ async def list_users(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[
     result = await db.execute(select(User).offset(skip).limit(limit))
     return list(result.scalars().all())
 
+async def list_users_page(db: AsyncSession, cursor: Optional[str], limit: int) -> tuple[List[User], Optional[str]]:
+    return await paginate(db, select(User), [User.uid], cursor, limit)
 
-AVATAR_DIR = "static/user_avatars"
-ALLOWED_TYPES = {"image/jpeg", "image/png", "image/webp"}
-MAX_SIZE = 3 * 1024 * 1024  # 3MB
 
-def generate_avatar_filename(uid: str, original_filename: str) -> str:
-    ext = os.path.splitext(original_filename)[1]
-    unique = uuid.uuid4().hex
-    return f"{uid}_{unique}{ext}"
+AVATAR_DIR = "static/user_avatars"
 
 #TODO user select upload avater, UI request delete avatar and upload avatar after that.
 
@@ -69,25 +71,20 @@ async def upload_user_avatar(
     uid: str,
     file: UploadFile
 ) -> str:
-    # Validate type
-    if file.content_type not in ALLOWED_TYPES:
-        raise HTTPException(400, "File không đúng định dạng ảnh!")
-    # Read content
-    content = await file.read()
-    if len(content) > MAX_SIZE:
-        raise HTTPException(400, "Ảnh quá lớn! Tối đa 3MB.")
-    os.makedirs(AVATAR_DIR, exist_ok=True)
-    filename = generate_avatar_filename(uid, file.filename)
-    file_path = os.path.join(AVATAR_DIR, filename)
-    with open(file_path, "wb") as f:
-        f.write(content)
-    avatar_url = f"/static/user_avatars/{filename}"
-    # Update avatar_url in DB
+    # Kiểm tra user trước khi ghi file để không để lại ảnh mồ côi
     user = await db.get(User, uid)
     if not user:
         raise HTTPException(404, "User not found")
-    user.avatar_url = avatar_url
-    await db.commit()
+    filename = await save_image(file, AVATAR_DIR, f"{uid}_")
+    avatar_url = f"/static/user_avatars/{filename}"
+    # Update avatar_url in DB
+    try:
+        user.avatar_url = avatar_url
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        await remove_file(AVATAR_DIR, filename)
+        raise
     await db.refresh(user)
     return avatar_url
 
@@ -99,9 +96,7 @@ async def delete_user_avatar(
     if not user or not user.avatar_url:
         return False
     # Xóa file ảnh
-    file_path = os.path.join(AVATAR_DIR, os.path.basename(user.avatar_url))
-    if os.path.exists(file_path):
-        os.remove(file_path)
+    await remove_file(AVATAR_DIR, user.avatar_url)
     # Cập nhật avatar_url trong DB
     user.avatar_url = None
     await db.commit()
@@ -2,6 +2,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from typing import List, Optional
 from models import Voucher
+from core.pagination import paginate
 from schemas.voucher import VoucherCreate, VoucherUpdate
 
 async def create_voucher(db: AsyncSession, data: VoucherCreate) -> Voucher:
@@ -38,6 +39,9 @@ async def list_vouchers(db: AsyncSession, skip: int = 0, limit: int = 100) -> Li
     result = await db.execute(select(Voucher).offset(skip).limit(limit))
     return list(result.scalars().all())
 
+async def list_vouchers_page(db: AsyncSession, cursor: Optional[str], limit: int) -> tuple[List[Voucher], Optional[str]]:
+    return await paginate(db, select(Voucher), [Voucher.voucher_id], cursor, limit)
+
 async def list_vouchers_by_resid(
     db: AsyncSession, res_uid: str, skip: int = 0, limit: int = 100
 ) -> List[Voucher]:
@@ -0,0 +1,68 @@
+import asyncio
+import datetime
+import os
+import random
+import tempfile
+from decimal import Decimal
+
+# Chạy trên SQLite file tạm; phải đặt trước khi import config / db
+_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="shopeefood-test-"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_DB_PATH}"
+
+import httpx
+import pytest
+from sqlalchemy import create_engine, insert
+
+from models import Base, Category, MenuItem, Order, OrderItem, OrderStatus, PaymentMethod, Restaurant, User
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def seeded_db():
+    """Schema + vài chục dòng mỗi bảng, ghi theo thứ tự khoá chính bị xáo trộn."""
+    rng = random.Random(7)
+    engine = create_engine(f"sqlite:///{_DB_PATH}")
+    Base.metadata.create_all(engine)
+    now = datetime.datetime(2026, 10, 18, 12, 0)
+    restaurant_ids, item_ids, order_ids = list(range(1, 31)), list(range(1, 61)), list(range(1, 81))
+    for ids in (restaurant_ids, item_ids, order_ids):
+        rng.shuffle(ids)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"uid": f"user_{i}", "email": f"user_{i}@example.com"} for i in range(1, 6)])
+        conn.execute(insert(Category), [{"category_id": i, "name": f"Category {i}"} for i in range(1, 4)])
+        conn.execute(insert(Restaurant), [
+            {"restaurant_id": rid, "owner_uid": "user_1", "name": f"Quán {rid}", "created_at": now, "updated_at": now}
+            for rid in restaurant_ids
+        ])
+        conn.execute(insert(MenuItem), [
+            {"item_id": iid, "restaurant_id": iid % 30 + 1, "category_id": iid % 3 + 1, "name": f"Món {iid}",
+             "price": Decimal(iid * 1000), "available": True}
+            for iid in item_ids
+        ])
+        conn.execute(insert(Order), [
+            {"order_id": oid, "user_uid": f"user_{oid % 5 + 1}", "restaurant_id": oid % 3 + 1,
+             "shipper_uid": f"user_{oid % 2 + 4}",
+             "total_price": Decimal(oid * 1000), "status": OrderStatus.delivered,
+             "payment_method": PaymentMethod.cod, "created_at": now, "updated_at": now}
+            for oid in order_ids
+        ])
+        conn.execute(insert(OrderItem), [
+            {"order_id": oid, "item_id": (oid * 7 + k) % 60 + 1} for oid in order_ids for k in range(2)
+        ])
+    engine.dispose()
+    yield
+    # aiosqlite giữ một thread cho mỗi connection trong pool; không đóng thì pytest không thoát được
+    from db import dispose_engines
+    asyncio.run(dispose_engines())
+
+
+@pytest.fixture
+async def client():
+    from main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+        yield c
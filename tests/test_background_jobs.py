@@ -0,0 +1,50 @@
+from contextlib import asynccontextmanager
+
+import pytest
+
+import core.lifespan
+
+pytestmark = pytest.mark.anyio
+
+# (job, service ghi DB mà chỉ worker giữ khoá được chạy)
+LOCKED_JOBS = [
+    (core.lifespan.refresh_schedules_job, "sync_all_statuses"),
+    (core.lifespan.reconcile_categories_job, "reconcile_category_counts"),
+    (core.lifespan.reconcile_ratings_job, "reconcile_restaurant_ratings"),
+]
+
+
+def fake_lock(monkeypatch, leader: bool):
+    @asynccontextmanager
+    async def advisory_lock(target, name):
+        yield leader
+
+    monkeypatch.setattr(core.lifespan, "advisory_lock", advisory_lock)
+
+
+@pytest.mark.parametrize("job,writer", LOCKED_JOBS)
+@pytest.mark.parametrize("leader", [True, False])
+async def test_only_lock_holder_writes(monkeypatch, job, writer, leader):
+    fake_lock(monkeypatch, leader)
+    calls = []
+
+    async def record(db):
+        calls.append(writer)
+        return 0
+
+    monkeypatch.setattr(core.lifespan, writer, record)
+    await job()
+    assert calls == ([writer] if leader else [])
+
+
+async def test_every_worker_rebuilds_open_intervals(monkeypatch):
+    fake_lock(monkeypatch, False)
+    rebuilt = []
+
+    async def build_open_intervals(db):
+        rebuilt.append(True)
+        return 0
+
+    monkeypatch.setattr(core.lifespan, "build_open_intervals", build_open_intervals)
+    await core.lifespan.refresh_schedules_job()
+    assert rebuilt == [True]
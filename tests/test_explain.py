@@ -0,0 +1,81 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from db import AsyncSessionLocal, engine
+from models import OrderStatus
+from services.address import list_addresses_of_user
+from services.banner import list_banners
+from services.cart_item import list_cart_items
+from services.category import get_category, list_categories
+from services.menu_item import (
+    get_menu_item, list_menu_items_by_category, list_menu_items_by_restaurant_id, list_menu_item_images,
+)
+from services.order import get_orders_by_user, get_orders_by_restaurant, get_orders_by_status, get_orders_by_shipper
+from services.order_item import list_order_items
+from services.restaurant import get_restaurant_by_user_id
+from services.voucher import list_vouchers_by_resid, is_voucher_code_unique
+
+pytestmark = pytest.mark.anyio
+
+# (tên, hàm gọi service, các bảng được phép full scan). Giá trị tham số không ảnh hưởng
+# plan của SQLite, nên không cần dòng mẫu thật.
+CASES = [
+    ("get_orders_by_user", lambda db: get_orders_by_user(db, "user_1"), set()),
+    ("get_orders_by_restaurant", lambda db: get_orders_by_restaurant(db, 1), set()),
+    ("get_orders_by_status", lambda db: get_orders_by_status(db, OrderStatus.delivered), set()),
+    ("get_orders_by_shipper", lambda db: get_orders_by_shipper(db, "user_2"), set()),
+    ("list_order_items", lambda db: list_order_items(db, 1), set()),
+    ("list_cart_items", lambda db: list_cart_items(db, "user_1", 1), set()),
+    ("list_addresses_of_user", lambda db: list_addresses_of_user(db, "user_1"), set()),
+    ("get_restaurant_by_user_id", lambda db: get_restaurant_by_user_id(db, "user_1"), set()),
+    ("get_menu_item", lambda db: get_menu_item(db, 1), set()),
+    ("list_menu_items_by_restaurant_id", lambda db: list_menu_items_by_restaurant_id(db, 1), set()),
+    ("list_menu_items_by_category", lambda db: list_menu_items_by_category(db, 1), set()),
+    ("list_menu_item_images", lambda db: list_menu_item_images(db, 1), set()),
+    ("list_vouchers_by_resid", lambda db: list_vouchers_by_resid(db, "user_1"), set()),
+    ("is_voucher_code_unique", lambda db: is_voucher_code_unique(db, "user_1", "SALE10"), set()),
+    ("get_category", lambda db: get_category(db, 1), set()),
+    ("list_categories", lambda db: list_categories(db), {"categories"}),
+    ("list_banners", lambda db: list_banners(db, "active"), set()),
+]
+
+
+@contextmanager
+def capture_selects():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+async def explain(conn, statement: str, parameters) -> list[tuple[str, str]]:
+    """[(table, dòng plan)] cho các bước SCAN cả bảng (không qua index) trong EXPLAIN QUERY PLAN."""
+    full_scans = []
+    result = await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+    for row in result:
+        detail = row[-1]
+        words = detail.split()
+        if words[0] == "SCAN" and "USING" not in words:
+            full_scans.append((words[1], detail))
+    return full_scans
+
+
+@pytest.mark.parametrize("name,call,allowed", CASES, ids=[case[0] for case in CASES])
+async def test_query_uses_index(name, call, allowed):
+    async with AsyncSessionLocal() as db:
+        with capture_selects() as statements:
+            await call(db)
+    assert statements, f"{name} sent no SELECT"
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            scans = [(table, detail) for table, detail in await explain(conn, statement, parameters) if table not in allowed]
+            assert not scans, f"full scan in {name}: {scans}\n{' '.join(statement.split())}"
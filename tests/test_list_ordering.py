@@ -0,0 +1,44 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+# (endpoint, khoá chính, fields) - các danh sách phân trang bằng skip/limit
+OFFSET_LISTS = [
+    ("/order/list", "order_id", "status"),
+    ("/order/by_restaurant/2", "order_id", "total_price"),
+    ("/restaurant/list", "restaurant_id", "name"),
+    ("/menu_item/list", "item_id", "price"),
+]
+
+
+@pytest.mark.parametrize("url,key,fields", OFFSET_LISTS)
+async def test_fields_keeps_offset_page_rows(client, url, key, fields):
+    for skip in (0, 3):
+        params = {"skip": skip, "limit": 4}
+        full = await client.get(url, params=params)
+        trimmed = await client.get(url, params={**params, "fields": fields})
+        assert full.status_code == trimmed.status_code == 200
+        ids = [row[key] for row in full.json()]
+        assert ids == [row[key] for row in trimmed.json()]
+        assert ids == sorted(ids) and len(ids) == 4
+
+
+# Danh sách chỉ có skip/limit (không fields=): trang liền nhau phải nối thành đúng trang gộp
+OFFSET_ONLY_LISTS = [
+    ("/order/by_user/user_1", "order_id"),
+    ("/order/by_status/delivered", "order_id"),
+    ("/order/by_shipper/user_4", "order_id"),
+    ("/menu_item/menu_items/1", "item_id"),
+]
+
+
+@pytest.mark.parametrize("url,key", OFFSET_ONLY_LISTS)
+async def test_offset_pages_are_contiguous(client, url, key):
+    pages = []
+    for params in ({"skip": 0, "limit": 8}, {"skip": 0, "limit": 4}, {"skip": 4, "limit": 4}):
+        response = await client.get(url, params=params)
+        assert response.status_code == 200
+        pages.append([row[key] for row in response.json()])
+    both, first, second = pages
+    assert both == first + second and len(both) == 8
+    assert both == sorted(both)
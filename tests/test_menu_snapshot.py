@@ -0,0 +1,34 @@
+import sqlite3
+
+import pytest
+from sqlalchemy.engine import make_url
+
+from config import DATABASE_URL
+from services.menu_snapshot import menu_snapshots
+
+pytestmark = pytest.mark.anyio
+
+
+def rename_item_elsewhere(item_id: int, name: str) -> None:
+    """Ghi thẳng vào DB như một worker khác: worker này không được gọi invalidate()."""
+    with sqlite3.connect(make_url(DATABASE_URL).database) as conn:
+        conn.execute("UPDATE menu_items SET name = ? WHERE item_id = ?", (name, item_id))
+
+
+def item_names(menu: dict) -> set:
+    return {item["name"] for group in menu["categories"] for item in group["items"]}
+
+
+async def test_snapshot_expires_after_ttl(client, monkeypatch):
+    # Món 30 thuộc quán 1 (restaurant_id = item_id % 30 + 1)
+    first = await client.get("/restaurant/menu/1")
+    assert first.status_code == 200 and "Món 30" in item_names(first.json())
+
+    rename_item_elsewhere(30, "Món 30 mới")
+    cached = await client.get("/restaurant/menu/1")
+    assert cached.headers["etag"] == first.headers["etag"]
+
+    monkeypatch.setattr(menu_snapshots, "ttl", 0)
+    fresh = await client.get("/restaurant/menu/1")
+    assert "Món 30 mới" in item_names(fresh.json())
+    assert fresh.headers["etag"] != first.headers["etag"]
@@ -0,0 +1,62 @@
+import pytest
+
+import core.query_stats
+from core.query_stats import QueryBudgetExceeded, track_queries
+from db import AsyncSessionLocal
+from routers.order import ORDER_INCLUDES
+from services.order import get_orders_by_user_page
+
+pytestmark = pytest.mark.anyio
+
+# Số câu SQL tối đa của các route nóng; vượt là có N+1 hoặc include không còn nạp theo lô
+ROUTE_BUDGETS = [
+    ("GET /order/by_user/{user_uid}/page", "/order/by_user/user_1/page?include=order_items.menu_item,restaurant", 3),
+    ("GET /order/by_user/{user_uid}/page", "/order/by_user/user_1/page", 1),
+    ("GET /order/by_user/{user_uid}", "/order/by_user/user_1?include=order_items.menu_item,restaurant", 3),
+    ("GET /menu_item/menu_items_by_resid/{restaurant_id}", "/menu_item/menu_items_by_resid/1", 2),
+    ("GET /category/list", "/category/list", 1),
+    ("GET /restaurant/list", "/restaurant/list", 1),
+]
+
+
+@pytest.fixture
+def strict_budgets(monkeypatch):
+    budgets = {}
+    monkeypatch.setattr(core.query_stats, "DB_QUERY_BUDGETS", budgets)
+    monkeypatch.setattr(core.query_stats, "DB_QUERY_BUDGET_STRICT", True)
+    return budgets
+
+
+@pytest.mark.parametrize("route,url,budget", ROUTE_BUDGETS)
+async def test_route_within_query_budget(client, strict_budgets, route, url, budget):
+    strict_budgets[route] = budget
+    response = await client.get(url)
+    # Strict mode trả 500 "Query budget exceeded" thay cho response khi vượt ngân sách
+    assert response.status_code == 200, response.text
+    assert 1 <= int(response.headers["x-db-query-count"]) <= budget
+
+
+async def test_strict_budget_rejects_route_over_budget(client, strict_budgets):
+    strict_budgets["GET /order/by_user/{user_uid}/page"] = 1
+    response = await client.get("/order/by_user/user_1/page", params={"include": "order_items.menu_item,restaurant"})
+    assert response.status_code == 500
+    assert response.json()["detail"].startswith("Query budget exceeded")
+
+
+async def test_include_query_count_does_not_grow_with_page_size():
+    paths = ORDER_INCLUDES.parse("order_items.menu_item,restaurant")
+    counts = []
+    for limit in (2, 16):
+        async with AsyncSessionLocal() as db:
+            with track_queries(budget=3) as stats:
+                items, _ = await get_orders_by_user_page(db, "user_1", None, limit, ORDER_INCLUDES.options(paths))
+        assert len(items) == limit
+        counts.append(stats.count)
+    assert counts[0] == counts[1]
+
+
+async def test_track_queries_raises_over_budget():
+    async with AsyncSessionLocal() as db:
+        with pytest.raises(QueryBudgetExceeded):
+            with track_queries(budget=0):
+                await get_orders_by_user_page(db, "user_1", None, 5)
@@ -0,0 +1,30 @@
+import time
+
+import pytest
+
+from db import STICKY_COOKIE, sign_sticky, sticky_until
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_write_sets_signed_sticky_cookie(client):
+    response = await client.post("/category/create", json={"name": "Đồ uống"})
+    assert response.status_code == 200
+    until = sticky_until(response.cookies.get(STICKY_COOKIE))
+    assert until > time.time()
+
+
+async def test_read_does_not_set_cookie(client):
+    response = await client.get("/category/list")
+    assert response.status_code == 200
+    assert STICKY_COOKIE not in response.cookies
+
+
+def test_forged_cookie_is_rejected():
+    far_future = time.time() + 10 ** 6
+    assert sticky_until(sign_sticky(far_future)) == pytest.approx(far_future, abs=0.001)
+    assert sticky_until(f"{far_future:.3f}") == 0.0
+    assert sticky_until(f"{far_future:.3f}.{'0' * 64}") == 0.0
+    value, _, digest = sign_sticky(time.time()).rpartition(".")
+    assert sticky_until(f"{far_future:.3f}.{digest}") == 0.0
+    assert sticky_until(None) == 0.0
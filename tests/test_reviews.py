@@ -0,0 +1,46 @@
+import asyncio
+import sqlite3
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.engine import make_url
+
+from config import DATABASE_URL
+from db import AsyncSessionLocal
+from schemas.review import ReviewCreate
+from services.review import create_review, get_rating_summary, reconcile_restaurant_ratings
+
+pytestmark = pytest.mark.anyio
+
+
+async def rating_count(restaurant_id: int) -> int:
+    async with AsyncSessionLocal() as db:
+        return (await get_rating_summary(db, restaurant_id))["rating_count"]
+
+
+async def submit(data: ReviewCreate):
+    async with AsyncSessionLocal() as db:
+        try:
+            return await create_review(db, data)
+        except HTTPException as e:
+            return e
+
+
+async def test_concurrent_reviews_of_one_order_count_once():
+    # Đơn 15: user_1 (15 % 5 + 1), quán 1 (15 % 3 + 1), đã giao
+    data = ReviewCreate(user_uid="user_1", restaurant_id=1, order_id=15, rating=4)
+    before = await rating_count(1)
+    results = await asyncio.gather(submit(data), submit(data))
+    errors = [r for r in results if isinstance(r, HTTPException)]
+    assert len(errors) == 1 and errors[0].status_code == 400
+    assert await rating_count(1) == before + 1
+
+
+async def test_reconcile_heals_drifted_ratings():
+    with sqlite3.connect(make_url(DATABASE_URL).database) as conn:
+        conn.execute("UPDATE restaurants SET rating_count = 99, rating_5 = 7 WHERE restaurant_id = 2")
+    async with AsyncSessionLocal() as db:
+        assert await reconcile_restaurant_ratings(db) == 1
+        summary = await get_rating_summary(db, 2)
+        assert summary["rating_count"] == sum(summary["histogram"].values())
+        assert await reconcile_restaurant_ratings(db) == 0
@@ -0,0 +1,26 @@
+import random
+
+import pytest
+
+from benchmarks.response_bench import payloads
+from core.responses import dumps
+from core.serializers import serialize_many
+
+PAYLOADS = payloads(50, random.Random(3))
+
+
+@pytest.mark.parametrize("endpoint", sorted(PAYLOADS))
+def test_serializer_matches_response_model(endpoint):
+    adapter, rows = PAYLOADS[endpoint]
+    schema = adapter._type.__args__[0]
+    validated = adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+    assert dumps(serialize_many(schema, rows)) == dumps(validated)
+
+
+def test_serializer_field_subset():
+    adapter, rows = PAYLOADS["/order/by_restaurant"]
+    schema = adapter._type.__args__[0]
+    fields = ("order_id", "total_price", "status")
+    trimmed = serialize_many(schema, rows, fields)
+    assert [list(row) for row in trimmed] == [list(fields)] * len(rows)
+    assert trimmed[0]["total_price"] == str(rows[0].total_price)
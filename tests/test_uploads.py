@@ -0,0 +1,54 @@
+import io
+import os
+
+import pytest
+from starlette.datastructures import Headers, UploadFile
+
+import services.category
+import services.menu_item
+import services.restaurant
+import services.user
+from db import AsyncSessionLocal
+
+pytestmark = pytest.mark.anyio
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\0" * 64
+
+
+def png_upload() -> UploadFile:
+    return UploadFile(io.BytesIO(PNG), size=len(PNG), filename="a.png", headers=Headers({"content-type": "image/png"}))
+
+
+async def test_unknown_menu_item_writes_no_file(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(services.menu_item, "UPLOAD_DIR", str(tmp_path))
+    for url, files in (
+        ("/menu_item/image/upload", {"file": ("a.png", PNG, "image/png")}),
+        ("/menu_item/image/upload-multi", [("files", ("a.png", PNG, "image/png"))] * 2),
+    ):
+        response = await client.post(url, data={"item_id": "9999"}, files=files)
+        assert response.status_code == 404
+    assert os.listdir(tmp_path) == []
+
+
+# (module, tên hằng thư mục lưu ảnh, lời gọi service upload)
+UPLOADS = [
+    (services.menu_item, "UPLOAD_DIR", lambda db: services.menu_item.upload_menu_image_service(db, 1, png_upload(), True)),
+    (services.menu_item, "UPLOAD_DIR", lambda db: services.menu_item.upload_multi_menu_images_service(db, 1, [png_upload()] * 2)),
+    (services.category, "CATEGORY_IMAGE_DIR", lambda db: services.category.upload_category_image(db, 1, png_upload())),
+    (services.restaurant, "RESTAURANT_IMAGE_DIR", lambda db: services.restaurant.upload_restaurant_image(db, 1, png_upload())),
+    (services.user, "AVATAR_DIR", lambda db: services.user.upload_user_avatar(db, "user_1", png_upload())),
+]
+
+
+@pytest.mark.parametrize("module,directory,upload", UPLOADS)
+async def test_failed_commit_removes_saved_image(monkeypatch, tmp_path, module, directory, upload):
+    monkeypatch.setattr(module, directory, str(tmp_path))
+
+    async def failing_commit():
+        raise RuntimeError("commit failed")
+
+    async with AsyncSessionLocal() as db:
+        monkeypatch.setattr(db, "commit", failing_commit)
+        with pytest.raises(RuntimeError):
+            await upload(db)
+    assert os.listdir(tmp_path) == []